@@ -0,0 +1,120 @@
+/**
+ * Site Search
+ * Queries the prebuilt search index generated by scripts/build_search_index.py.
+ * Only the manifest, the document list and the shards for the typed terms'
+ * two-letter prefixes are fetched; everything else stays on the server.
+ *
+ * Usage:
+ *   SiteSearch.search('cacao bahia').then(results => { ... });
+ *   // results: [{ title, url, description, section, score }]
+ */
+
+(function() {
+  'use strict';
+
+  const STOPWORDS = new Set([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has',
+    'have', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'our', 'that', 'the',
+    'their', 'this', 'to', 'was', 'we', 'were', 'will', 'with', 'you', 'your',
+    'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'o', 'os', 'um', 'uma'
+  ]);
+
+  const baseUrl = window.SITE_SEARCH_BASE || '/search/';
+  const cache = {};
+
+  /**
+   * Fetch a JSON file once; repeated calls share the same promise
+   */
+  function fetchJson(path) {
+    if (!cache[path]) {
+      cache[path] = fetch(baseUrl + path).then(response => {
+        if (!response.ok) {
+          throw new Error('Search index request failed: ' + path);
+        }
+        return response.json();
+      });
+    }
+    return cache[path];
+  }
+
+  /**
+   * Normalize and split a query the same way the index builder does
+   */
+  function tokenize(text) {
+    const normalized = text.toLowerCase().normalize('NFKD').replace(/[\u0300-\u036f]/g, '');
+    return (normalized.match(/[a-z0-9]+/g) || [])
+      .filter(term => term.length > 1 && !STOPWORDS.has(term));
+  }
+
+  /**
+   * Score every document matching a single query term (prefix match)
+   */
+  function matchTerm(term, manifest) {
+    const prefix = term.substring(0, manifest.prefixLength);
+    if (manifest.shards.indexOf(prefix) === -1) {
+      return Promise.resolve({});
+    }
+
+    return fetchJson('shards/' + prefix + '.json?v=' + manifest.version).then(shard => {
+      const scores = {};
+      Object.keys(shard).forEach(indexedTerm => {
+        if (indexedTerm.indexOf(term) !== 0) {
+          return;
+        }
+        // Exact matches outrank completions of a partially typed word
+        const boost = indexedTerm === term ? 2 : 1;
+        const postings = shard[indexedTerm];
+        for (let i = 0; i < postings.length; i += 2) {
+          const docId = postings[i];
+          scores[docId] = Math.max(scores[docId] || 0, postings[i + 1] * boost);
+        }
+      });
+      return scores;
+    });
+  }
+
+  /**
+   * Search the site; resolves to results ordered by score (all terms must match)
+   */
+  function search(query, limit) {
+    const terms = tokenize(query || '');
+    if (terms.length === 0) {
+      return Promise.resolve([]);
+    }
+
+    return fetchJson('manifest.json').then(manifest => {
+      return Promise.all([
+        fetchJson('docs.json?v=' + manifest.version),
+        Promise.all(terms.map(term => matchTerm(term, manifest)))
+      ]);
+    }).then(([docs, termScores]) => {
+      const totals = termScores.reduce((acc, scores) => {
+        const merged = {};
+        Object.keys(scores).forEach(docId => {
+          if (acc === null || docId in acc) {
+            merged[docId] = (acc ? acc[docId] : 0) + scores[docId];
+          }
+        });
+        return merged;
+      }, null);
+
+      return Object.keys(totals)
+        .map(docId => {
+          const doc = docs[docId];
+          return {
+            title: doc[0],
+            url: doc[1],
+            description: doc[2],
+            section: doc[3],
+            score: totals[docId]
+          };
+        })
+        .sort((a, b) => b.score - a.score)
+        .slice(0, limit || 20);
+    });
+  }
+
+  window.SiteSearch = {
+    search: search
+  };
+})();
@@ -53,6 +53,26 @@
     return depth > 0 ? '../'.repeat(depth) : '../';
   }
 
+  /**
+   * Check whether a script has already run or is already being added.
+   * Built pages load scripts under fingerprinted names (cart.<hash>.js) or
+   * inside bundles, so a page's own scripts are recognised by the global they
+   * define; scripts added here carry their unhashed path in data-src.
+   */
+  function hasScript(path, globalName) {
+    return Boolean(window[globalName]) || document.querySelector('script[data-src="' + path + '"]') !== null;
+  }
+
+  /**
+   * Create a script element for one of our scripts, marked for hasScript()
+   */
+  function createScript(src, path) {
+    const script = document.createElement('script');
+    script.src = src;
+    script.setAttribute('data-src', path);
+    return script;
+  }
+
   /**
    * Add cart scripts to page if not already present
    */
@@ -62,9 +82,8 @@
     // Wait for config to be available
     if (!window.AGROVERSE_CONFIG) {
       // Load config.js first if not present
-      if (!document.querySelector('script[src*="config.js"]')) {
-        const configJs = document.createElement('script');
-        configJs.src = baseUrl + 'js/config.js';
+      if (!hasScript('js/config.js', 'AGROVERSE_CONFIG')) {
+        const configJs = createScript(baseUrl + 'js/config.js', 'js/config.js');
         configJs.async = false; // Load synchronously
         document.head.appendChild(configJs);
         
@@ -88,33 +107,32 @@
       }
 
       // Add image-url-helper.js first (needed by cart-ui and order-history)
-      if (!document.querySelector('script[src*="image-url-helper.js"]') && !window.ImageUrlHelper) {
-        const imageHelperJs = document.createElement('script');
-        imageHelperJs.src = baseUrl + 'js/image-url-helper.js';
+      if (!hasScript('js/image-url-helper.js', 'ImageUrlHelper')) {
+        const imageHelperJs = createScript(baseUrl + 'js/image-url-helper.js', 'js/image-url-helper.js');
         imageHelperJs.async = false; // Load synchronously before cart-ui
         document.body.appendChild(imageHelperJs);
       }
 
-      // Add cart.css if not present
-      if (!document.querySelector('link[href*="cart.css"]')) {
+      // Add cart.css if not present (it sets --cart-css, also when fingerprinted or merged into a page sheet)
+      const cartCssPresent = getComputedStyle(document.documentElement).getPropertyValue('--cart-css').trim() !== '';
+      if (!cartCssPresent && !document.querySelector('link[data-href="css/cart.css"]')) {
         const cartCss = document.createElement('link');
         cartCss.rel = 'stylesheet';
         cartCss.href = baseUrl + 'css/cart.css';
+        cartCss.setAttribute('data-href', 'css/cart.css');
         document.head.appendChild(cartCss);
       }
 
       // Add cart.js if not present
-      if (!document.querySelector('script[src*="cart.js"]') && !window.Cart) {
-        const cartJs = document.createElement('script');
-        cartJs.src = baseUrl + 'js/cart.js';
+      if (!hasScript('js/cart.js', 'Cart')) {
+        const cartJs = createScript(baseUrl + 'js/cart.js', 'js/cart.js');
         cartJs.async = true;
         document.body.appendChild(cartJs);
       }
 
       // Add cart-ui.js if not present
-      if (!document.querySelector('script[src*="cart-ui.js"]') && !window.CartUI) {
-        const cartUIJs = document.createElement('script');
-        cartUIJs.src = baseUrl + 'js/cart-ui.js';
+      if (!hasScript('js/cart-ui.js', 'CartUI')) {
+        const cartUIJs = createScript(baseUrl + 'js/cart-ui.js', 'js/cart-ui.js');
         cartUIJs.async = false; // Load synchronously to ensure it's ready
         document.body.appendChild(cartUIJs);
         
@@ -140,8 +158,7 @@
     if (!window.OrderHistory) {
       // Try to load order-history.js if not present
       const baseUrl = getBaseUrl();
-      if (!document.querySelector('script[src*="order-history.js"]')) {
-        const orderHistoryJs = document.createElement('script');
+      if (!hasScript('js/order-history.js', 'OrderHistory')) {
         // Handle file:// URLs and relative paths
         let scriptPath = baseUrl + 'js/order-history.js';
         if (window.location.protocol === 'file:') {
@@ -150,7 +167,7 @@
             scriptPath = '../../js/order-history.js';
           }
         }
-        orderHistoryJs.src = scriptPath;
+        const orderHistoryJs = createScript(scriptPath, 'js/order-history.js');
         orderHistoryJs.async = true;
         // Suppress errors if file doesn't exist
         orderHistoryJs.onerror = function() {
@@ -373,7 +390,12 @@
   }
 
   // Also try after a short delay to catch dynamically loaded content
-  setTimeout(initUniversalNav, 500);
+  // (while the page is still parsing, its own scripts have not run yet: DOMContentLoaded covers that)
+  setTimeout(function() {
+    if (document.readyState !== 'loading') {
+      initUniversalNav();
+    }
+  }, 500);
 
 })();
 
@@ -2,6 +2,8 @@
 """
 Add Google Analytics tag to all HTML files in the agroverse_shop directory.
 This script will add the GA tag to the <head> section of all HTML files.
+The optimized build (scripts/build_site.py) replaces it with a loader that
+fetches gtag.js after the page has rendered - see defer_analytics.py.
 """
 
 import os
@@ -3,69 +3,14 @@
 Add Previous/Next navigation to blog posts, farms, and shipments.
 """
 
-import re
 from pathlib import Path
 from bs4 import BeautifulSoup
+from site_model import get_blog_post_order, get_farm_order, get_shipment_order
 
 BASE_DIR = Path(__file__).parent.parent
 POSTS_DIR = BASE_DIR / "post"
 FARMS_DIR = BASE_DIR / "farms"
 SHIPMENTS_DIR = BASE_DIR / "shipments"
-BLOG_INDEX = BASE_DIR / "blog" / "index.html"
-
-
-def get_blog_post_order():
-    """Extract the order of blog posts from blog index page."""
-    if not BLOG_INDEX.exists():
-        return []
-    
-    try:
-        with open(BLOG_INDEX, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f.read(), 'html.parser')
-        
-        blog_cards = soup.find_all('article', class_='blog-card')
-        post_order = []
-        
-        for card in blog_cards:
-            link = card.find('a', class_='blog-card-link')
-            if link:
-                href = link.get('href', '')
-                # Extract slug from href like ../post/slug/
-                match = re.search(r'\.\./post/([^/]+)/', href)
-                if match:
-                    post_order.append(match.group(1))
-        
-        return post_order
-    except Exception as e:
-        print(f"Error reading blog index: {e}")
-        return []
-
-
-def get_farm_order():
-    """Get ordered list of farms (alphabetical by directory name)."""
-    if not FARMS_DIR.exists():
-        return []
-    
-    farms = sorted([d.name for d in FARMS_DIR.iterdir() if d.is_dir()])
-    return farms
-
-
-def get_shipment_order():
-    """Get ordered list of shipments (sorted by number in aglN format)."""
-    if not SHIPMENTS_DIR.exists():
-        return []
-    
-    shipments = []
-    for d in SHIPMENTS_DIR.iterdir():
-        if d.is_dir() and d.name.startswith('agl'):
-            # Extract number from aglN
-            match = re.search(r'agl(\d+)', d.name)
-            if match:
-                shipments.append((int(match.group(1)), d.name))
-    
-    # Sort by number (newest first - higher numbers first)
-    shipments.sort(key=lambda x: x[0], reverse=True)
-    return [s[1] for s in shipments]
 
 
 def add_blog_navigation(post_path, post_order):
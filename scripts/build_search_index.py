@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Build a prebuilt, sharded client-side search index for the site.
+
+Walks the content sections (blog posts, product pages, partners, farms and
+events), extracts titles, descriptions and body text, and writes a compact
+inverted index to search/. Terms are sharded by their first two characters so
+js/site-search.js only fetches the shards needed for the words being typed;
+prefix matching happens inside the shard.
+
+Output layout:
+    search/manifest.json        - shard list, document count, index version
+    search/docs.json            - [title, url, description, section] per document
+    search/shards/<prefix>.json - {term: [docId, score, docId, score, ...]}
+
+Usage:
+    python3 scripts/build_search_index.py
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from bs4 import BeautifulSoup
+
+BASE_DIR = Path(__file__).parent.parent
+SEARCH_DIR = BASE_DIR / "search"
+SHARDS_DIR = SEARCH_DIR / "shards"
+
+# Section directory -> label shown in search results
+SECTIONS = {
+    'post': 'Blog',
+    'product-page': 'Products',
+    'partners': 'Partners',
+    'farms': 'Farms',
+    'event-details-registration': 'Gatherings',
+}
+
+# Shard terms by this many leading characters
+SHARD_PREFIX_LENGTH = 2
+
+# Field weights used when scoring a term for a document
+TITLE_WEIGHT = 10
+DESCRIPTION_WEIGHT = 3
+BODY_WEIGHT = 1
+
+# Body text beyond this many characters adds little to recall
+MAX_BODY_CHARS = 20000
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has',
+    'have', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'our', 'that', 'the',
+    'their', 'this', 'to', 'was', 'we', 'were', 'will', 'with', 'you', 'your',
+    'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'o', 'os', 'um', 'uma',
+}
+
+
+def normalize_text(text):
+    """Lowercase text and strip accents so 'Pará' and 'para' match."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Split text into normalized search terms."""
+    terms = re.findall(r'[a-z0-9]+', normalize_text(text))
+    return [t for t in terms if len(t) > 1 and t not in STOPWORDS]
+
+
+def shard_key(term):
+    """Return the shard name a term belongs to."""
+    return term[:SHARD_PREFIX_LENGTH]
+
+
+def extract_page_metadata(page_dir, section):
+    """Extract searchable metadata from a page HTML file."""
+    index_file = page_dir / "index.html"
+    if not index_file.exists():
+        return None
+
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+    except Exception as e:
+        print(f"Error reading {index_file}: {e}")
+        return None
+
+    # Extract title
+    title_tag = soup.find('title')
+    title = title_tag.get_text().strip() if title_tag else ''
+    # Remove " | Agroverse" suffix
+    title = re.sub(r'\s*\|\s*Agroverse.*$', '', title, flags=re.IGNORECASE)
+    if not title:
+        h1 = soup.find('h1')
+        title = h1.get_text(strip=True) if h1 else page_dir.name
+
+    # Extract description
+    meta_desc = soup.find('meta', {'name': 'description'}) or soup.find('meta', property='og:description')
+    description = meta_desc.get('content', '').strip() if meta_desc else ''
+
+    # Extract body text, skipping chrome that repeats on every page
+    for tag in soup(['script', 'style', 'noscript', 'header', 'nav', 'footer']):
+        tag.decompose()
+    body = soup.find('main') or soup.body or soup
+    body_text = ' '.join(body.get_text(' ').split())[:MAX_BODY_CHARS]
+
+    return {
+        'title': title,
+        'description': description,
+        'body': body_text,
+        'section': SECTIONS[section],
+        'url': f'/{section}/{page_dir.name}/'
+    }
+
+
+def collect_pages():
+    """Collect metadata for every page in the searchable sections."""
+    pages = []
+    for section in SECTIONS:
+        section_dir = BASE_DIR / section
+        if not section_dir.exists():
+            continue
+        for page_dir in sorted(section_dir.iterdir()):
+            if page_dir.is_dir():
+                metadata = extract_page_metadata(page_dir, section)
+                if metadata:
+                    pages.append(metadata)
+    return pages
+
+
+def build_index(pages):
+    """Build the inverted index: term -> {docId: score}."""
+    index = defaultdict(dict)
+    fields = (('title', TITLE_WEIGHT), ('description', DESCRIPTION_WEIGHT), ('body', BODY_WEIGHT))
+
+    for doc_id, page in enumerate(pages):
+        scores = defaultdict(int)
+        for field, weight in fields:
+            for term in tokenize(page[field]):
+                scores[term] += weight
+        for term, score in scores.items():
+            index[term][doc_id] = score
+
+    return index
+
+
+def build_shards(index):
+    """Group index terms into shards with flattened, score-ordered postings."""
+    shards = defaultdict(dict)
+    for term in sorted(index):
+        postings = sorted(index[term].items(), key=lambda p: (-p[1], p[0]))
+        shards[shard_key(term)][term] = [value for posting in postings for value in posting]
+    return shards
+
+
+def to_json(data):
+    """Serialize compactly and deterministically so unchanged data is byte-identical."""
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+
+def write_if_changed(path, content):
+    """Write content only when it differs from what is on disk. Returns True if written."""
+    if path.exists() and path.read_text(encoding='utf-8') == content:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+    return True
+
+
+def write_index(pages, shards):
+    """Write docs, shards and manifest to the search directory."""
+    docs = [[p['title'], p['url'], p['description'], p['section']] for p in pages]
+    docs_json = to_json(docs)
+    shard_json = {name: to_json(terms) for name, terms in shards.items()}
+
+    # Version changes whenever any output changes, for cache busting
+    digest = hashlib.sha256(docs_json.encode('utf-8'))
+    for name in sorted(shard_json):
+        digest.update(name.encode('utf-8'))
+        digest.update(shard_json[name].encode('utf-8'))
+
+    manifest = {
+        'version': digest.hexdigest()[:12],
+        'documents': len(docs),
+        'prefixLength': SHARD_PREFIX_LENGTH,
+        'shards': sorted(shard_json),
+    }
+
+    written = 0
+    written += write_if_changed(SEARCH_DIR / "docs.json", docs_json)
+    for name, content in shard_json.items():
+        written += write_if_changed(SHARDS_DIR / f"{name}.json", content)
+    written += write_if_changed(SEARCH_DIR / "manifest.json", to_json(manifest))
+
+    # Remove shards for prefixes that no longer exist
+    removed = 0
+    for stale in SHARDS_DIR.glob('*.json'):
+        if stale.stem not in shard_json:
+            stale.unlink()
+            removed += 1
+
+    return manifest, written, removed
+
+
+def main():
+    """Build the search index."""
+    print("🔍 Building search index...")
+    pages = collect_pages()
+
+    if not pages:
+        print("❌ No pages found!")
+        return
+
+    index = build_index(pages)
+    shards = build_shards(index)
+    manifest, written, removed = write_index(pages, shards)
+
+    total_bytes = sum(f.stat().st_size for f in SEARCH_DIR.rglob('*.json'))
+    largest = max(SHARDS_DIR.glob('*.json'), key=lambda f: f.stat().st_size)
+
+    print(f"\n✅ Indexed {len(pages)} pages, {len(index)} terms in {len(shards)} shards")
+    print(f"   Version: {manifest['version']}")
+    print(f"   Files written: {written}, stale shards removed: {removed}")
+    print(f"   Total size: {total_bytes / 1024:.1f} KB (largest shard {largest.name}: {largest.stat().st_size / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
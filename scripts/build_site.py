@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Build the deployable site into _site/.
+
+Copies every published file from the repository into _site/ (files git
+tracks or would track, so .gitignore is honoured, minus dotfiles and repository
+tooling; only files whose mtime changed are copied again), then runs the build
+stages over the copy in order. Source pages are never modified, so they stay easy to edit; the
+optimized output is what gets deployed.
+
+Stages:
+    sprites       - partner logos packed into sprite sheets (sprite_logos.py)
+    bundle        - per-page script bundles, minified (bundle_scripts.py)
+    fonts         - Google Fonts replaced by subsetted self-hosted WOFF2 (self_host_fonts.py)
+    purge-css     - unused rules removed from inline styles (purge_css.py)
+    placeholders  - blurred placeholder + dominant colour under hero backgrounds (hero_placeholders.py)
+    critical-css  - inlined above-the-fold CSS, deferred stylesheets (critical_css.py)
+    og-cards      - 1200x630 social preview cards in og:image/twitter:image (og_cards.py)
+    recompress    - JPEG/PNG re-encoded at the smallest size that looks the same (recompress_images.py)
+    images        - image dimensions, lazy loading, hero priority (image_attributes.py)
+    fingerprint   - content-hashed asset names + rewritten references (fingerprint_assets.py)
+    analytics     - gtag.js loaded when the page is idle instead of during render (defer_analytics.py)
+    hints         - per-page preload/preconnect/dns-prefetch hints (resource_hints.py)
+
+Usage:
+    python3 scripts/build_site.py [--site-dir _site] [--skip STAGE ...]
+    python3 scripts/dev_server.py --root _site     # preview the build
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from bundle_scripts import BUNDLE_DIR, bundle_scripts
+from check_links import find_published_files
+from critical_css import PAGE_CSS_DIR, critical_css
+from defer_analytics import defer_analytics
+from fingerprint_assets import MANIFEST_NAME, fingerprint_assets, is_fingerprinted
+from hero_placeholders import hero_placeholders
+from image_attributes import image_attributes
+from og_cards import CARD_DIR, og_cards
+from purge_css import purge_css
+from recompress_images import recompress_images
+from resource_hints import resource_hints
+from self_host_fonts import FONT_DIR, self_host_fonts
+from sprite_logos import SPRITE_DIR, sprite_logos
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+
+# Repository tooling that is not part of the site
+EXCLUDED_FILES = {'package.json', 'package-lock.json'}
+EXCLUDED_SUFFIXES = ('.md', '.sh', '.bat')
+
+# Directories whose files are all written by build stages
+GENERATED_DIRS = (BUNDLE_DIR + '/', PAGE_CSS_DIR + '/', SPRITE_DIR + '/', CARD_DIR + '/', FONT_DIR + '/')
+
+# (name, stage function taking the build directory and returning a summary)
+STAGES = [
+    ('sprites', sprite_logos),
+    ('bundle', bundle_scripts),
+    ('fonts', self_host_fonts),
+    ('purge-css', purge_css),
+    ('placeholders', hero_placeholders),
+    ('critical-css', critical_css),
+    ('og-cards', og_cards),
+    ('recompress', recompress_images),
+    ('images', image_attributes),
+    ('fingerprint', fingerprint_assets),
+    ('analytics', defer_analytics),
+    ('hints', resource_hints),
+]
+
+
+def is_generated(rel_path):
+    """True for files created by build stages rather than copied from the source."""
+    return rel_path == MANIFEST_NAME or rel_path.startswith(GENERATED_DIRS) or is_fingerprinted(rel_path)
+
+
+def git_files():
+    """Files git tracks, plus untracked files it does not ignore (new pages not committed yet)."""
+    result = subprocess.run(['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+                            cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    return set(filter(None, result.stdout.split('\0')))
+
+
+def find_source_files():
+    """Site-relative paths of every file that belongs in the build."""
+    return {
+        rel_path for rel_path in find_published_files() & git_files()
+        if rel_path not in EXCLUDED_FILES and not rel_path.endswith(EXCLUDED_SUFFIXES)
+        and not any(part.startswith('.') for part in rel_path.split('/'))
+    }
+
+
+def sync_site(site_dir):
+    """Mirror source files into the build directory. Returns (copied, removed)."""
+    sources = find_source_files()
+    copied = 0
+    for rel_path in sorted(sources):
+        src = BASE_DIR / rel_path
+        dst = site_dir / rel_path
+        src_stat = src.stat()
+        if dst.exists():
+            dst_stat = dst.stat()
+            # Stages that rewrite a copy in place without keeping it in sync with the
+            # source (recompressed images) preserve its mtime, so only the mtime is compared
+            if dst_stat.st_mtime_ns == src_stat.st_mtime_ns:
+                continue
+            # Unlink first: stages may have hard-linked this file to a fingerprinted copy
+            dst.unlink()
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dst)
+        copied += 1
+
+    removed = 0
+    for root, dirs, files in os.walk(site_dir):
+        for name in files:
+            rel_path = os.path.relpath(os.path.join(root, name), site_dir).replace(os.sep, '/')
+            if rel_path not in sources and not is_generated(rel_path):
+                os.unlink(os.path.join(root, name))
+                removed += 1
+    return copied, removed
+
+
+def build_site(site_dir=SITE_DIR, skip=()):
+    """Sync the source into the build directory and run every stage."""
+    started = time.perf_counter()
+    site_dir.mkdir(parents=True, exist_ok=True)
+    copied, removed = sync_site(site_dir)
+    print(f"📁 Synced {site_dir.name}/: {copied} copied, {removed} removed")
+
+    for name, stage in STAGES:
+        if name in skip:
+            print(f"⏭️  {name}: skipped")
+            continue
+        stage_started = time.perf_counter()
+        summary = stage(site_dir)
+        print(f"✅ {name}: {summary} ({time.perf_counter() - stage_started:.2f}s)")
+
+    print(f"\n✅ Built {site_dir} in {time.perf_counter() - started:.2f}s")
+
+
+def main():
+    """Build the site."""
+    parser = argparse.ArgumentParser(description='Build the deployable site.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='output directory (default: _site)')
+    parser.add_argument('--skip', action='append', default=[], choices=[name for name, _ in STAGES],
+                        help='skip a stage (repeatable)')
+    args = parser.parse_args()
+    build_site(args.site_dir, args.skip)
+
+
+if __name__ == "__main__":
+    main()
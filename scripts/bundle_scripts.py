@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Bundle and minify each page's local scripts in the build output.
+
+Build stage run by build_site.py before fingerprinting. In every built page,
+each run of adjacent plain <script src="..."></script> tags (separated only by
+whitespace or comments) that load files from js/ is replaced by a single tag
+for a minified bundle of those files, in the same order. Inline scripts,
+external scripts and tags with async/defer/type attributes end a run, so
+execution order is exactly what it was.
+
+Pages that load the same scripts share one bundle (js/bundles/<id>.js, where
+the id is derived from the script list), and bundles are rebuilt only when one
+of their files changes (.cache/bundles.json). The fingerprint stage then gives
+bundles content-hashed names like any other script.
+
+A script a page already loads earlier in a run is not bundled again: a second
+copy would redeclare its top-level let/const and stop the whole bundle from
+parsing. Each bundle is syntax-checked with `node --check` when Node.js is
+installed; a bundle that fails keeps its original script tags.
+
+The minifier is deliberately conservative: it removes comments, indentation
+and redundant spaces but keeps line breaks wherever automatic semicolon
+insertion could depend on them.
+
+Usage:
+    python3 scripts/bundle_scripts.py [--site-dir _site]
+"""
+
+import argparse
+import hashlib
+import json
+import posixpath
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+from check_links import EXTERNAL_PREFIXES, reference_target
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+CACHE_FILE = BASE_DIR / ".cache" / "bundles.json"
+BUNDLE_DIR = "js/bundles"
+
+# A run of plain script tags with only whitespace or comments between them
+SCRIPT_TAG = r'<script src="[^"]+"></script>'
+SCRIPT_RUN_PATTERN = re.compile(r'%s(?:(?:\s|<!--(?:(?!-->).)*-->)*%s)*' % (SCRIPT_TAG, SCRIPT_TAG), re.S)
+SCRIPT_SRC_PATTERN = re.compile(r'<script src="([^"]+)"></script>')
+
+# After these keywords a "/" starts a regular expression, not a division
+REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+                  'throw', 'case', 'do', 'else', 'yield', 'await'}
+
+
+def is_word_char(char):
+    """True for characters that can be part of an identifier or number."""
+    return char.isalnum() or char in '_$\\' or ord(char) > 127
+
+
+def skip_string(source, i):
+    """Index just past the string literal starting at source[i]."""
+    quote = source[i]
+    i += 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == '\\' else 1
+    return i + 1
+
+
+def skip_template(source, i):
+    """Index just past the template literal starting at source[i], including nested ${...}."""
+    i += 1
+    while i < len(source) and source[i] != '`':
+        if source[i] == '\\':
+            i += 2
+        elif source.startswith('${', i):
+            i += 2
+            depth = 1
+            while i < len(source) and depth:
+                char = source[i]
+                if char in '\'"':
+                    i = skip_string(source, i)
+                    continue
+                if char == '`':
+                    i = skip_template(source, i)
+                    continue
+                depth += {'{': 1, '}': -1}.get(char, 0)
+                i += 1
+        else:
+            i += 1
+    return i + 1
+
+
+def skip_regex(source, i):
+    """Index just past the regular expression literal (and flags) starting at source[i]."""
+    i += 1
+    in_class = False
+    while i < len(source) and source[i] != '\n':
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            break
+        i += 1
+    i += 1
+    while i < len(source) and is_word_char(source[i]):
+        i += 1
+    return i
+
+
+def minify_js(source):
+    """Strip comments and redundant whitespace from JavaScript, keeping ASI-relevant newlines."""
+    out = []
+    prev = ''            # last emitted character
+    word = ''            # identifier or keyword ending at prev
+    after_regex = False  # prev closed a regex literal (a following letter would read as a flag)
+    pending = ''         # whitespace skipped since prev: '', ' ' or '\n'
+    i = 0
+    length = len(source)
+
+    def emit(text, next_char):
+        nonlocal pending
+        if pending == '\n' and prev and not (prev in '{;,([' or next_char in '})],;.'):
+            out.append('\n')
+        elif pending and prev and (
+                (is_word_char(prev) and is_word_char(next_char))
+                or (after_regex and is_word_char(next_char))
+                or (prev in '+-' and next_char == prev)
+                or (prev.isdigit() and next_char == '.')):
+            out.append(' ')
+        pending = ''
+        out.append(text)
+
+    while i < length:
+        char = source[i]
+        if char in ' \t\r\n\f\v\ufeff':
+            if char == '\n':
+                pending = '\n'
+            elif not pending:
+                pending = ' '
+            i += 1
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = length if end == -1 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            if '\n' in source[i:end]:
+                pending = '\n'
+            elif not pending:
+                pending = ' '
+            i = end
+            continue
+
+        if char in '\'"':
+            end = skip_string(source, i)
+        elif char == '`':
+            end = skip_template(source, i)
+        elif char == '/' and (not prev or prev in '(,=:[!&|?{};+-*%<>~^}' or word in REGEX_KEYWORDS):
+            end = skip_regex(source, i)
+            emit(source[i:end], char)
+            prev, word, after_regex = '/', '', True
+            i = end
+            continue
+        else:
+            continues_word = not pending and is_word_char(prev or ' ') and not after_regex
+            emit(char, char)
+            if is_word_char(char):
+                word = word + char if continues_word else char
+            else:
+                word = ''
+            prev, after_regex = char, False
+            i += 1
+            continue
+
+        emit(source[i:end], char)
+        prev, word, after_regex = char, '', False
+        i = end
+
+    return ''.join(out) + '\n'
+
+
+def load_cache():
+    """Load bundle signatures from previous builds."""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_cache(cache):
+    """Persist bundle signatures."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def bundle_name(members):
+    """Stable bundle path for an ordered list of scripts."""
+    digest = hashlib.sha1('\n'.join(members).encode('utf-8')).hexdigest()
+    return f"{BUNDLE_DIR}/{digest[:8]}.js"
+
+
+def syntax_error(source):
+    """node --check's error for a script, or None if it parses (or Node.js is not installed)."""
+    node = shutil.which('node')
+    if not node:
+        return None
+    result = subprocess.run([node, '--check', '-'], input=source, capture_output=True, text=True)
+    if result.returncode == 0:
+        return None
+    return next((line for line in result.stderr.splitlines() if 'Error' in line), 'syntax error')
+
+
+def build_bundle(site_dir, members, cache):
+    """Write the bundle for a script list unless an up-to-date one exists.
+
+    Returns its path; cache[path]['error'] is set if it does not parse and the scripts must stay separate.
+    """
+    name = bundle_name(members)
+    signatures = []
+    for rel_path in members:
+        stat = (site_dir / rel_path).stat()
+        signatures.append([stat.st_mtime_ns, stat.st_size])
+
+    entry = cache.get(name)
+    path = site_dir / name
+    if entry and entry['members'] == members and entry['signatures'] == signatures:
+        if entry.get('error') or path.exists():
+            return name
+
+    parts = []
+    for rel_path in members:
+        content = (site_dir / rel_path).read_text(encoding='utf-8')
+        # The ";" guards against a file that ends without a semicolon
+        parts.append(f"/* {rel_path} */\n{minify_js(content)};")
+    bundle = '\n'.join(parts) + '\n'
+    error = syntax_error(bundle)
+    cache[name] = {'members': members, 'signatures': signatures}
+    if error:
+        cache[name]['error'] = error
+        print(f"  ⚠️  {name} ({', '.join(members)}) does not parse, scripts left unbundled: {error}")
+        if path.exists():
+            path.unlink()
+        return name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(bundle, encoding='utf-8')
+    return name
+
+
+def bundle_page(site_dir, rel_path, content, cache, used):
+    """Replace runs of local script tags in one page with bundles. Returns (content, tags_before, tags_after)."""
+    page_dir = posixpath.dirname(rel_path)
+    before = after = 0
+
+    loaded = set()
+
+    def bundle_tags(members, sources, absolute):
+        name = build_bundle(site_dir, members, cache)
+        used.add(name)
+        if cache[name].get('error'):
+            return [f'<script src="{src}"></script>' for src in sources]
+        src = '/' + name if absolute else posixpath.relpath(name, page_dir or '.')
+        return [f'<script src="{src}"></script>']
+
+    def replace(match):
+        nonlocal before, after
+        tags = []
+        members, sources = [], []
+        absolute = False
+        for src in SCRIPT_SRC_PATTERN.findall(match.group(0)):
+            target = None if src.lower().startswith(EXTERNAL_PREFIXES) else reference_target(rel_path, src)
+            if (target and target.endswith('.js') and not target.startswith(BUNDLE_DIR + '/')
+                    and (site_dir / target).is_file()):
+                # Loaded earlier on the page: running it again would redeclare its top-level bindings
+                if target in loaded:
+                    continue
+                loaded.add(target)
+                if not members:
+                    absolute = src.startswith('/')
+                members.append(target)
+                sources.append(src)
+                continue
+            # External, missing or already bundled scripts stay where they are and split the run
+            if members:
+                tags.extend(bundle_tags(members, sources, absolute))
+                members, sources = [], []
+            tags.append(f'<script src="{src}"></script>')
+        if members:
+            tags.extend(bundle_tags(members, sources, absolute))
+        before += len(SCRIPT_SRC_PATTERN.findall(match.group(0)))
+        after += len(tags)
+        return '\n'.join(tags)
+
+    return SCRIPT_RUN_PATTERN.sub(replace, content), before, after
+
+
+def bundle_scripts(site_dir=SITE_DIR):
+    """Bundle the scripts of every page in the build directory. Returns a summary."""
+    cache = load_cache()
+    used = set()
+    pages = 0
+    tags_before = tags_after = 0
+
+    for page in sorted(site_dir.rglob('*.html')):
+        rel_path = page.relative_to(site_dir).as_posix()
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        rewritten, before, after = bundle_page(site_dir, rel_path, content, cache, used)
+        tags_before += before
+        tags_after += after
+        if rewritten != content:
+            page.write_text(rewritten, encoding='utf-8')
+            pages += 1
+
+    # Drop bundles no page uses any more (fingerprinted copies are pruned by that stage)
+    bundle_dir = site_dir / BUNDLE_DIR
+    if bundle_dir.exists():
+        for path in bundle_dir.glob('*.js'):
+            name = f"{BUNDLE_DIR}/{path.name}"
+            if name in cache and name not in used:
+                path.unlink()
+    # Bundles that failed the syntax check stay cached so they are not checked again
+    cache = {name: entry for name, entry in cache.items() if name in used}
+    used = {name for name in used if not cache[name].get('error')}
+    save_cache(cache)
+
+    original = sum(
+        sum((site_dir / rel_path).stat().st_size for rel_path in cache[name]['members']) for name in used)
+    bundled = sum((site_dir / name).stat().st_size for name in used)
+    return (f"{len(used)} bundles, {tags_before} script tags -> {tags_after} in {pages} pages, "
+            f"{original / 1024:.0f} KB -> {bundled / 1024:.0f} KB of script")
+
+
+def main():
+    """Bundle scripts in an existing build directory."""
+    parser = argparse.ArgumentParser(description='Bundle and minify page scripts in the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    print(f"✅ {bundle_scripts(args.site_dir)}")
+
+
+if __name__ == "__main__":
+    main()
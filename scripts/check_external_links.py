@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Validate external links (RSVP pages, outbound article links, legacy redirect
+targets) concurrently and report dead ones grouped by page.
+
+Links are gathered from:
+- every page's href/src attributes pointing off-site
+- RSVP_URL_MAPPING in generate_event_pages.py (eventbrite/lu.ma URLs harvested
+  by extract_from_html already appear in the generated event pages)
+- external targets in js/legacy-redirects.js
+
+Each URL gets a HEAD request, falling back to GET when the server rejects HEAD.
+Requests run on asyncio with a global concurrency cap plus a per-host cap, and
+rate-limited responses (429/503) are retried with exponential backoff. Results
+are cached in .cache/external_links.json: good links for --ttl-hours, failures
+for FAILURE_TTL_HOURS.
+
+The HTTP client is plain asyncio streams, so no extra packages are needed and
+any local HTTP server can stand in for real hosts:
+
+    python3 -m http.server 8765 &
+    python3 scripts/check_external_links.py --no-cache --url http://127.0.0.1:8765/ --url http://127.0.0.1:8765/missing
+
+Usage:
+    python3 scripts/check_external_links.py [--ttl-hours 168] [--no-cache] [--url URL ...]
+"""
+
+import argparse
+import asyncio
+import html
+import json
+import re
+import ssl
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import quote, urljoin, urlsplit
+
+from check_links import ATTR_PATTERN, DYNAMIC_MARKERS, find_published_files, find_sources
+
+BASE_DIR = Path(__file__).parent.parent
+CACHE_FILE = BASE_DIR / ".cache" / "external_links.json"
+LEGACY_REDIRECTS_JS = BASE_DIR / "js" / "legacy-redirects.js"
+
+# Our own domain is covered by check_links.py
+OWN_HOSTS = {'www.agroverse.shop', 'agroverse.shop'}
+
+MAX_CONCURRENCY = 20
+PER_HOST_CONCURRENCY = 2
+REQUEST_TIMEOUT = 15
+MAX_REDIRECTS = 5
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+
+DEFAULT_TTL_HOURS = 7 * 24
+FAILURE_TTL_HOURS = 6
+
+USER_AGENT = 'Mozilla/5.0 (compatible; AgroverseLinkChecker/1.0; +https://www.agroverse.shop)'
+
+# Servers that reject or mishandle HEAD answer with one of these; retry with GET
+HEAD_FALLBACK_STATUSES = {400, 403, 404, 405, 501}
+RETRY_STATUSES = {429, 503}
+# Bot walls: the page probably works for people, so report separately
+BLOCKED_STATUSES = {401, 403, 429, 999}
+
+PRECONNECT_PATTERN = re.compile(r'<link\b[^>]*\brel="(?:preconnect|dns-prefetch)"[^>]*>')
+HREF_PATTERN = re.compile(r'\bhref="([^"]*)"')
+REDIRECT_TARGET_PATTERN = re.compile(r"'(/[^']*)':\s*'(https?://[^']+)'")
+
+
+def normalize_external(value):
+    """Return an absolute http(s) URL without fragment, or None if not external."""
+    value = html.unescape(value.strip())
+    if value.startswith('//'):
+        value = 'https:' + value
+    if not value.startswith(('http://', 'https://')) or any(m in value for m in DYNAMIC_MARKERS):
+        return None
+    url = value.split('#', 1)[0]
+    host = urlsplit(url).hostname or ''
+    return None if host in OWN_HOSTS or not host else url
+
+
+def collect_page_links():
+    """Map each page to the external URLs it references."""
+    page_links = defaultdict(set)
+    for rel_path in find_sources(find_published_files()):
+        if not rel_path.endswith('.html'):
+            continue
+        content = (BASE_DIR / rel_path).read_text(encoding='utf-8', errors='ignore')
+        # Preconnect hints point at bare origins that are not meant to be fetched
+        hints = {m.group(1) for tag in PRECONNECT_PATTERN.findall(content) for m in HREF_PATTERN.finditer(tag)}
+        for match in ATTR_PATTERN.finditer(content):
+            value = match.group(2) if match.group(2) is not None else match.group(3)
+            if value in hints:
+                continue
+            candidates = [c.strip().split(' ')[0] for c in value.split(',')] if match.group(1) == 'srcset' else [value]
+            for candidate in candidates:
+                url = normalize_external(candidate)
+                if url:
+                    page_links[rel_path].add(url)
+    return page_links
+
+
+def collect_rsvp_links():
+    """RSVP targets configured for event pages."""
+    from generate_event_pages import RSVP_URL_MAPPING
+    return {f"event-details-registration/{slug}/index.html": {url} for slug, url in RSVP_URL_MAPPING.items()}
+
+
+def collect_redirect_links():
+    """External targets of the legacy redirect map, keyed by legacy path."""
+    if not LEGACY_REDIRECTS_JS.exists():
+        return {}
+    content = LEGACY_REDIRECTS_JS.read_text(encoding='utf-8')
+    page_links = defaultdict(set)
+    for path, url in REDIRECT_TARGET_PATTERN.findall(content):
+        page_links[f"js/legacy-redirects.js ({path})"].add(url)
+    return page_links
+
+
+def collect_links():
+    """Gather every external URL, grouped by the page (or source) referencing it."""
+    page_links = defaultdict(set)
+    for source in (collect_page_links(), collect_rsvp_links(), collect_redirect_links()):
+        for page, urls in source.items():
+            page_links[page].update(urls)
+    return page_links
+
+
+async def request_status(url, method, timeout):
+    """Send a single request and return (status, headers) without reading the body."""
+    parts = urlsplit(url)
+    secure = parts.scheme == 'https'
+    port = parts.port or (443 if secure else 80)
+    host = parts.hostname.encode('idna').decode('ascii')
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    # Percent-encode non-ASCII characters (e.g. accented place names in map links)
+    path = quote(path, safe="/%?&=+:@;,!$'()*~")
+    host_header = host if parts.port is None else f"{host}:{parts.port}"
+
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port, ssl=ssl.create_default_context() if secure else None,
+                                server_hostname=host if secure else None),
+        timeout)
+    try:
+        writer.write((
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {host_header}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            f"Accept: */*\r\n"
+            f"Connection: close\r\n\r\n"
+        ).encode('ascii'))
+        await writer.drain()
+
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        status_parts = status_line.decode('latin-1').split()
+        if len(status_parts) < 2 or not status_parts[1].isdigit():
+            raise ConnectionError(f"invalid response: {status_line[:60]!r}")
+        status = int(status_parts[1])
+
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return status, headers
+    finally:
+        writer.close()
+
+
+def retry_delay(headers, attempt):
+    """Seconds to wait before retrying a rate-limited request."""
+    retry_after = headers.get('retry-after', '')
+    if retry_after.isdigit():
+        return min(float(retry_after), MAX_BACKOFF_SECONDS)
+    return min(BACKOFF_SECONDS * (2 ** attempt), MAX_BACKOFF_SECONDS)
+
+
+def classify(status, error):
+    """Bucket a result: ok, blocked (bot wall / rate limit), dead or error."""
+    if status is not None and 200 <= status < 400:
+        return 'ok'
+    if status in BLOCKED_STATUSES:
+        return 'blocked'
+    if status in (404, 410) or (error and ('Name or service not known' in error or 'nodename' in error)):
+        return 'dead'
+    return 'error'
+
+
+async def check_url(url, limits, timeout):
+    """Check one URL, following redirects, with HEAD->GET fallback and backoff."""
+    global_limit, host_limits = limits
+    current = url
+    status, error = None, None
+
+    for _ in range(MAX_REDIRECTS + 1):
+        host = urlsplit(current).hostname or ''
+        method = 'HEAD'
+        attempt = 0
+        while True:
+            try:
+                # Per-host slot first: requests queued behind a busy host must not hold global slots
+                async with host_limits[host], global_limit:
+                    status, headers = await request_status(current, method, timeout)
+                error = None
+            except (OSError, asyncio.TimeoutError, ConnectionError, ValueError, ssl.SSLError) as e:
+                status, headers, error = None, {}, str(e) or e.__class__.__name__
+                if method == 'HEAD':
+                    method = 'GET'
+                    continue
+                break
+
+            if method == 'HEAD' and status in HEAD_FALLBACK_STATUSES:
+                method = 'GET'
+                continue
+            if status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                await asyncio.sleep(retry_delay(headers, attempt))
+                attempt += 1
+                continue
+            break
+
+        location = headers.get('location')
+        if status is not None and 300 <= status < 400 and location:
+            current = urljoin(current, location)
+            continue
+        break
+
+    return {
+        'status': status,
+        'result': classify(status, error),
+        'final_url': current if current != url else None,
+        'error': error,
+        'checked': int(time.time()),
+    }
+
+
+async def check_urls(urls, timeout=REQUEST_TIMEOUT, concurrency=MAX_CONCURRENCY, per_host=PER_HOST_CONCURRENCY):
+    """Check many URLs concurrently. Returns {url: result}."""
+    limits = (asyncio.Semaphore(concurrency), defaultdict(lambda: asyncio.Semaphore(per_host)))
+    urls = sorted(urls)
+    results = await asyncio.gather(*(check_url(url, limits, timeout) for url in urls))
+    return dict(zip(urls, results))
+
+
+def load_cache():
+    """Load cached results from previous runs."""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_cache(cache):
+    """Persist results."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def is_fresh(result, ttl_hours):
+    """True if a cached result is still within its TTL."""
+    hours = ttl_hours if result['result'] == 'ok' else min(ttl_hours, FAILURE_TTL_HOURS)
+    return time.time() - result['checked'] < hours * 3600
+
+
+def print_report(page_links, results):
+    """Print problems grouped by page. Returns counts per result bucket."""
+    counts = defaultdict(int)
+    for url, result in results.items():
+        counts[result['result']] += 1
+
+    for page in sorted(page_links):
+        problems = [url for url in sorted(page_links[page]) if results[url]['result'] != 'ok']
+        if not problems:
+            continue
+        print(f"\n📄 {page}")
+        for url in problems:
+            result = results[url]
+            icon = '⚠️ ' if result['result'] == 'blocked' else '❌'
+            detail = result['status'] if result['status'] is not None else result['error']
+            print(f"   {icon} [{detail}] {url}")
+    return counts
+
+
+def main():
+    """Validate external links."""
+    parser = argparse.ArgumentParser(description='Validate external links concurrently.')
+    parser.add_argument('--url', action='append', help='check only these URLs (repeatable)')
+    parser.add_argument('--ttl-hours', type=float, default=DEFAULT_TTL_HOURS,
+                        help=f'reuse successful results for this long (default: {DEFAULT_TTL_HOURS})')
+    parser.add_argument('--no-cache', action='store_true', help='ignore and do not update the result cache')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY, help='maximum requests in flight')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_CONCURRENCY, help='maximum requests per host')
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT, help='per-request timeout in seconds')
+    args = parser.parse_args()
+
+    page_links = {'command line': set(args.url)} if args.url else collect_links()
+    all_urls = set().union(*page_links.values()) if page_links else set()
+
+    cache = {} if args.no_cache else load_cache()
+    results = {url: cache[url] for url in all_urls if url in cache and is_fresh(cache[url], args.ttl_hours)}
+    pending = all_urls - set(results)
+
+    print(f"🔗 {len(all_urls)} external URLs on {len(page_links)} pages "
+          f"({len(results)} cached, {len(pending)} to check)")
+
+    started = time.perf_counter()
+    checked = asyncio.run(check_urls(pending, args.timeout, args.concurrency, args.per_host)) if pending else {}
+    results.update(checked)
+    elapsed = time.perf_counter() - started
+
+    # Every request failing before an HTTP response means we are offline, not that the links are dead
+    if len(checked) > 1 and all(result['status'] is None for result in checked.values()):
+        print(f"\n❌ None of the {len(checked)} URLs could be reached - check the network connection")
+        print(f"   First error: {next(iter(checked.values()))['error']}")
+        return 1
+
+    if not args.no_cache:
+        cache.update({url: results[url] for url in pending})
+        save_cache(cache)
+
+    counts = print_report(page_links, results)
+    print(f"\n{'❌' if counts['dead'] else '✅'} ok: {counts['ok']}, dead: {counts['dead']}, "
+          f"errors: {counts['error']}, blocked: {counts['blocked']} (checked in {elapsed:.1f}s)")
+    return 1 if counts['dead'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
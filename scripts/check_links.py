@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Check internal links and asset references across the site without a server.
+
+Builds the set of every published file, then resolves each href, src, srcset
+and CSS url() in every page (and stylesheet) against it, the way a static host
+would: "dir/" and "dir" both serve dir/index.html. Broken references are
+reported with file and line. External URLs are left to check_external_links.py.
+
+References extracted from a page are cached in .cache/link_check.json keyed by
+the page's size and mtime, so unchanged pages are not re-scanned; resolution
+always runs against the current file set, so deleted targets are still caught.
+
+Usage:
+    python3 scripts/check_links.py          # exits 1 if anything is broken
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote
+
+BASE_DIR = Path(__file__).parent.parent
+CACHE_FILE = BASE_DIR / ".cache" / "link_check.json"
+
+# Below this many files to scan, worker start-up costs more than it saves
+PARALLEL_MIN_FILES = 200
+
+# Bump when extraction rules change so cached references are rebuilt
+CACHE_VERSION = 1
+
+# Directories that are not published or hold no pages
+EXCLUDED_DIRS = {'scripts', 'node_modules', 'docs', 'google-app-script', '_site'}
+
+# Case-sensitive and without a leading \b: both defeat the regex engine's
+# first-character scan and make extraction several times slower. Our pages
+# are written with lowercase attribute names.
+ATTR_PATTERN = re.compile(r'(href|src|srcset|poster|data-src)=(?:"([^"]*)"|\'([^\']*)\')')
+CSS_URL_PATTERN = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+
+# Schemes and prefixes that do not point at files in this repository
+EXTERNAL_PREFIXES = ('http://', 'https://', '//', 'mailto:', 'tel:', 'sms:', 'javascript:', 'data:', '#', 'about:')
+
+# Values built at runtime by inline scripts (template literals, concatenation)
+DYNAMIC_MARKERS = ('${', '{{', '\' +', '" +', '+ \'', '+ "')
+
+
+def find_published_files():
+    """Return the set of every published file path, relative to the site root."""
+    published = set()
+    for root, dirs, files in os.walk(BASE_DIR):
+        rel_root = os.path.relpath(root, BASE_DIR)
+        if rel_root == '.':
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS and not d.startswith('.')]
+            rel_root = ''
+        else:
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            published.add(f"{rel_root}/{name}".lstrip('/').replace(os.sep, '/'))
+    return published
+
+
+def find_sources(published):
+    """Pages and stylesheets to scan."""
+    return sorted(path for path in published if path.endswith(('.html', '.css')))
+
+
+def extract_references(rel_path):
+    """Extract (line, kind, value) for every local reference in a page or stylesheet."""
+    content = (BASE_DIR / rel_path).read_text(encoding='utf-8', errors='ignore')
+    found = []
+
+    def add(offset, kind, value):
+        value = value.strip()
+        if not value or value.lower().startswith(EXTERNAL_PREFIXES) or any(m in value for m in DYNAMIC_MARKERS):
+            return
+        found.append((offset, kind, value))
+
+    if rel_path.endswith('.html'):
+        for match in ATTR_PATTERN.finditer(content):
+            kind = match.group(1).lower()
+            group = 2 if match.group(2) is not None else 3
+            if kind == 'srcset':
+                for candidate in match.group(group).split(','):
+                    add(match.start(group), kind, candidate.strip().split(' ')[0])
+            else:
+                add(match.start(group), kind, match.group(group))
+
+    for match in CSS_URL_PATTERN.finditer(content):
+        add(match.start(2), 'url()', match.group(2))
+
+    # Convert offsets to line numbers with one forward pass
+    references = []
+    line, position = 1, 0
+    for offset, kind, value in sorted(found):
+        line += content.count('\n', position, offset)
+        position = offset
+        references.append([line, kind, value])
+    return references
+
+
+def reference_target(source, value):
+    """Site-relative path a local reference points at, or None if it leaves the site."""
+    path = unquote(value.split('#', 1)[0].split('?', 1)[0])
+    if path.startswith('/'):
+        return path.lstrip('/')
+    target = os.path.normpath(os.path.join(os.path.dirname(source), path)).replace(os.sep, '/')
+    if target.startswith('..'):
+        return None
+    return '' if target == '.' else target
+
+
+def resolve_reference(source, value, published):
+    """Return True if a reference from source resolves to a published file."""
+    if not value.split('#', 1)[0].split('?', 1)[0]:
+        return True
+
+    target = reference_target(source, value)
+    if target is None:
+        return False
+    if target.endswith('/') or target == '':
+        return f"{target.rstrip('/')}/index.html".lstrip('/') in published
+    return target in published or f"{target}/index.html" in published
+
+
+def load_cache():
+    """Load cached references from the previous run."""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception:
+        return {}
+    return cache.get('pages', {}) if cache.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(pages):
+    """Persist extracted references."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'pages': pages}, f, separators=(',', ':'))
+
+
+def collect_references(sources, cache):
+    """Extract references for every source, reusing cache entries for unchanged files."""
+    pages = {}
+    stale = []
+    for rel_path in sources:
+        stat = (BASE_DIR / rel_path).stat()
+        signature = [stat.st_mtime_ns, stat.st_size]
+        cached = cache.get(rel_path)
+        if cached and cached['signature'] == signature:
+            pages[rel_path] = cached
+        else:
+            stale.append((rel_path, signature))
+
+    paths = [rel_path for rel_path, _ in stale]
+    if len(paths) >= PARALLEL_MIN_FILES and (os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(extract_references, paths, chunksize=32))
+    else:
+        results = [extract_references(rel_path) for rel_path in paths]
+
+    for (rel_path, signature), references in zip(stale, results):
+        pages[rel_path] = {'signature': signature, 'references': references}
+
+    return pages, len(stale)
+
+
+def check_links(pages, published):
+    """Return broken references as (source, line, kind, value) tuples."""
+    broken = []
+    for source in sorted(pages):
+        for line, kind, value in pages[source]['references']:
+            if not resolve_reference(source, value, published):
+                broken.append((source, line, kind, value))
+    return broken
+
+
+def main():
+    """Check every internal reference on the site."""
+    started = time.perf_counter()
+    published = find_published_files()
+    sources = find_sources(published)
+
+    pages, scanned = collect_references(sources, load_cache())
+    if scanned:
+        save_cache(pages)
+    broken = check_links(pages, published)
+
+    elapsed = (time.perf_counter() - started) * 1000
+    total = sum(len(page['references']) for page in pages.values())
+
+    for source, line, kind, value in broken:
+        print(f"{source}:{line}: broken {kind} -> {value}")
+
+    print(f"\n{'❌' if broken else '✅'} {len(broken)} broken of {total} references "
+          f"in {len(sources)} files ({scanned} scanned, {len(sources) - scanned} cached) in {elapsed:.0f} ms")
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Inline critical CSS and defer the rest of each page's styles in the build output.
+
+Build stage run by build_site.py after bundling. For every built page:
+
+1. The page's own CSS - its <style> blocks and local stylesheets, in document
+   order - is combined into one stylesheet, css/pages/<id>.css, shared by
+   every page with the same CSS. Local CSS that follows an external
+   stylesheet goes into a separate sheet placed after it.
+2. The above-the-fold markup (the header plus the first content blocks of
+   <body>) is matched against each rule; only rules that apply to it, plus
+   the @font-face and @keyframes rules they need, are inlined in a <style>.
+3. The full stylesheet and external stylesheets (Google Fonts, Leaflet) load
+   without blocking render (media="print" swapped to "all" on load, with a
+   <noscript> fallback).
+
+The full stylesheets repeat the inlined rules and keep the original order,
+including their place among the external stylesheets, so once they load the
+cascade is exactly what it was before, whichever sheet arrives first.
+
+Results are cached in .cache/critical_css.json per template: a hash of the
+page CSS and the tag/class/id skeleton of the above-the-fold markup, so
+pages built from the same template share one extraction and unchanged pages
+are not parsed again.
+
+Usage:
+    python3 scripts/critical_css.py [--site-dir _site]
+"""
+
+import argparse
+import hashlib
+import json
+import posixpath
+import re
+from pathlib import Path
+
+from bs4 import BeautifulSoup, Tag
+
+from check_links import CSS_URL_PATTERN, EXTERNAL_PREFIXES, reference_target
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+CACHE_FILE = BASE_DIR / ".cache" / "critical_css.json"
+PAGE_CSS_DIR = "css/pages"
+
+# Bump when extraction rules change so cached templates are rebuilt
+CACHE_VERSION = 2
+
+# Top-level <body> blocks after the header that count as above the fold
+ABOVE_FOLD_BLOCKS = 2
+NON_CONTENT_TAGS = {'header', 'nav', 'script', 'style', 'noscript', 'template', 'link'}
+
+STYLE_OR_LINK_PATTERN = re.compile(r'<style(?: type="text/css")?>(.*?)</style>|<link\b[^>]*>', re.S)
+ATTRIBUTE_PATTERN = re.compile(r'([a-zA-Z-]+)="([^"]*)"')
+COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.S)
+
+# Pseudo-classes that depend on interaction; selectors are tested without
+# them and without pseudo-elements (::before) and vendor pseudos
+PSEUDO_PATTERN = re.compile(r'::?[a-zA-Z-]+(?:\([^)]*\))?')
+DYNAMIC_PSEUDO_CLASSES = {'hover', 'focus', 'focus-within', 'focus-visible', 'active', 'visited', 'target',
+                          'autofill', 'before', 'after', 'placeholder', 'selection', 'first-line', 'first-letter'}
+# Classes and ids a selector requires, ignoring :not(...) arguments and [attr] values
+REQUIRED_TOKEN_PATTERN = re.compile(r'([.#])(-?[_a-zA-Z][\w-]*)')
+OPTIONAL_PART_PATTERN = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+KEYFRAMES_PATTERN = re.compile(r'@(?:-webkit-)?keyframes\s+([\w-]+)')
+
+DEFER_ATTRIBUTES = ' media="print" onload="this.media=\'all\'"'
+
+
+def split_top_level(text, separator):
+    """Split on separator outside strings, parentheses and brackets."""
+    parts, depth, quote, start = [], 0, '', 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote and text[i - 1] != '\\':
+                quote = ''
+        elif char in '\'"':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def parse_css(text):
+    """Parse CSS into [(prelude, body)] nodes; body is None for @import-style statements
+    and a nested node list for @media/@supports/@keyframes blocks."""
+    nodes = []
+    i, length = 0, len(text)
+    while i < length:
+        start = i
+        quote = ''
+        while i < length:
+            char = text[i]
+            if quote:
+                if char == quote and text[i - 1] != '\\':
+                    quote = ''
+            elif char in '\'"':
+                quote = char
+            elif char in '{;':
+                break
+            i += 1
+        prelude = ' '.join(text[start:i].split())
+        if i >= length:
+            break
+        if text[i] == ';':
+            if prelude:
+                nodes.append((prelude, None))
+            i += 1
+            continue
+
+        depth, body_start = 1, i + 1
+        i += 1
+        while i < length and depth:
+            char = text[i]
+            if quote:
+                if char == quote and text[i - 1] != '\\':
+                    quote = ''
+            elif char in '\'"':
+                quote = char
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            i += 1
+        body = text[body_start:i - 1]
+        if prelude.startswith(('@media', '@supports', '@layer', '@container')) or KEYFRAMES_PATTERN.match(prelude):
+            nodes.append((prelude, parse_css(body)))
+        else:
+            nodes.append((prelude, body.strip()))
+    return nodes
+
+
+def compact_declaration(declaration):
+    """'color : red ' -> 'color:red'"""
+    name, _, value = declaration.partition(':')
+    return f"{name.strip()}:{' '.join(value.split())}" if value else ' '.join(declaration.split())
+
+
+def render_css(nodes):
+    """Serialize parsed nodes compactly."""
+    out = []
+    for prelude, body in nodes:
+        if body is None:
+            out.append(prelude + ';')
+        elif isinstance(body, list):
+            out.append(f"{prelude}{{{render_css(body)}}}")
+        else:
+            declarations = ';'.join(compact_declaration(d) for d in split_top_level(body, ';') if d.strip())
+            out.append(f"{prelude}{{{declarations}}}")
+    return ''.join(out)
+
+
+def strip_dynamic_pseudo(match):
+    """Drop pseudo-elements and interaction-dependent pseudo-classes from a selector."""
+    pseudo = match.group(0)
+    name = pseudo.lstrip(':').split('(', 1)[0]
+    if pseudo.startswith('::') or name.startswith('-') or name in DYNAMIC_PSEUDO_CLASSES:
+        return ''
+    return pseudo
+
+
+def selector_matches(selector, soup, present):
+    """True if a selector could apply to the markup (unparseable selectors count as matching)."""
+    for part in split_top_level(selector, ','):
+        simplified = PSEUDO_PATTERN.sub(strip_dynamic_pseudo, part).strip()
+        # Cheap rejection before running the selector engine
+        if any(token not in present for token in REQUIRED_TOKEN_PATTERN.findall(OPTIONAL_PART_PATTERN.sub('', simplified))):
+            continue
+        if simplified.endswith(('>', '+', '~')):
+            simplified += ' *'
+        try:
+            if soup.select_one(simplified or '*') is not None:
+                return True
+        except Exception:
+            return True
+    return False
+
+
+def select_critical(nodes, soup, present):
+    """Rules from nodes that apply to the markup, keeping at-rule structure. Returns (nodes, keyframes)."""
+    critical, keyframes = [], {}
+    for prelude, body in nodes:
+        if body is None:
+            if prelude.startswith('@import'):
+                critical.append((prelude, body))
+        elif KEYFRAMES_PATTERN.match(prelude):
+            keyframes[KEYFRAMES_PATTERN.match(prelude).group(1)] = (prelude, body)
+        elif isinstance(body, list):
+            children, nested_keyframes = select_critical(body, soup, present)
+            keyframes.update(nested_keyframes)
+            if children:
+                critical.append((prelude, children))
+        elif prelude.startswith('@font-face'):
+            critical.append((prelude, body))
+        elif not prelude.startswith('@') and selector_matches(prelude, soup, present):
+            critical.append((prelude, body))
+    return critical, keyframes
+
+
+def extract_critical(css, soup):
+    """Critical CSS for the above-the-fold markup in soup."""
+    present = set()
+    for tag in soup.find_all(True):
+        present.update(('.', name) for name in tag.get('class', []))
+        if tag.get('id'):
+            present.add(('#', tag['id']))
+    critical, keyframes = select_critical(parse_css(css), soup, present)
+    text = render_css(critical)
+    used = [node for name, node in keyframes.items() if re.search(r'\b%s\b' % re.escape(name), text)]
+    return text + render_css(used)
+
+
+def above_fold_markup(content):
+    """Markup of <html>/<body> with only the header and first content blocks of the body."""
+    soup = BeautifulSoup(content, 'html.parser')
+    if soup.body is None:
+        return soup
+    blocks = 0
+    for child in list(soup.body.children):
+        if blocks >= ABOVE_FOLD_BLOCKS:
+            child.extract()
+        elif isinstance(child, Tag) and child.name not in NON_CONTENT_TAGS and (child.contents or child.attrs.get('style')):
+            blocks += 1
+    if soup.head is not None:
+        soup.head.decompose()
+    return soup
+
+
+def skeleton(tag):
+    """Tag/id/class structure of markup, ignoring text and per-page attribute values."""
+    parts = []
+    for child in tag.children:
+        if isinstance(child, Tag):
+            attrs = ' '.join(f"{name}={child.get(name)}" for name in ('id', 'class', 'type', 'role') if child.get(name))
+            parts.append(f"<{child.name} {attrs}>{skeleton(child)}</{child.name}>")
+    return ''.join(parts)
+
+
+def canonical_urls(css, source):
+    """Rewrite local url()s relative to source into root-relative form."""
+    def replace(match):
+        value = match.group(2).strip()
+        if value.lower().startswith(EXTERNAL_PREFIXES) or value.startswith('/'):
+            return match.group(0)
+        target = reference_target(source, value)
+        return match.group(0) if target is None else f"url({match.group(1)}/{target}{match.group(1)})"
+    return CSS_URL_PATTERN.sub(replace, css)
+
+
+def relative_urls(css, directory):
+    """Rewrite root-relative url()s to be relative to directory (site-relative, '' for the root)."""
+    def replace(match):
+        value = match.group(2)
+        if not value.startswith('/') or value.startswith('//'):
+            return match.group(0)
+        return f"url({match.group(1)}{posixpath.relpath(value[1:], directory or '.')}{match.group(1)})"
+    return CSS_URL_PATTERN.sub(replace, css)
+
+
+def local_stylesheet(site_dir, rel_path, tag):
+    """Site-relative path of a local stylesheet link, or None for anything else."""
+    attrs = dict(ATTRIBUTE_PATTERN.findall(tag))
+    if attrs.get('rel') != 'stylesheet' or 'media' in attrs or not attrs.get('href'):
+        return None
+    if attrs['href'].lower().startswith(EXTERNAL_PREFIXES):
+        return None
+    target = reference_target(rel_path, attrs['href'])
+    return target if target and target.endswith('.css') and (site_dir / target).is_file() else None
+
+
+def is_external_stylesheet(tag):
+    """True for a render-blocking stylesheet link to another origin."""
+    attrs = dict(ATTRIBUTE_PATTERN.findall(tag))
+    return (attrs.get('rel') == 'stylesheet' and 'media' not in attrs
+            and attrs.get('href', '').lower().startswith(EXTERNAL_PREFIXES))
+
+
+def defer_external_stylesheets(content):
+    """Make external stylesheet links non-render-blocking."""
+    def replace(match):
+        tag = match.group(0)
+        if not is_external_stylesheet(tag):
+            return tag
+        deferred = tag[:-2] + DEFER_ATTRIBUTES + '/>' if tag.endswith('/>') else tag[:-1] + DEFER_ATTRIBUTES + '>'
+        return f"{deferred}<noscript>{tag}</noscript>"
+    return re.sub(r'<link\b[^>]*>', replace, content)
+
+
+def load_cache():
+    """Load cached template extractions."""
+    if not CACHE_FILE.exists():
+        return {'pages': {}, 'templates': {}}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception:
+        return {'pages': {}, 'templates': {}}
+    if cache.get('version') != CACHE_VERSION:
+        return {'pages': {}, 'templates': {}}
+    return cache
+
+
+def save_cache(cache):
+    """Persist template extractions."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    cache['version'] = CACHE_VERSION
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, separators=(',', ':'), sort_keys=True)
+
+
+def write_sheet(site_dir, css, used):
+    """Write combined page CSS to css/pages/ (named by content hash). Returns its site-relative path."""
+    sheet_name = f"{PAGE_CSS_DIR}/{hashlib.sha1(css.encode('utf-8')).hexdigest()[:8]}.css"
+    used['sheets'].add(sheet_name)
+    sheet = site_dir / sheet_name
+    sheet_css = relative_urls(css, PAGE_CSS_DIR) + '\n'
+    if not sheet.exists() or sheet.read_text(encoding='utf-8') != sheet_css:
+        sheet.parent.mkdir(parents=True, exist_ok=True)
+        sheet.write_text(sheet_css, encoding='utf-8')
+    return sheet_name
+
+
+def deferred_link(sheet_name, page_dir):
+    """Non-render-blocking link to a page stylesheet, with its <noscript> fallback."""
+    href = posixpath.relpath(sheet_name, page_dir or '.')
+    return (f'<link href="{href}" rel="stylesheet"{DEFER_ATTRIBUTES}/>'
+            f'<noscript><link href="{href}" rel="stylesheet"/></noscript>')
+
+
+def process_page(site_dir, rel_path, content, cache, used):
+    """Inline critical CSS and defer stylesheets in one page. Returns (content, critical bytes, full bytes).
+
+    Local CSS is combined in runs: an external stylesheet between two pieces of
+    local CSS starts a new run with its own sheet, so every sheet keeps its
+    place relative to the external ones and the cascade is unchanged.
+    """
+    page_dir = posixpath.dirname(rel_path)
+    if f'{PAGE_CSS_DIR}/' in content:
+        return content, 0, 0
+    runs, external_since = [], True
+    for match in STYLE_OR_LINK_PATTERN.finditer(content):
+        if match.group(0).startswith('<style'):
+            css = canonical_urls(COMMENT_PATTERN.sub('', match.group(1)), rel_path)
+        else:
+            if is_external_stylesheet(match.group(0)):
+                external_since = True
+                continue
+            stylesheet = local_stylesheet(site_dir, rel_path, match.group(0))
+            if not stylesheet:
+                continue
+            css = (site_dir / stylesheet).read_text(encoding='utf-8')
+            css = canonical_urls(COMMENT_PATTERN.sub('', css), stylesheet)
+        if external_since:
+            runs.append([])
+            external_since = False
+        runs[-1].append((match.span(), css))
+    if not runs:
+        return defer_external_stylesheets(content), 0, 0
+
+    run_css = [render_css(parse_css('\n'.join(css for _, css in items))) for items in runs]
+    full_css = '\n'.join(run_css)
+
+    # The page's CSS is part of the key: its linked stylesheets can change without the page changing
+    page_key = hashlib.sha1(f"{content}\0{full_css}".encode('utf-8')).hexdigest()
+    template = cache['pages'].get(page_key)
+    if template not in cache['templates']:
+        soup = above_fold_markup(content)
+        template_source = f"{full_css}\0{soup.html.attrs if soup.html else ''}\0{soup.body.attrs if soup.body else ''}\0{skeleton(soup)}"
+        template = hashlib.sha1(template_source.encode('utf-8')).hexdigest()[:16]
+        if template not in cache['templates']:
+            cache['templates'][template] = extract_critical(full_css, soup)
+        cache['pages'][page_key] = template
+    used['pages'].add(page_key)
+    used['templates'].add(template)
+    critical = relative_urls(cache['templates'][template], page_dir)
+
+    pieces, position = [], 0
+    for run, (items, css) in enumerate(zip(runs, run_css)):
+        for index, ((start, end), _) in enumerate(items):
+            pieces.append(content[position:start])
+            if index == 0:
+                if run == 0:
+                    pieces.append(f'<style>{critical}</style>\n')
+                pieces.append(deferred_link(write_sheet(site_dir, css, used), page_dir))
+            position = end
+    pieces.append(content[position:])
+    return defer_external_stylesheets(''.join(pieces)), len(critical), len(full_css)
+
+
+def critical_css(site_dir=SITE_DIR):
+    """Inline critical CSS in every page of the build directory. Returns a summary."""
+    cache = load_cache()
+    used = {'pages': set(), 'templates': set(), 'sheets': set()}
+    pages = critical_total = full_total = 0
+
+    for page in sorted(site_dir.rglob('*.html')):
+        rel_path = page.relative_to(site_dir).as_posix()
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        rewritten, critical, full = process_page(site_dir, rel_path, content, cache, used)
+        if rewritten != content:
+            page.write_text(rewritten, encoding='utf-8')
+            pages += 1
+        critical_total += critical
+        full_total += full
+
+    # Drop stylesheets no page uses any more (fingerprinted copies are pruned by that stage)
+    sheet_dir = site_dir / PAGE_CSS_DIR
+    if sheet_dir.exists():
+        for path in sheet_dir.glob('*.css'):
+            if re.fullmatch(r'[0-9a-f]{8}\.css', path.name) and f"{PAGE_CSS_DIR}/{path.name}" not in used['sheets']:
+                path.unlink()
+    cache['pages'] = {key: value for key, value in cache['pages'].items() if key in used['pages']}
+    cache['templates'] = {key: value for key, value in cache['templates'].items() if key in used['templates']}
+    save_cache(cache)
+
+    return (f"{pages} pages, {len(used['templates'])} templates, {len(used['sheets'])} stylesheets; "
+            f"{critical_total / 1024:.0f} KB critical of {full_total / 1024:.0f} KB page CSS inlined")
+
+
+def main():
+    """Inline critical CSS in an existing build directory."""
+    parser = argparse.ArgumentParser(description='Inline critical CSS and defer stylesheets in the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    print(f"✅ {critical_css(args.site_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Take Google Analytics off the critical path in the build output.
+
+Build stage run by build_site.py before hints. Every page carries the gtag
+snippet that add_google_analytics.py and the page templates insert: an async
+<script src=".../gtag/js"> that is fetched, parsed and run while the page is
+still rendering. In every page that has_google_analytics() recognises, the
+external tag is replaced by a small inline loader that injects it later,
+according to a strategy:
+
+- idle (default): once the page has loaded and the browser is idle
+  (requestIdleCallback, at most IDLE_TIMEOUT_MS), or on the first
+  interaction (pointer, key, scroll), whichever comes first;
+- interaction: only on the first interaction;
+- consent: only once the visitor has agreed. Call
+  window.grantAnalyticsConsent() from a consent banner; the choice is kept in
+  localStorage (CONSENT_KEY), so later pages load the tag straight away.
+
+The inline gtag()/dataLayer setup stays where it was, so gtag() calls made
+before the tag loads are queued and sent once it arrives. Pages are matched
+with has_google_analytics(), and loaders this stage wrote are recognised, so
+running it again, or with another strategy, replaces the loader instead of
+adding a second one.
+
+Usage:
+    python3 scripts/defer_analytics.py [--site-dir _site] [--strategy idle|interaction|consent]
+"""
+
+import argparse
+import re
+from pathlib import Path
+
+from add_google_analytics import has_google_analytics
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+
+DEFAULT_STRATEGY = 'idle'
+IDLE_TIMEOUT_MS = 5000
+CONSENT_KEY = 'agroverse-analytics-consent'
+
+# Shared by every strategy: inject gtag.js once, with the id from the loader's own tag
+LOAD_FUNCTION = """var id = document.currentScript.getAttribute('data-gtag-id'), loaded = false;
+  function load() {
+    if (loaded) return;
+    loaded = true;
+    var script = document.createElement('script');
+    script.async = true;
+    script.src = 'https://www.googletagmanager.com/gtag/js?id=' + id;
+    document.head.appendChild(script);
+  }"""
+ON_INTERACTION = """['pointerdown', 'keydown', 'scroll', 'touchstart'].forEach(function(type) {
+    addEventListener(type, load, {once: true, passive: true});
+  });"""
+
+LOADERS = {
+    'idle': f"""(function() {{
+  {LOAD_FUNCTION}
+  {ON_INTERACTION}
+  addEventListener('load', function() {{
+    if ('requestIdleCallback' in window) requestIdleCallback(load, {{timeout: {IDLE_TIMEOUT_MS}}});
+    else setTimeout(load, {IDLE_TIMEOUT_MS // 2});
+  }});
+}})();""",
+    'interaction': f"""(function() {{
+  {LOAD_FUNCTION}
+  {ON_INTERACTION}
+}})();""",
+    'consent': f"""(function() {{
+  {LOAD_FUNCTION}
+  window.grantAnalyticsConsent = function() {{
+    try {{ localStorage.setItem('{CONSENT_KEY}', 'granted'); }} catch (e) {{}}
+    load();
+  }};
+  try {{ if (localStorage.getItem('{CONSENT_KEY}') === 'granted') load(); }} catch (e) {{}}
+}})();""",
+}
+
+LOADER_COMMENTS = {
+    'idle': 'loaded once the page is idle or on first interaction',
+    'interaction': 'loaded on first interaction',
+    'consent': 'loaded after window.grantAnalyticsConsent()',
+}
+
+# The snippet add_google_analytics.py and the templates write: async gtag.js, then the inline setup
+SNIPPET_PATTERN = re.compile(
+    r'(?:<!-- Google tag \(gtag\.js\)[^>]*-->(\s*))?'
+    r'<script async src="https://www\.googletagmanager\.com/gtag/js\?id=([\w-]+)"></script>(\s*)(<script>.*?</script>)',
+    re.S)
+# A loader written by this stage (any strategy), with the comment before the setup script
+LOADER_PATTERN = re.compile(r'<!-- Google tag \(gtag\.js\)[^>]*-->(\s*)(<script>.*?</script>)\s*'
+                            r'<script data-analytics="\w+" data-gtag-id="([\w-]+)">.*?</script>', re.S)
+
+
+def loader(measurement_id, setup, strategy, indent):
+    """Comment, inline gtag setup and deferred loader replacing a snippet."""
+    return (f"<!-- Google tag (gtag.js), {LOADER_COMMENTS[strategy]} -->{indent}{setup}{indent}"
+            f'<script data-analytics="{strategy}" data-gtag-id="{measurement_id}">\n{LOADERS[strategy]}\n</script>')
+
+
+def defer_snippets(content, strategy):
+    """Content with gtag snippets (or loaders of another strategy) replaced by the strategy's loader."""
+    content = SNIPPET_PATTERN.sub(
+        lambda m: loader(m.group(2), m.group(4), strategy, m.group(1) or m.group(3) or '\n'), content)
+    return LOADER_PATTERN.sub(lambda m: loader(m.group(3), m.group(2), strategy, m.group(1)), content)
+
+
+def defer_analytics(site_dir=SITE_DIR, strategy=DEFAULT_STRATEGY):
+    """Defer Google Analytics in every page of the build directory. Returns a summary."""
+    pages = tagged = 0
+    for page in sorted(site_dir.rglob('*.html')):
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        if not has_google_analytics(content):
+            continue
+        tagged += 1
+        rewritten = defer_snippets(content, strategy)
+        if rewritten != content:
+            page.write_text(rewritten, encoding='utf-8')
+            pages += 1
+    return (f"{tagged} pages with Google Analytics, gtag.js {LOADER_COMMENTS[strategy]} "
+            f"({pages} pages rewritten)")
+
+
+def main():
+    """Defer Google Analytics in an existing build directory."""
+    parser = argparse.ArgumentParser(description='Load Google Analytics off the critical path in the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    parser.add_argument('--strategy', choices=sorted(LOADERS), default=DEFAULT_STRATEGY,
+                        help=f'when to load gtag.js (default: {DEFAULT_STRATEGY})')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    print(f"✅ {defer_analytics(args.site_dir, args.strategy)}")
+
+
+if __name__ == "__main__":
+    main()
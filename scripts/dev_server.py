@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Local development/preview server that behaves like production (GitHub Pages).
+
+- Serves precompressed siblings (file.br, file.gz) when the browser accepts
+  them, and gzips other text responses on the fly (cached in memory)
+- Sends ETag and Cache-Control headers and answers If-None-Match with 304;
+  fingerprinted assets (name.<hash>.ext) are served as immutable
+- Redirects directory URLs without a trailing slash and serves name.html for
+  /name, like GitHub Pages
+- Serves 404.html with status 404 for missing paths, so the legacy redirect
+  script runs exactly as it does live; the target it will pick from
+  js/legacy-redirects.js (flat or --sharded) is logged and sent as an
+  X-Legacy-Redirect header
+- Watches the tree, re-runs the incremental build scripts affected by a change
+  (search index, sitemap, navigation fragments) and live-reloads open pages
+
+Usage:
+    python3 scripts/dev_server.py [--port 8000] [--bind 127.0.0.1] [--no-livereload] [--no-build]
+    python3 scripts/dev_server.py --root _site   # preview the build; source changes re-run build_site.py
+"""
+
+import argparse
+import gzip
+import json
+import mimetypes
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+BASE_DIR = Path(__file__).parent.parent
+LEGACY_REDIRECTS_JS = BASE_DIR / "js" / "legacy-redirects.js"
+
+DEFAULT_PORT = 8000
+
+# GitHub Pages serves everything with a 10 minute max-age
+CACHE_CONTROL = 'max-age=600'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+FINGERPRINT_PATTERN = re.compile(r'\.[0-9a-f]{8,}\.[a-z0-9]+$')
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/xml', 'image/svg+xml')
+# Precompressed siblings, in order of preference
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+LIVERELOAD_PATH = '/__livereload'
+LIVERELOAD_SNIPPET = (
+    '<script>new EventSource("' + LIVERELOAD_PATH + '")'
+    '.onmessage = function() { location.reload(); };</script>'
+)
+LIVERELOAD_KEEPALIVE_SECONDS = 15
+
+WATCH_INTERVAL_SECONDS = 1.0
+WATCH_EXCLUDED_DIRS = {'.git', 'node_modules', '.cache', '__pycache__', '_site'}
+
+# Content sections indexed by build_search_index.py
+SEARCH_SECTIONS = {'post', 'product-page', 'partners', 'farms', 'event-details-registration'}
+
+
+def is_page(rel_path):
+    """True for published HTML pages."""
+    return rel_path.endswith('.html') and not rel_path.startswith(('scripts/', 'docs/'))
+
+
+# (label, does this changed path need the step?, script to run)
+BUILD_STEPS = [
+    ('navigation fragments', lambda p: p == 'scripts/navigation_fragments.py', 'scripts/navigation_fragments.py'),
+    ('search index', lambda p: is_page(p) and p.split('/', 1)[0] in SEARCH_SECTIONS, 'scripts/build_search_index.py'),
+    ('sitemap', is_page, 'scripts/generate_sitemap.py'),
+]
+
+# When previewing the build output, any source change rebuilds it
+PREVIEW_BUILD_STEPS = [
+    ('site build', lambda p: True, 'scripts/build_site.py'),
+]
+
+# In-memory gzip cache: path -> (mtime_ns, compressed bytes)
+_gzip_cache = {}
+_gzip_lock = threading.Lock()
+
+# Live reload: bumping the version wakes every connected page
+_reload = {'version': 0}
+_reload_condition = threading.Condition()
+
+
+def load_legacy_redirects():
+    """Parse exact redirects and compiled pattern rules from js/legacy-redirects.js.
+
+    Handles both the flat map and the loader written by generate_redirects.py
+    --sharded, whose exact redirects are read from the JSON shards it lists.
+    """
+    if not LEGACY_REDIRECTS_JS.exists():
+        return {}, None
+    content = LEGACY_REDIRECTS_JS.read_text(encoding='utf-8')
+    redirects = dict(re.findall(r"^\s*'(/[^']*)':\s*'([^']*)'", content, re.MULTILINE))
+
+    base_match = re.search(r"const SHARD_BASE = '([^']*)';", content)
+    shards_match = re.search(r'const SHARDS = (\{.*\});', content)
+    if base_match and shards_match:
+        shard_dir = BASE_DIR / base_match.group(1).strip('/')
+        try:
+            for filename in json.loads(shards_match.group(1)).values():
+                redirects.update(json.loads((shard_dir / filename).read_text(encoding='utf-8')))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load redirect shards: {e}")
+
+    patterns = None
+    regex_match = re.search(r'regex: new RegExp\((".*")\),', content)
+    rules_match = re.search(r'rules: (\[.*\])', content)
+    if regex_match and rules_match:
+        try:
+            patterns = (re.compile(json.loads(regex_match.group(1))), json.loads(rules_match.group(1)))
+        except (re.error, ValueError) as e:
+            print(f"⚠️  Could not load redirect patterns: {e}")
+    return redirects, patterns
+
+
+def find_legacy_redirect(path, legacy):
+    """Return the redirect 404.html would perform for a path, or None."""
+    redirects, patterns = legacy
+    if path in redirects:
+        return redirects[path]
+    if patterns:
+        regex, rules = patterns
+        match = regex.match(path)
+        if match:
+            for group_index, dest in rules:
+                if match.group(group_index) is not None:
+                    return re.sub(r'\$(\d)', lambda m: match.group(group_index + int(m.group(1))) or '', dest)
+    return None
+
+
+def gzip_cached(path, mtime_ns, data):
+    """Gzip response data, reusing the result until the file changes."""
+    with _gzip_lock:
+        cached = _gzip_cache.get(path)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+    compressed = gzip.compress(data, compresslevel=6, mtime=0)
+    with _gzip_lock:
+        _gzip_cache[path] = (mtime_ns, compressed)
+    return compressed
+
+
+def trigger_reload():
+    """Tell every connected page to reload."""
+    with _reload_condition:
+        _reload['version'] += 1
+        _reload_condition.notify_all()
+
+
+class DevRequestHandler(BaseHTTPRequestHandler):
+    """Static file handler with production-like caching, compression and 404s."""
+
+    server_version = 'AgroverseDevServer/1.0'
+    protocol_version = 'HTTP/1.1'
+    root = BASE_DIR
+    livereload = True
+    legacy = ({}, None)
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body):
+        """Route a request to a file, a directory redirect, live reload or the 404 page."""
+        path = unquote(urlsplit(self.path).path)
+        if path == LIVERELOAD_PATH and self.livereload:
+            self.stream_reload_events()
+            return
+
+        root = self.root.resolve()
+        target = (root / path.lstrip('/')).resolve()
+        if target != root and root not in target.parents:
+            self.send_error(HTTPStatus.FORBIDDEN)
+            return
+
+        if target.is_dir():
+            if not path.endswith('/'):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header('Location', path + '/')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            target = target / 'index.html'
+        elif not target.exists() and target.with_name(target.name + '.html').is_file():
+            target = target.with_name(target.name + '.html')
+
+        if target.is_file():
+            self.serve_file(target, HTTPStatus.OK, send_body)
+            return
+
+        redirect = find_legacy_redirect(path, self.legacy)
+        extra_headers = {}
+        if redirect:
+            extra_headers['X-Legacy-Redirect'] = redirect
+            self.log_message('legacy redirect %s -> %s (via 404.html)', path, redirect)
+        not_found_page = root / '404.html'
+        if not_found_page.exists():
+            self.serve_file(not_found_page, HTTPStatus.NOT_FOUND, send_body, extra_headers)
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def choose_body(self, file_path, stat, content_type):
+        """Pick the representation to send: (body bytes, content-encoding or None)."""
+        accepted = self.headers.get('Accept-Encoding', '')
+        is_html = content_type == 'text/html'
+
+        # Pages get the live reload snippet, so precompressed HTML siblings are skipped
+        if not (is_html and self.livereload):
+            for encoding, suffix in PRECOMPRESSED:
+                sibling = file_path.with_name(file_path.name + suffix)
+                if encoding in accepted and sibling.is_file() and sibling.stat().st_mtime_ns >= stat.st_mtime_ns:
+                    return sibling.read_bytes(), encoding
+
+        data = file_path.read_bytes()
+        if is_html and self.livereload:
+            data = data.replace(b'</body>', LIVERELOAD_SNIPPET.encode('utf-8') + b'</body>', 1)
+
+        if 'gzip' in accepted and content_type.startswith(COMPRESSIBLE_TYPES):
+            return gzip_cached(str(file_path), stat.st_mtime_ns, data), 'gzip'
+        return data, None
+
+    def serve_file(self, file_path, status, send_body, extra_headers=None):
+        """Send a file with ETag, Cache-Control and content negotiation."""
+        stat = file_path.stat()
+        content_type = mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream'
+        body, encoding = self.choose_body(file_path, stat, content_type)
+
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+        if status == HTTPStatus.OK and etag in self.headers.get('If-None-Match', ''):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+            content_type += '; charset=utf-8'
+        cache_control = IMMUTABLE_CACHE_CONTROL if FINGERPRINT_PATTERN.search(file_path.name) else CACHE_CONTROL
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(stat.st_mtime, usegmt=True))
+        self.send_header('Cache-Control', cache_control)
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def stream_reload_events(self):
+        """Server-sent events stream that fires once per rebuild."""
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        with _reload_condition:
+            seen = _reload['version']
+        try:
+            while True:
+                with _reload_condition:
+                    _reload_condition.wait(LIVERELOAD_KEEPALIVE_SECONDS)
+                    version = _reload['version']
+                if version != seen:
+                    seen = version
+                    self.wfile.write(b'data: reload\n\n')
+                else:
+                    self.wfile.write(b': keepalive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def snapshot_tree():
+    """Map every watched file to its modification time."""
+    snapshot = {}
+    for root, dirs, files in os.walk(BASE_DIR):
+        dirs[:] = [d for d in dirs if d not in WATCH_EXCLUDED_DIRS]
+        for name in files:
+            full_path = os.path.join(root, name)
+            try:
+                snapshot[os.path.relpath(full_path, BASE_DIR).replace(os.sep, '/')] = os.stat(full_path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+    return snapshot
+
+
+def run_build_steps(changed, steps):
+    """Run the build scripts affected by the changed paths."""
+    for label, needs_step, script in steps:
+        if any(needs_step(path) for path in changed):
+            print(f"🔨 Rebuilding {label}...")
+            result = subprocess.run([sys.executable, script], cwd=BASE_DIR, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"❌ {script} failed:\n{result.stderr.strip()}")
+
+
+def watch_tree(steps):
+    """Poll the tree for changes, rebuild what they affect and reload pages."""
+    snapshot = snapshot_tree()
+    while True:
+        time.sleep(WATCH_INTERVAL_SECONDS)
+        current = snapshot_tree()
+        changed = {path for path in current.keys() | snapshot.keys() if current.get(path) != snapshot.get(path)}
+        if not changed:
+            continue
+        print(f"👀 Changed: {', '.join(sorted(changed)[:5])}{' ...' if len(changed) > 5 else ''}")
+        if steps:
+            run_build_steps(changed, steps)
+            # Build output is part of this change, not a new one
+            current = snapshot_tree()
+        snapshot = current
+        trigger_reload()
+
+
+def main():
+    """Start the development server."""
+    parser = argparse.ArgumentParser(description='Production-like local server for the site.')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--bind', default='127.0.0.1', help='address to bind (default: 127.0.0.1)')
+    parser.add_argument('--root', type=Path, default=BASE_DIR, help='directory to serve (default: the repository)')
+    parser.add_argument('--no-livereload', action='store_true', help='do not watch files or reload pages')
+    parser.add_argument('--no-build', action='store_true', help='watch and reload, but do not run build scripts')
+    args = parser.parse_args()
+
+    mimetypes.add_type('application/javascript', '.js')
+    mimetypes.add_type('image/avif', '.avif')
+    mimetypes.add_type('image/webp', '.webp')
+    mimetypes.add_type('font/woff2', '.woff2')
+
+    DevRequestHandler.root = args.root
+    DevRequestHandler.livereload = not args.no_livereload
+    DevRequestHandler.legacy = load_legacy_redirects()
+
+    server = ThreadingHTTPServer((args.bind, args.port), DevRequestHandler)
+    server.daemon_threads = True
+
+    if not args.no_livereload:
+        previewing_build = args.root.resolve() != BASE_DIR.resolve()
+        steps = [] if args.no_build else (PREVIEW_BUILD_STEPS if previewing_build else BUILD_STEPS)
+        threading.Thread(target=watch_tree, args=(steps,), daemon=True).start()
+
+    redirects, patterns = DevRequestHandler.legacy
+    print(f"🌱 Serving {args.root} on http://{args.bind}:{args.port}")
+    print(f"   Legacy redirects: {len(redirects)} exact{', plus pattern rules' if patterns else ''}")
+    print(f"   Live reload: {'off' if args.no_livereload else 'on'}"
+          f"{'' if args.no_livereload or args.no_build else ', incremental rebuilds on'}")
+    print("   Press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Find images that are the same picture under different names, sizes or formats.
+
+Every image under assets/ gets a 64-bit perceptual hash (dHash: the sign of
+the brightness gradient on a 9x8 grayscale thumbnail, after EXIF rotation),
+computed in a process pool and cached in .cache/image_hashes.json by size and
+mtime. Hashes are indexed by their eight bytes, so near neighbours (Hamming
+distance <= --distance, at most 7) are found by exact lookups rather than by
+comparing every pair: two hashes that differ in at most 7 bits share at least
+one identical byte.
+
+Images within the distance are grouped into clusters. Each cluster's
+canonical file is the one browsers can display (not HEIC), then the most
+referenced, then the largest, then the shortest name. --rewrite replaces
+references to the other members with the canonical path in every file
+prune_assets.py considers a source (pages, CSS, JS, feeds); the copies are
+then unreferenced and `python3 scripts/prune_assets.py --archive` moves them
+out of the site. Members more than MAX_SCALE times larger or smaller than the
+canonical file (favicon sizes, listing thumbnails) are reported but never
+rewritten.
+
+HEIC files are only hashed when pillow-heif is installed.
+
+Usage:
+    python3 scripts/find_duplicate_images.py                  # list duplicate clusters
+    python3 scripts/find_duplicate_images.py --distance 4     # stricter matching
+    python3 scripts/find_duplicate_images.py --rewrite        # point references at the canonical file
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+from prune_assets import build_reference_index, find_assets, format_size
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
+
+BASE_DIR = Path(__file__).parent.parent
+CACHE_FILE = BASE_DIR / ".cache" / "image_hashes.json"
+
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.heic', '.heif')
+# Formats browsers cannot display; never picked as canonical
+UNDISPLAYABLE_SUFFIXES = ('.heic', '.heif')
+
+HASH_BYTES = 8
+DEFAULT_DISTANCE = 5
+
+# Copies whose longer side differs more than this from the canonical file are size variants
+MAX_SCALE = 2
+
+
+def image_hash(path):
+    """Worker: [dHash as int, width, height] of an image, or None if it cannot be decoded."""
+    try:
+        with Image.open(path) as opened:
+            image = ImageOps.exif_transpose(opened)
+            width, height = image.size
+            if image.mode in ('RGBA', 'LA', 'P'):
+                # Transparent areas compare as white, as they appear on the site
+                rgba = image.convert('RGBA')
+                image = Image.new('RGBA', rgba.size, 'white')
+                image.alpha_composite(rgba)
+            pixels = list(image.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    except (OSError, ValueError, SyntaxError):
+        return None
+    bits = 0
+    for row in range(8):
+        for column in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + column] > pixels[row * 9 + column + 1])
+    return [bits, width, height]
+
+
+def load_cache():
+    """Load image hashes from previous runs."""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_cache(cache):
+    """Persist image hashes."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, separators=(',', ':'), sort_keys=True)
+
+
+def hash_images(assets):
+    """[hash, width, height] (or None) for every image among the assets, hashing new ones in parallel."""
+    cache = load_cache()
+    hashes = {}
+    pending = {}
+    for rel_path in assets:
+        if not rel_path.lower().endswith(IMAGE_SUFFIXES):
+            continue
+        stat = (BASE_DIR / rel_path).stat()
+        signature = [stat.st_mtime_ns, stat.st_size]
+        cached = cache.get(rel_path)
+        if cached and cached[0] == signature:
+            hashes[rel_path] = cached[1]
+        else:
+            pending[rel_path] = signature
+
+    if pending:
+        with ProcessPoolExecutor() as pool:
+            results = pool.map(image_hash, [str(BASE_DIR / rel_path) for rel_path in pending], chunksize=8)
+            for rel_path, result in zip(pending, results):
+                hashes[rel_path] = result
+
+    save_cache({rel_path: [pending.get(rel_path) or cache[rel_path][0], value]
+                for rel_path, value in hashes.items()})
+    return hashes
+
+
+def find_clusters(hashes, distance):
+    """Groups of images whose hashes are within distance bits of another member."""
+    index = defaultdict(list)
+    for rel_path, value in hashes.items():
+        if value is None:
+            continue
+        for position in range(HASH_BYTES):
+            index[(position, (value[0] >> (8 * position)) & 0xFF)].append(rel_path)
+
+    # Union-find over the candidate pairs that are really within the distance
+    parent = {}
+
+    def root(path):
+        while parent.get(path, path) != path:
+            path = parent[path]
+        return path
+
+    for bucket in index.values():
+        for i, first in enumerate(bucket):
+            for second in bucket[i + 1:]:
+                if bin(hashes[first][0] ^ hashes[second][0]).count('1') <= distance:
+                    parent[root(first)] = root(second)
+
+    clusters = defaultdict(list)
+    for rel_path in parent:
+        clusters[root(rel_path)].append(rel_path)
+    return [sorted(members) for members in clusters.values() if len(members) > 1]
+
+
+def canonical_image(members, hashes, references, assets):
+    """The member other copies should be replaced by."""
+    def rank(rel_path):
+        _, width, height = hashes[rel_path]
+        return (rel_path.lower().endswith(UNDISPLAYABLE_SUFFIXES), -len(references.get(rel_path, ())),
+                -width * height, assets[rel_path], len(rel_path), rel_path)
+    return min(members, key=rank)
+
+
+def is_size_variant(rel_path, canonical, hashes):
+    """True if an image is an intentionally smaller or larger version of the canonical one."""
+    side, canonical_side = max(hashes[rel_path][1:]), max(hashes[canonical][1:])
+    return max(side, canonical_side) > MAX_SCALE * min(side, canonical_side)
+
+
+def rewrite_references(duplicate, canonical, sources):
+    """Replace a duplicate's path with the canonical one in its referencing files.
+
+    Returns the sources that still reference it (runtime-built paths, other URL forms).
+    """
+    remaining = []
+    forms = {duplicate: canonical, quote(duplicate): quote(canonical)}
+    # The whole path only: "logo.png" must not match inside "old-logo.png" or "logo.png.bak"
+    pattern = re.compile(r'(?<![\w-])(%s)(?![\w.-])' % '|'.join(re.escape(form) for form in forms))
+    for rel_path in sorted(sources):
+        path = BASE_DIR / rel_path
+        content = path.read_text(encoding='utf-8', errors='ignore')
+        rewritten = pattern.sub(lambda match: forms[match.group(1)], content)
+        if rewritten == content:
+            remaining.append(rel_path)
+        else:
+            path.write_text(rewritten, encoding='utf-8')
+    return remaining
+
+
+def main():
+    """List (and optionally collapse) duplicate images."""
+    parser = argparse.ArgumentParser(description='Find perceptually duplicate images.')
+    parser.add_argument('--distance', type=int, default=DEFAULT_DISTANCE, choices=range(HASH_BYTES),
+                        help=f'maximum differing hash bits (default: {DEFAULT_DISTANCE})')
+    parser.add_argument('--rewrite', action='store_true',
+                        help='point references to duplicates at the canonical file')
+    args = parser.parse_args()
+
+    if Image is None:
+        print("❌ Pillow is required: pip install Pillow")
+        return 1
+
+    assets = find_assets()
+    hashes = hash_images(assets)
+    references = build_reference_index(assets)
+    clusters = find_clusters(hashes, args.distance)
+
+    undecoded = sorted(rel_path for rel_path, value in hashes.items() if value is None)
+    redundant = 0
+    rewritten = 0
+    for members in sorted(clusters, key=lambda group: -sum(assets[path] for path in group)):
+        canonical = canonical_image(members, hashes, references, assets)
+        print(f"\n📁 {canonical} ({len(references.get(canonical, ()))} references)")
+        for rel_path in members:
+            if rel_path == canonical:
+                continue
+            sources = references.get(rel_path, ())
+            variant = is_size_variant(rel_path, canonical, hashes)
+            if not variant:
+                redundant += assets[rel_path]
+            print(f"   {format_size(assets[rel_path]):>9}  {rel_path} ({len(sources)} references)"
+                  + (" - size variant, kept" if variant else ""))
+            if args.rewrite and sources and not variant:
+                remaining = rewrite_references(rel_path, canonical, sources)
+                rewritten += len(sources) - len(remaining)
+                for source in remaining:
+                    print(f"   ⚠️  not rewritten in {source} (runtime-built or relative path)")
+
+    if undecoded:
+        print(f"\n⏭️  {len(undecoded)} images could not be decoded"
+              + (" (HEIC needs pip install pillow-heif)" if any(p.lower().endswith(UNDISPLAYABLE_SUFFIXES)
+                                                                  for p in undecoded) else ""))
+    print(f"\n{'⚠️ ' if clusters else '✅'} {len(clusters)} duplicate clusters among {len(hashes)} images "
+          f"({format_size(redundant)} in redundant copies)")
+    if args.rewrite:
+        print(f"✅ Rewrote {rewritten} file references; archive the copies with scripts/prune_assets.py --archive")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
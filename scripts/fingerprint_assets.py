@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Fingerprint JS, CSS, image and font assets in the build output for long-lived caching.
+
+Build stage run by build_site.py. Every asset under js/, css/ and assets/ gets
+a content-hashed copy next to it (js/cart.js -> js/cart.3f9a0c1b2d.js) and
+every reference in the built HTML pages - relative (../../js/cart.js) or
+root-relative - is rewritten to the hashed name. Stylesheets have their own
+url() references rewritten before they are hashed, so an image change also
+changes the hash of the CSS that uses it.
+
+The unhashed originals stay in place for URLs built at runtime (e.g. scripts
+loaded by universal-nav.js). The mapping is written to asset-manifest.json in
+the build directory. Source hashes are cached in .cache/fingerprints.json by
+size and mtime, so unchanged images are not re-read on every build.
+
+Usage:
+    python3 scripts/fingerprint_assets.py [--site-dir _site]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+
+from check_links import ATTR_PATTERN, CSS_URL_PATTERN, EXTERNAL_PREFIXES, reference_target
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+CACHE_FILE = BASE_DIR / ".cache" / "fingerprints.json"
+MANIFEST_NAME = "asset-manifest.json"
+
+ASSET_DIRS = ('js/', 'css/', 'assets/')
+# Hashed in this order: stylesheets can reference images and fonts, never the reverse
+ASSET_GROUPS = [
+    {'.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.avif', '.ico', '.woff', '.woff2'},
+    {'.css'},
+    {'.js'},
+]
+HASH_LENGTH = 10
+FINGERPRINTED_PATTERN = re.compile(r'\.[0-9a-f]{%d}\.[A-Za-z0-9]+$' % HASH_LENGTH)
+
+
+def fingerprint_name(rel_path, digest):
+    """js/cart.js -> js/cart.<digest>.js"""
+    stem, ext = posixpath.splitext(rel_path)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def is_fingerprinted(rel_path):
+    """True for files produced by this stage."""
+    return bool(FINGERPRINTED_PATTERN.search(rel_path))
+
+
+def rewrite_value(source, value, manifest):
+    """Rewrite one reference to its fingerprinted name, keeping its relative form, query and fragment."""
+    if not value or value.lower().startswith(EXTERNAL_PREFIXES):
+        return value
+    target = reference_target(source, value)
+    if target not in manifest:
+        return value
+    cut = min([i for i in (value.find('?'), value.find('#')) if i != -1] or [len(value)])
+    path, rest = value[:cut], value[cut:]
+    return path[:path.rfind('/') + 1] + posixpath.basename(manifest[target]) + rest
+
+
+def rewrite_css(content, source, manifest):
+    """Rewrite url() references in CSS (stylesheets or inline style blocks)."""
+    def replace(match):
+        return match.group(0).replace(match.group(2), rewrite_value(source, match.group(2), manifest), 1)
+    return CSS_URL_PATTERN.sub(replace, content)
+
+
+def rewrite_html(content, source, manifest):
+    """Rewrite href/src/srcset attributes and inline url() references in a page."""
+    def replace(match):
+        group = 2 if match.group(2) is not None else 3
+        value = match.group(group)
+        if match.group(1) == 'srcset':
+            candidates = []
+            for candidate in value.split(','):
+                parts = candidate.strip().split(' ', 1)
+                parts[0] = rewrite_value(source, parts[0], manifest)
+                candidates.append(' '.join(parts))
+            new_value = ', '.join(candidates)
+        else:
+            new_value = rewrite_value(source, value, manifest)
+        if new_value == value:
+            return match.group(0)
+        start, end = match.span(group)
+        whole_start = match.start(0)
+        text = match.group(0)
+        return text[:start - whole_start] + new_value + text[end - whole_start:]
+
+    return rewrite_css(ATTR_PATTERN.sub(replace, content), source, manifest)
+
+
+def load_cache():
+    """Load cached content hashes."""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_cache(cache):
+    """Persist content hashes."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, separators=(',', ':'), sort_keys=True)
+
+
+def content_hash(path, rel_path, cache):
+    """sha256 of a file, reusing the cached value while size and mtime are unchanged."""
+    stat = path.stat()
+    signature = [stat.st_mtime_ns, stat.st_size]
+    cached = cache.get(rel_path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    cache[rel_path] = [signature, digest]
+    return digest
+
+
+def place_copy(site_dir, rel_path, hashed_rel_path):
+    """Create the fingerprinted copy (a hard link where possible) if it does not exist yet."""
+    hashed = site_dir / hashed_rel_path
+    if hashed.exists():
+        return False
+    try:
+        os.link(site_dir / rel_path, hashed)
+    except OSError:
+        hashed.write_bytes((site_dir / rel_path).read_bytes())
+    return True
+
+
+def find_assets(site_dir):
+    """Site-relative paths of every asset eligible for fingerprinting."""
+    assets = []
+    for prefix in ASSET_DIRS:
+        for path in (site_dir / prefix).rglob('*'):
+            rel_path = path.relative_to(site_dir).as_posix()
+            if path.is_file() and not is_fingerprinted(rel_path):
+                assets.append(rel_path)
+    return sorted(assets)
+
+
+def fingerprint_assets(site_dir=SITE_DIR):
+    """Fingerprint assets and rewrite references in the build directory. Returns a summary."""
+    cache = load_cache()
+    assets = find_assets(site_dir)
+    manifest = {}
+    created = 0
+
+    for extensions in ASSET_GROUPS:
+        for rel_path in assets:
+            if posixpath.splitext(rel_path)[1].lower() not in extensions:
+                continue
+            path = site_dir / rel_path
+            if rel_path.endswith('.css'):
+                content = path.read_text(encoding='utf-8')
+                rewritten = rewrite_css(content, rel_path, manifest)
+                if rewritten != content:
+                    path.write_text(rewritten, encoding='utf-8')
+            manifest[rel_path] = fingerprint_name(rel_path, content_hash(path, rel_path, cache))
+            created += place_copy(site_dir, rel_path, manifest[rel_path])
+
+    pages_rewritten = 0
+    for page in site_dir.rglob('*.html'):
+        rel_path = page.relative_to(site_dir).as_posix()
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        rewritten = rewrite_html(content, rel_path, manifest)
+        if rewritten != content:
+            page.write_text(rewritten, encoding='utf-8')
+            pages_rewritten += 1
+
+    # Drop fingerprinted copies from earlier builds that no longer match any asset
+    current = set(manifest.values())
+    removed = 0
+    for prefix in ASSET_DIRS:
+        for path in (site_dir / prefix).rglob('*'):
+            rel_path = path.relative_to(site_dir).as_posix()
+            if is_fingerprinted(rel_path) and rel_path not in current and path.is_file():
+                path.unlink()
+                removed += 1
+
+    (site_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=1, sort_keys=True) + '\n', encoding='utf-8')
+    save_cache(cache)
+
+    return f"{len(manifest)} assets ({created} new copies, {removed} stale removed), {pages_rewritten} pages rewritten"
+
+
+def main():
+    """Fingerprint assets in an existing build directory."""
+    parser = argparse.ArgumentParser(description='Fingerprint assets in the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    print(f"✅ {fingerprint_assets(args.site_dir)}")
+
+
+if __name__ == "__main__":
+    main()
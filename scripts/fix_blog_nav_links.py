@@ -3,39 +3,12 @@
 Fix blog post navigation - remove duplicates, fix class_, and correct paths.
 """
 
-import re
 from pathlib import Path
 from bs4 import BeautifulSoup
+from site_model import get_blog_post_order
 
 BASE_DIR = Path(__file__).parent.parent
 POSTS_DIR = BASE_DIR / "post"
-BLOG_INDEX = BASE_DIR / "blog" / "index.html"
-
-
-def get_blog_post_order():
-    """Extract the order of blog posts from blog index page."""
-    if not BLOG_INDEX.exists():
-        return []
-    
-    try:
-        with open(BLOG_INDEX, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f.read(), 'html.parser')
-        
-        blog_cards = soup.find_all('article', class_='blog-card')
-        post_order = []
-        
-        for card in blog_cards:
-            link = card.find('a', class_='blog-card-link')
-            if link:
-                href = link.get('href', '')
-                match = re.search(r'\.\./post/([^/]+)/', href)
-                if match:
-                    post_order.append(match.group(1))
-        
-        return post_order
-    except Exception as e:
-        print(f"Error reading blog index: {e}")
-        return []
 
 
 def fix_blog_navigation(post_path, post_order):
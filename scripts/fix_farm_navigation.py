@@ -3,23 +3,14 @@
 Fix Previous/Next navigation in farm pages - ensure paths are correct.
 """
 
-import re
 from pathlib import Path
 from bs4 import BeautifulSoup
+from site_model import get_farm_order
 
 BASE_DIR = Path(__file__).parent.parent
 FARMS_DIR = BASE_DIR / "farms"
 
 
-def get_farm_order():
-    """Get ordered list of farms (alphabetical by directory name)."""
-    if not FARMS_DIR.exists():
-        return []
-    
-    farms = sorted([d.name for d in FARMS_DIR.iterdir() if d.is_dir()])
-    return farms
-
-
 def fix_farm_navigation(farm_path, farm_order):
     """Fix farm page navigation."""
     farm_slug = farm_path.parent.name
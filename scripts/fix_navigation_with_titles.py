@@ -3,94 +3,14 @@
 Fix navigation links and enhance them to show titles/names instead of generic text.
 """
 
-import re
 from pathlib import Path
 from bs4 import BeautifulSoup
+from site_model import get_blog_post_order, get_farm_order, get_shipment_order, get_page_title
 
 BASE_DIR = Path(__file__).parent.parent
 POSTS_DIR = BASE_DIR / "post"
 FARMS_DIR = BASE_DIR / "farms"
 SHIPMENTS_DIR = BASE_DIR / "shipments"
-BLOG_INDEX = BASE_DIR / "blog" / "index.html"
-
-
-def get_title_from_page(page_path):
-    """Extract title from a page (h1 or title tag)."""
-    if not page_path.exists():
-        return None
-    
-    try:
-        with open(page_path, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f.read(), 'html.parser')
-        
-        # Try h1 first
-        h1 = soup.find('h1')
-        if h1:
-            title = h1.get_text(strip=True)
-            if title and title.lower() not in ['blog', 'farm', 'shipment']:
-                return title
-        
-        # Try title tag
-        title_tag = soup.find('title')
-        if title_tag and title_tag.string:
-            title = title_tag.string.strip()
-            # Remove site name suffix
-            title = re.sub(r'\s*\|\s*Agroverse.*$', '', title, flags=re.IGNORECASE)
-            if title:
-                return title
-        
-        return None
-    except:
-        return None
-
-
-def get_blog_post_order():
-    """Extract the order of blog posts from blog index page."""
-    if not BLOG_INDEX.exists():
-        return []
-    
-    try:
-        with open(BLOG_INDEX, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f.read(), 'html.parser')
-        
-        blog_cards = soup.find_all('article', class_='blog-card')
-        post_order = []
-        
-        for card in blog_cards:
-            link = card.find('a', class_='blog-card-link')
-            if link:
-                href = link.get('href', '')
-                match = re.search(r'\.\./post/([^/]+)/', href)
-                if match:
-                    post_order.append(match.group(1))
-        
-        return post_order
-    except Exception as e:
-        print(f"Error reading blog index: {e}")
-        return []
-
-
-def get_farm_order():
-    """Get ordered list of farms."""
-    if not FARMS_DIR.exists():
-        return []
-    return sorted([d.name for d in FARMS_DIR.iterdir() if d.is_dir()])
-
-
-def get_shipment_order():
-    """Get ordered list of shipments (sorted by number)."""
-    if not SHIPMENTS_DIR.exists():
-        return []
-    
-    shipments = []
-    for d in SHIPMENTS_DIR.iterdir():
-        if d.is_dir() and d.name.startswith('agl'):
-            match = re.search(r'agl(\d+)', d.name)
-            if match:
-                shipments.append((int(match.group(1)), d.name))
-    
-    shipments.sort(key=lambda x: x[0], reverse=True)
-    return [s[1] for s in shipments]
 
 
 def fix_blog_navigation(post_path, post_order):
@@ -129,8 +49,7 @@ def fix_blog_navigation(post_path, post_order):
     # Previous post
     if current_index < len(post_order) - 1:
         prev_slug = post_order[current_index + 1]
-        prev_path = post_path.parent.parent / prev_slug / 'index.html'
-        prev_title = get_title_from_page(prev_path)
+        prev_title = get_page_title('post', prev_slug)
         prev_text = prev_title if prev_title else 'Previous Post'
         
         prev_div = soup.new_tag('div')
@@ -147,8 +66,7 @@ def fix_blog_navigation(post_path, post_order):
     # Next post
     if current_index > 0:
         next_slug = post_order[current_index - 1]
-        next_path = post_path.parent.parent / next_slug / 'index.html'
-        next_title = get_title_from_page(next_path)
+        next_title = get_page_title('post', next_slug)
         next_text = next_title if next_title else 'Next Post'
         
         next_div = soup.new_tag('div')
@@ -225,8 +143,7 @@ def fix_farm_navigation(farm_path, farm_order):
     
     if current_index < len(farm_order) - 1:
         prev_slug = farm_order[current_index + 1]
-        prev_path = farm_path.parent.parent / prev_slug / 'index.html'
-        prev_title = get_title_from_page(prev_path)
+        prev_title = get_page_title('farms', prev_slug)
         prev_text = prev_title if prev_title else prev_slug.replace('-', ' ').title()
         
         prev_div = soup.new_tag('div')
@@ -242,8 +159,7 @@ def fix_farm_navigation(farm_path, farm_order):
     
     if current_index > 0:
         next_slug = farm_order[current_index - 1]
-        next_path = farm_path.parent.parent / next_slug / 'index.html'
-        next_title = get_title_from_page(next_path)
+        next_title = get_page_title('farms', next_slug)
         next_text = next_title if next_title else next_slug.replace('-', ' ').title()
         
         next_div = soup.new_tag('div')
@@ -319,8 +235,7 @@ def fix_shipment_navigation(shipment_path, shipment_order):
     
     if current_index < len(shipment_order) - 1:
         prev_slug = shipment_order[current_index + 1]
-        prev_path = shipment_path.parent.parent / prev_slug / 'index.html'
-        prev_title = get_title_from_page(prev_path)
+        prev_title = get_page_title('shipments', prev_slug)
         prev_text = prev_title if prev_title else prev_slug.upper()
         
         prev_div = soup.new_tag('div')
@@ -336,8 +251,7 @@ def fix_shipment_navigation(shipment_path, shipment_order):
     
     if current_index > 0:
         next_slug = shipment_order[current_index - 1]
-        next_path = shipment_path.parent.parent / next_slug / 'index.html'
-        next_title = get_title_from_page(next_path)
+        next_title = get_page_title('shipments', next_slug)
         next_text = next_title if next_title else next_slug.upper()
         
         next_div = soup.new_tag('div')
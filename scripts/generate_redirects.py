@@ -7,84 +7,158 @@ and generates a JavaScript redirect map for use in 404.html.
 
 Usage:
     python3 scripts/generate_redirects.py path/to/legacy_agroverse_shop_URL_Redirects_Export.csv
+    python3 scripts/generate_redirects.py wix_export.csv shipment_links.csv manual_overrides.csv
+
+Several exports can be merged in one run; later files take precedence over
+earlier ones, and duplicate or conflicting rules are reported.
+
+Options:
+    --sharded             Emit a tiny loader in js/legacy-redirects.js plus JSON
+                          shards in js/legacy-redirects/, so a 404 only downloads
+                          the shard for its path prefix instead of the whole map
+    --max-shard-entries N Split a shard once it holds more than N redirects (default 256)
+    --benchmark           Compare payload size and lookup cost of flat vs sharded maps
+    --stubs               Also write a tiny <path>/index.html redirect page for every
+                          legacy path, so it resolves on the first response (and for
+                          crawlers/no-JS clients) instead of via 404.html
+
+Pattern rules:
+    Besides exact paths, the source column may hold a pattern:
+      /agl*                  - glob (* matches anything, ? one character; a source
+                               with only ? is an exact path plus query string)
+      /product-page/*        - prefix (a glob ending in *)
+      ^/recipes-([0-9]+)/.*$ - regex (must start with ^)
+    Destinations may use $1, $2, ... to insert what the pattern captured.
+    Exact paths always win over patterns; patterns are tried in CSV order.
+
+    Chains (A -> B, B -> C) are collapsed so every source points straight at
+    its final target. A chain stops at a published page: if B has its own
+    index.html, visitors land on B, so A keeps pointing there. Redirect cycles and rules that can never fire are reported.
 """
 
+import argparse
 import csv
+import fnmatch
+import gzip
+import hashlib
+import html
+import json
+import random
+import re
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse, urljoin
 
+from check_links import EXCLUDED_DIRS
+
+DEFAULT_MAX_SHARD_ENTRIES = 256
+BASE_URL = 'https://www.agroverse.shop'
+
+# Marker on the second line of every generated stub page; files without it are never touched
+STUB_MARKER = '<!-- legacy-redirect-stub: generated by scripts/generate_redirects.py --stubs -->'
+
+# Directories never scanned for stale stubs
+STUB_SCAN_EXCLUDED_DIRS = {'.git', 'node_modules', 'assets', 'js', 'css', 'scripts', 'docs', '_site'}
+
 def normalize_path(path):
     """Normalize URL path for redirect map."""
     # Remove leading/trailing slashes, then add one leading slash
     path = path.strip().strip('/')
     return '/' + path if path else '/'
 
+def is_pattern_source(source):
+    """Check if a redirect source is a glob or regex pattern rather than an exact path."""
+    # '?' alone does not make a glob: in exports like "/page?lang=pt" it starts the query string
+    return source.startswith('^') or '*' in source or '[' in source
+
+def normalize_pattern_source(source):
+    """Strip any scheme/domain from a glob source and normalize its leading slash."""
+    if source.startswith('^'):
+        return source
+    source = re.sub(r'^https?://[^/]+', '', source.strip())
+    return '/' + source.lstrip('/')
+
+# Common column name variations (case-insensitive), in order of preference
+SOURCE_COLUMNS = ['source', 'from', 'old_url', 'old url', 'legacy_url', 'legacy url', 'url']
+DEST_COLUMNS = ['destination', 'to', 'new_url', 'new url', 'target_url', 'target url', 'redirect']
+
+def resolve_columns(header):
+    """Find the (source, destination) column indexes in a header row, or None."""
+    header_lower = {name.strip().lower(): i for i, name in reversed(list(enumerate(header)))}
+    source_idx = next((header_lower[c] for c in SOURCE_COLUMNS if c in header_lower), None)
+    dest_idx = next((header_lower[c] for c in DEST_COLUMNS if c in header_lower), None)
+    if source_idx is None or dest_idx is None:
+        return None
+    return source_idx, dest_idx
+
+def detect_delimiter(header_line):
+    """Detect the delimiter from the header line, default to comma."""
+    try:
+        return csv.Sniffer().sniff(header_line, delimiters=',;\t|').delimiter
+    except csv.Error:
+        return ','
+
+def url_path(url):
+    """Path part of a URL or path, without domain, query or fragment."""
+    if url.startswith(('https://', 'http://')):
+        # Cheaper than urlparse for the common absolute-URL case
+        url = '/' + url.split('/', 3)[3] if url.count('/') >= 3 else '/'
+    elif not url.startswith('/'):
+        parsed = urlparse(url)
+        return parsed.path or url
+    return url.split('#', 1)[0].split('?', 1)[0]
+
+def normalize_redirect(source, dest):
+    """Turn a raw (source, destination) pair into a (source_key, destination) entry."""
+    # Patterns are kept verbatim: '?' in a glob is a wildcard, not a query string
+    if is_pattern_source(source):
+        source_key = normalize_pattern_source(source)
+    else:
+        source_key = normalize_path(url_path(source))
+    
+    # If destination is full URL, keep it as-is
+    if dest.startswith(('https://', 'http://')) or (not dest.startswith('/') and urlparse(dest).netloc):
+        return source_key, dest
+    return source_key, normalize_path(url_path(dest))
+
+def iter_csv_redirects(csv_path):
+    """
+    Stream (row_num, source_key, destination) from a redirect CSV.
+
+    The delimiter and the source/destination columns are resolved once from
+    the header; rows are then read with a plain csv.reader without building a
+    dict per row, so memory stays flat regardless of file size.
+    """
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:  # utf-8-sig strips BOM
+        header_line = f.readline()
+        delimiter = detect_delimiter(header_line)
+        header = next(csv.reader([header_line], delimiter=delimiter), [])
+        
+        columns = resolve_columns(header)
+        if columns is None:
+            print(f"Warning: {csv_path} - Could not find source/destination columns")
+            print(f"  Available columns: {header}")
+            return
+        source_idx, dest_idx = columns
+        width = max(columns) + 1
+        
+        for row_num, row in enumerate(csv.reader(f, delimiter=delimiter), start=2):
+            if len(row) < width:
+                continue
+            source = row[source_idx].strip()
+            dest = row[dest_idx].strip()
+            if not source or not dest:
+                continue
+            source_key, dest = normalize_redirect(source, dest)
+            yield row_num, source_key, dest
+
 def parse_csv(csv_path):
     """Parse CSV file and extract redirect mappings."""
-    redirects = {}
-    
     try:
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:  # utf-8-sig strips BOM
-            # Try to detect delimiter, default to comma
-            sample = f.read(1024)
-            f.seek(0)
-            try:
-                sniffer = csv.Sniffer()
-                delimiter = sniffer.sniff(sample).delimiter
-            except:
-                delimiter = ','  # Default to comma
-            
-            reader = csv.DictReader(f, delimiter=delimiter)
-            
-            # Common column name variations (case-insensitive)
-            source_cols = ['source', 'from', 'old_url', 'old url', 'legacy_url', 'legacy url', 'url', 'Old URL']
-            dest_cols = ['destination', 'to', 'new_url', 'new url', 'target_url', 'target url', 'redirect', 'New URL']
-            
-            for row_num, row in enumerate(reader, start=2):
-                # Find source column (case-insensitive)
-                source_col = None
-                row_keys_lower = {k.lower(): k for k in row.keys()}
-                for col in source_cols:
-                    if col.lower() in row_keys_lower:
-                        source_col = row_keys_lower[col.lower()]
-                        break
-                
-                # Find destination column (case-insensitive)
-                dest_col = None
-                for col in dest_cols:
-                    if col.lower() in row_keys_lower:
-                        dest_col = row_keys_lower[col.lower()]
-                        break
-                
-                if not source_col or not dest_col:
-                    print(f"Warning: Row {row_num} - Could not find source/destination columns")
-                    print(f"  Available columns: {list(row.keys())}")
-                    continue
-                
-                source = row[source_col].strip()
-                dest = row[dest_col].strip()
-                
-                if not source or not dest:
-                    continue
-                
-                # Parse URLs
-                source_parsed = urlparse(source)
-                dest_parsed = urlparse(dest)
-                
-                # Extract path (remove domain if present)
-                source_path = source_parsed.path or source
-                dest_path = dest_parsed.path or dest
-                
-                # If destination is full URL, keep it as-is
-                if dest_parsed.netloc:
-                    redirects[normalize_path(source_path)] = dest
-                else:
-                    redirects[normalize_path(source_path)] = normalize_path(dest_path)
-        
-        return redirects
-    
+        return {source_key: dest for _, source_key, dest in iter_csv_redirects(csv_path)}
     except FileNotFoundError:
         print(f"Error: CSV file not found: {csv_path}")
         sys.exit(1)
@@ -92,6 +166,246 @@ def parse_csv(csv_path):
         print(f"Error parsing CSV: {e}")
         sys.exit(1)
 
+def merge_csv_redirects(csv_paths):
+    """
+    Merge several redirect exports into one map.
+
+    Precedence follows argument order: a later file (e.g. manual overrides
+    listed last) wins over an earlier one, and within a file a later row wins
+    over an earlier row. Returns (redirects, duplicates, conflicts) where
+    duplicates counts repeated identical rules and conflicts lists
+    (source, winning (file, row, dest), overridden (file, row, dest)).
+    """
+    redirects = {}
+    origins = {}
+    duplicates = 0
+    conflicts = []
+    
+    for csv_path in csv_paths:
+        rows = 0
+        try:
+            for row_num, source_key, dest in iter_csv_redirects(csv_path):
+                rows += 1
+                previous = redirects.get(source_key)
+                if previous is not None:
+                    if previous == dest:
+                        duplicates += 1
+                    else:
+                        conflicts.append((source_key, (csv_path.name, row_num, dest),
+                                          (*origins[source_key], previous)))
+                    # Re-insert so rule order reflects the winning row (matters for patterns)
+                    del redirects[source_key]
+                redirects[source_key] = dest
+                origins[source_key] = (csv_path.name, row_num)
+        except FileNotFoundError:
+            print(f"Error: CSV file not found: {csv_path}")
+            sys.exit(1)
+        except Exception as e:
+            print(f"Error parsing CSV {csv_path}: {e}")
+            sys.exit(1)
+        print(f"  {csv_path}: {rows} rows")
+    
+    return redirects, duplicates, conflicts
+
+def report_merge(duplicates, conflicts, limit=20):
+    """Print duplicate and conflict findings from merging exports."""
+    if duplicates:
+        print(f"\nSkipped {duplicates} duplicate rule(s) (same source and destination)")
+    if conflicts:
+        print(f"\n⚠ Found {len(conflicts)} conflicting rule(s) (later wins):")
+        for source, (win_file, win_row, win_dest), (old_file, old_row, old_dest) in conflicts[:limit]:
+            print(f"  {source}: {win_file}:{win_row} -> {win_dest}")
+            print(f"    overrides {old_file}:{old_row} -> {old_dest}")
+        if len(conflicts) > limit:
+            print(f"  ... and {len(conflicts) - limit} more")
+
+def pattern_to_regex(source):
+    """Translate a glob or regex source into a regex body (without anchors)."""
+    if source.startswith('^'):
+        return source[1:-1] if source.endswith('$') else source[1:]
+    parts = []
+    for c in source:
+        if c == '*':
+            parts.append('(.*)')
+        elif c == '?':
+            parts.append('([^/])')
+        else:
+            parts.append(re.escape(c))
+    return ''.join(parts)
+
+def compile_redirect_patterns(redirects):
+    """
+    Compile every pattern rule into a single regex of anchored alternatives.
+
+    Returns (regex_source, rules) where each rule is (group_index, group_count,
+    destination, source). group_index is the outer group wrapping that rule's
+    alternative; the rule's own captures follow it. The regex only uses syntax
+    shared by Python and JavaScript, so 404.html runs the same matcher.
+    """
+    alternatives = []
+    rules = []
+    group_index = 1
+    for source, dest in redirects.items():
+        if not is_pattern_source(source):
+            continue
+        body = pattern_to_regex(source)
+        try:
+            group_count = re.compile(body).groups
+        except re.error as e:
+            print(f"Warning: Skipping invalid pattern {source}: {e}")
+            continue
+        alternatives.append(f'({body})')
+        rules.append((group_index, group_count, dest, source))
+        group_index += group_count + 1
+    
+    if not rules:
+        return None, []
+    return '^(?:' + '|'.join(alternatives) + ')$', rules
+
+def match_redirect_pattern(compiled_regex, rules, path):
+    """Return the destination for a path matched by the compiled patterns, or None."""
+    if compiled_regex is None:
+        return None
+    match = compiled_regex.match(path)
+    if not match:
+        return None
+    for group_index, group_count, dest, _ in rules:
+        if match.group(group_index) is not None:
+            captures = match.groups()[group_index:group_index + group_count]
+            return re.sub(r'\$(\d)', lambda m: (captures[int(m.group(1)) - 1] or '') if 0 < int(m.group(1)) <= group_count else '', dest)
+    return None
+
+def is_internal(dest):
+    """Check if a redirect destination is a path on this site."""
+    return dest.startswith('/')
+
+def resolve_redirect_chains(redirects, published=frozenset()):
+    """
+    Collapse redirect chains so every rule points at its final target.
+
+    Follows exact rules first, then pattern rules, until it reaches an external
+    URL, a path nothing redirects or a published page (GitHub Pages serves the
+    page, so rules for it never fire). Pattern destinations that use captures
+    ($1, ...) are left alone since their target depends on the request.
+
+    Returns (resolved, chains, cycles): the collapsed rules (same order as the
+    input), {source: hop_count} for rules that were chains, and a list of
+    cycles (each a list of paths). Rules caught in a cycle are left out.
+    """
+    exact = {k: v for k, v in redirects.items() if not is_pattern_source(k)}
+    regex_source, rules = compile_redirect_patterns(redirects)
+    compiled = re.compile(regex_source) if regex_source else None
+
+    def next_hop(path):
+        if path in exact:
+            return exact[path]
+        return match_redirect_pattern(compiled, rules, path)
+
+    resolved = {}
+    chains = {}
+    cycles = []
+    seen_cycles = set()
+    for source, target in redirects.items():
+        if is_pattern_source(source) and '$' in target:
+            resolved[source] = target
+            continue
+        visited = [source]
+        while is_internal(target) and target not in published:
+            if target in visited:
+                cycle = visited[visited.index(target):]
+                if frozenset(cycle) not in seen_cycles:
+                    seen_cycles.add(frozenset(cycle))
+                    cycles.append(cycle + [target])
+                target = None
+                break
+            hop = next_hop(target)
+            if hop is None:
+                break
+            visited.append(target)
+            target = hop
+        if target is None:
+            continue
+        resolved[source] = target
+        if len(visited) > 1:
+            chains[source] = len(visited)
+    return resolved, chains, cycles
+
+def find_published_pages(repo_root):
+    """Paths served by a published <path>/index.html (redirect stubs excluded)."""
+    # One walk of the tree instead of a stat() per redirect
+    stubs = set(find_existing_stubs(repo_root))
+    published = set()
+    for root, dirs, files in os.walk(repo_root):
+        # Same exclusions as check_links.py: build output, tooling and hidden dirs are not published
+        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS and not d.startswith('.')]
+        page = Path(root) / 'index.html'
+        if 'index.html' in files and page not in stubs:
+            rel_dir = page.parent.relative_to(repo_root).as_posix()
+            published.add('/' + rel_dir if rel_dir != '.' else '/')
+    return published
+
+def find_shadowed_rules(redirects, published):
+    """
+    Find rules that can never fire.
+
+    - Exact sources that are published pages (GitHub Pages serves the page, so
+      404.html never runs)
+    - Pattern rules fully covered by an earlier pattern
+    """
+    shadowed = []
+    for source in sorted(redirects):
+        if source in published and source != '/':
+            shadowed.append((source, f"published page {source.lstrip('/')}/index.html exists"))
+    
+    earlier = []
+    for source in redirects:
+        if not is_pattern_source(source):
+            continue
+        if not source.startswith('^'):
+            # A later glob is covered if an earlier rule matches its literal text
+            # (a '*' in the later glob is matched by a '*' in the earlier one)
+            for earlier_source, earlier_regex in earlier:
+                if earlier_regex.fullmatch(source) or fnmatch.fnmatchcase(source, earlier_source):
+                    shadowed.append((source, f"always matched first by {earlier_source}"))
+                    break
+        try:
+            earlier.append((source, re.compile(pattern_to_regex(source))))
+        except re.error:
+            pass
+    return shadowed
+
+def report_redirect_analysis(redirects, chains, cycles, shadowed, limit=20):
+    """Print chain, cycle and shadowed-rule findings."""
+    if chains:
+        print(f"\nCollapsed {len(chains)} redirect chain(s) to a single hop:")
+        for source, hops in sorted(chains.items())[:limit]:
+            print(f"  {source} ({hops} hops) -> {redirects[source]}")
+        if len(chains) > limit:
+            print(f"  ... and {len(chains) - limit} more")
+    if cycles:
+        print(f"\n✗ Found {len(cycles)} redirect cycle(s) (sources left out of the map):")
+        for cycle in cycles:
+            print(f"  {' -> '.join(cycle)}")
+    if shadowed:
+        print(f"\n⚠ Found {len(shadowed)} rule(s) that can never fire:")
+        for source, reason in shadowed:
+            print(f"  {source}: {reason}")
+
+def generate_patterns_js(redirects):
+    """Generate the LEGACY_REDIRECT_PATTERNS declaration, or an empty list if there are none."""
+    regex_source, rules = compile_redirect_patterns(redirects)
+    if not regex_source:
+        return []
+    rule_list = json.dumps([[group_index, dest] for group_index, _, dest, _ in rules], ensure_ascii=False)
+    return [
+        "",
+        "// Pattern rules compiled into one matcher: rules are [outerGroupIndex, destination]",
+        "const LEGACY_REDIRECT_PATTERNS = {",
+        f"  regex: new RegExp({json.dumps(regex_source)}),",
+        f"  rules: {rule_list}",
+        "};",
+    ]
+
 def generate_js_file(redirects, output_path):
     """Generate JavaScript redirect map file."""
     lines = [
@@ -105,9 +419,13 @@ def generate_js_file(redirects, output_path):
         " *   '/old-url': '/new-url'           - Internal redirect",
         " *   '/old-url': 'https://external'   - External redirect",
         " *",
+        " * Glob/regex rules from the CSV are compiled into LEGACY_REDIRECT_PATTERNS",
+        " * and only checked when there is no exact match.",
+        " *",
         " * IMPORTANT:",
         " * - All paths should start with '/'",
         " * - Use exact path matches (case-sensitive)",
+        " * - Chains are already collapsed: every target is final",
         " * - Do not edit manually - regenerate from CSV instead",
         " */",
         "",
@@ -115,7 +433,7 @@ def generate_js_file(redirects, output_path):
     ]
     
     # Sort redirects for easier reading
-    sorted_redirects = sorted(redirects.items())
+    sorted_redirects = sorted((k, v) for k, v in redirects.items() if not is_pattern_source(k))
     
     for i, (old_path, new_path) in enumerate(sorted_redirects):
         # Escape quotes in paths
@@ -126,14 +444,20 @@ def generate_js_file(redirects, output_path):
         comma = "," if i < len(sorted_redirects) - 1 else ""
         lines.append(f"  '{old_path_escaped}': '{new_path_escaped}'{comma}")
     
+    lines.append("};")
+    
+    pattern_lines = generate_patterns_js(redirects)
+    lines.extend(pattern_lines)
+    
     lines.extend([
-        "};",
         "",
         "// Make it globally available",
         "if (typeof window !== 'undefined') {",
         "  window.LEGACY_REDIRECTS = LEGACY_REDIRECTS;",
-        "}"
     ])
+    if pattern_lines:
+        lines.append("  window.LEGACY_REDIRECT_PATTERNS = LEGACY_REDIRECT_PATTERNS;")
+    lines.append("}")
     
     # Write to file
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -143,29 +467,334 @@ def generate_js_file(redirects, output_path):
     print(f"✓ Generated redirect map: {output_path}")
     print(f"  Total redirects: {len(redirects)}")
 
+def first_segment(path):
+    """Return the first path segment ('/agl1/x' -> 'agl1', '/' -> '')."""
+    return path.lstrip('/').split('/', 1)[0]
+
+def build_redirect_shards(redirects, max_entries=DEFAULT_MAX_SHARD_ENTRIES):
+    """
+    Split redirects into shards keyed by a prefix of their first path segment.
+
+    Works like a trie: everything starts in the '' shard, and any shard holding
+    more than max_entries redirects is split one character deeper. A lookup uses
+    the longest shard prefix that its first segment starts with.
+    """
+    shards = {}
+
+    def split(prefix, items):
+        if len(items) <= max_entries:
+            shards[prefix] = dict(items)
+            return
+        # Paths whose first segment is exactly the prefix cannot go deeper
+        own = [(k, v) for k, v in items if len(first_segment(k)) <= len(prefix)]
+        children = {}
+        for k, v in items:
+            segment = first_segment(k)
+            if len(segment) > len(prefix):
+                children.setdefault(segment[:len(prefix) + 1], []).append((k, v))
+        if own or not children:
+            shards[prefix] = dict(own)
+        for child_prefix, child_items in sorted(children.items()):
+            split(child_prefix, child_items)
+
+    split('', sorted(redirects.items()))
+    return shards
+
+def shard_json(shard):
+    """Serialize a shard compactly and deterministically."""
+    return json.dumps(shard, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+def shard_filename(content):
+    """Content-addressed shard filename, so shards can be cached indefinitely."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:12] + '.json'
+
+def generate_loader_js(shard_files, shard_base, pattern_lines=()):
+    """Generate the loader script that maps a path to its shard and looks it up."""
+    shard_map = json.dumps(shard_files, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    lines = [
+        "/**",
+        " * Legacy URL Redirects Loader",
+        " *",
+        " * Sharded lookup for legacy agroverse.shop URLs. Redirects are split into",
+        " * JSON shards by the prefix of their first path segment; a 404 only fetches",
+        " * the one shard its path can be in.",
+        " * Auto-generated by scripts/generate_redirects.py --sharded",
+        " *",
+        " * Usage:",
+        " *   lookupLegacyRedirect('/old-url').then(target => { ... })  // target or null",
+        " *",
+        " * Exact matches come from the shards; glob/regex rules are compiled into",
+        " * LEGACY_REDIRECT_PATTERNS below and only checked on a shard miss.",
+        " *",
+        " * IMPORTANT:",
+        " * - Do not edit manually - regenerate from CSV instead",
+        " */",
+        "",
+        "(function() {",
+        f"  const SHARD_BASE = '{shard_base}';",
+        f"  const SHARDS = {shard_map};",
+    ]
+    lines.extend('  ' + line if line else line for line in pattern_lines)
+    lines.extend([
+        "",
+        "  function matchPattern(path) {",
+        "    if (typeof LEGACY_REDIRECT_PATTERNS === 'undefined') {",
+        "      return null;",
+        "    }",
+        "    const match = LEGACY_REDIRECT_PATTERNS.regex.exec(path);",
+        "    if (!match) {",
+        "      return null;",
+        "    }",
+        "    const rule = LEGACY_REDIRECT_PATTERNS.rules.find(r => match[r[0]] !== undefined);",
+        "    return rule[1].replace(/\\$(\\d)/g, (_, n) => match[rule[0] + Number(n)] || '');",
+        "  }",
+        "",
+        "  function lookupLegacyRedirect(path) {",
+        "    let prefix = path.replace(/^\\/+/, '').split('/')[0];",
+        "    while (prefix.length > 0 && !(prefix in SHARDS)) {",
+        "      prefix = prefix.slice(0, -1);",
+        "    }",
+        "    if (!(prefix in SHARDS)) {",
+        "      return Promise.resolve(matchPattern(path));",
+        "    }",
+        "    return fetch(SHARD_BASE + SHARDS[prefix])",
+        "      .then(response => response.ok ? response.json() : {})",
+        "      .then(shard => shard[path] || matchPattern(path))",
+        "      .catch(() => matchPattern(path));",
+        "  }",
+        "",
+        "  if (typeof window !== 'undefined') {",
+        "    window.lookupLegacyRedirect = lookupLegacyRedirect;",
+        "  }",
+        "})();",
+    ])
+    return '\n'.join(lines)
+
+def generate_sharded_files(redirects, output_path, max_entries=DEFAULT_MAX_SHARD_ENTRIES):
+    """Generate the sharded redirect lookup: loader at output_path, shards beside it."""
+    shard_dir = output_path.parent / output_path.stem
+    shard_base = '/' + output_path.parent.name + '/' + shard_dir.name + '/'
+
+    exact = {k: v for k, v in redirects.items() if not is_pattern_source(k)}
+    shards = build_redirect_shards(exact, max_entries)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    shard_files = {}
+    for prefix, shard in shards.items():
+        content = shard_json(shard)
+        filename = shard_filename(content)
+        shard_files[prefix] = filename
+        shard_path = shard_dir / filename
+        if not shard_path.exists():
+            with open(shard_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+
+    # Remove shards no longer referenced by the loader
+    for stale in shard_dir.glob('*.json'):
+        if stale.name not in shard_files.values():
+            stale.unlink()
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(generate_loader_js(shard_files, shard_base, generate_patterns_js(redirects)))
+
+    print(f"✓ Generated sharded redirect loader: {output_path}")
+    print(f"  Total redirects: {len(exact)} in {len(shards)} shard(s) under {shard_dir}")
+    print(f"  Pattern rules: {len(redirects) - len(exact)}")
+
+def generate_stub_html(target):
+    """Generate a redirect stub page pointing at target."""
+    absolute = target if not is_internal(target) else BASE_URL + target
+    target_attr = html.escape(target, quote=True)
+    # '</' would end the inline script early
+    target_js = json.dumps(target).replace('</', '<\\/')
+    return '\n'.join([
+        '<!DOCTYPE html>',
+        STUB_MARKER,
+        '<html lang="en">',
+        '<head>',
+        '  <meta charset="UTF-8">',
+        '  <title>Redirecting...</title>',
+        '  <meta name="robots" content="noindex">',
+        f'  <link rel="canonical" href="{html.escape(absolute, quote=True)}">',
+        f'  <meta http-equiv="refresh" content="0; url={target_attr}">',
+        f'  <script>window.location.replace({target_js});</script>',
+        '</head>',
+        '<body>',
+        f'  <p>This page has moved to <a href="{target_attr}">{html.escape(target)}</a>.</p>',
+        '</body>',
+        '</html>',
+        '',
+    ])
+
+def is_stub(content):
+    """Check if page content (or its first few hundred bytes) is a generated stub."""
+    return STUB_MARKER in content[:256]
+
+def write_stub(stub_path, content):
+    """Write one stub page. Returns 'written', 'unchanged' or 'skipped' (a real page is there)."""
+    if stub_path.exists():
+        existing = stub_path.read_text(encoding='utf-8', errors='ignore')
+        if not is_stub(existing):
+            return 'skipped'
+        if existing == content:
+            return 'unchanged'
+    stub_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(stub_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return 'written'
+
+def find_existing_stubs(repo_root):
+    """Find stub pages from previous runs (identified by their marker line)."""
+    stubs = []
+    for root, dirs, files in os.walk(repo_root):
+        dirs[:] = [d for d in dirs if d not in STUB_SCAN_EXCLUDED_DIRS]
+        if 'index.html' in files:
+            path = Path(root) / 'index.html'
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                if is_stub(f.read(256)):
+                    stubs.append(path)
+    return stubs
+
+def generate_redirect_stubs(redirects, repo_root, max_workers=16):
+    """
+    Write <path>/index.html redirect stubs for every exact legacy path, in parallel.
+
+    Unchanged stubs are not rewritten, published pages are never overwritten,
+    and stubs whose legacy path is no longer in the map are removed.
+    """
+    jobs = {}
+    for source, target in sorted(redirects.items()):
+        if is_pattern_source(source) or source == '/':
+            continue
+        jobs[repo_root / source.lstrip('/') / 'index.html'] = generate_stub_html(target)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(jobs, executor.map(lambda item: write_stub(*item), jobs.items())))
+
+    removed = 0
+    for stub_path in find_existing_stubs(repo_root):
+        if stub_path not in jobs:
+            stub_path.unlink()
+            try:
+                stub_path.parent.rmdir()
+            except OSError:
+                pass  # Directory still holds other files
+            removed += 1
+
+    counts = {status: list(results.values()).count(status) for status in ('written', 'unchanged', 'skipped')}
+    print(f"✓ Redirect stubs: {counts['written']} written, {counts['unchanged']} unchanged, {removed} removed")
+    for stub_path, status in results.items():
+        if status == 'skipped':
+            print(f"  ⚠ Skipped {stub_path.relative_to(repo_root)} (published page exists)")
+
+def benchmark_redirect_formats(redirects, max_entries=DEFAULT_MAX_SHARD_ENTRIES, scale_to=50000):
+    """Print payload sizes and lookup timings for the flat map vs the sharded lookup."""
+    def report(label, redirect_map):
+        redirect_map = {k: v for k, v in redirect_map.items() if not is_pattern_source(k)}
+        lines = []
+        for old_path, new_path in sorted(redirect_map.items()):
+            lines.append(f"  '{old_path}': '{new_path}',")
+        flat_js = "const LEGACY_REDIRECTS = {\n" + '\n'.join(lines) + "\n};"
+        flat_bytes = len(flat_js.encode('utf-8'))
+        flat_gzip = len(gzip.compress(flat_js.encode('utf-8')))
+
+        shards = build_redirect_shards(redirect_map, max_entries)
+        shard_contents = {prefix: shard_json(shard) for prefix, shard in shards.items()}
+        loader_js = generate_loader_js({p: shard_filename(c) for p, c in shard_contents.items()}, '/js/legacy-redirects/')
+        loader_gzip = len(gzip.compress(loader_js.encode('utf-8')))
+        shard_gzips = [len(gzip.compress(c.encode('utf-8'))) for c in shard_contents.values()]
+
+        # Lookup cost: parse what a 404 downloads, then find the path.
+        # JSON parsing in Python stands in for the browser evaluating the payload.
+        flat_json = shard_json(redirect_map)
+        samples = random.Random(0).sample(sorted(redirect_map), min(200, len(redirect_map)))
+        start = time.perf_counter()
+        for path in samples:
+            json.loads(flat_json).get(path)
+        flat_ms = (time.perf_counter() - start) * 1000 / len(samples)
+
+        start = time.perf_counter()
+        for path in samples:
+            prefix = first_segment(path)
+            while prefix and prefix not in shard_contents:
+                prefix = prefix[:-1]
+            json.loads(shard_contents[prefix]).get(path)
+        sharded_ms = (time.perf_counter() - start) * 1000 / len(samples)
+
+        print(f"\n{label}: {len(redirect_map)} redirects, {len(shards)} shard(s)")
+        print(f"  Flat map:      {flat_bytes:>10,} bytes ({flat_gzip:,} gzip) per 404, {flat_ms:.3f} ms/lookup")
+        print(f"  Sharded:       {loader_gzip + max(shard_gzips):>10,} bytes gzip per 404 at most "
+              f"(loader {loader_gzip:,} + largest shard {max(shard_gzips):,}), {sharded_ms:.3f} ms/lookup")
+
+    print("Benchmark: flat LEGACY_REDIRECTS map vs sharded lookup")
+    report("Current map", redirects)
+
+    # Synthetic map at import scale, built from the real destinations
+    destinations = sorted(set(redirects.values()))
+    rng = random.Random(42)
+    alphabet = 'abcdefghijklmnopqrstuvwxyz0123456789-'
+    synthetic = {k: v for k, v in redirects.items() if not is_pattern_source(k)}
+    while len(synthetic) < scale_to:
+        segment = ''.join(rng.choice(alphabet) for _ in range(rng.randint(4, 24)))
+        synthetic['/' + segment] = rng.choice(destinations)
+    report("Synthetic import-scale map", synthetic)
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 scripts/generate_redirects.py <csv_file>")
-        print("\nExample:")
-        print("  python3 scripts/generate_redirects.py legacy_agroverse_shop_URL_Redirects_Export.csv")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Generate legacy redirect map from CSV')
+    parser.add_argument('csv_files', nargs='+', metavar='csv_file',
+                        help='Redirect export CSV(s); when several are given, later files take precedence')
+    parser.add_argument('--sharded', action='store_true',
+                        help='Emit a sharded lookup (loader + JSON shards) instead of one flat map')
+    parser.add_argument('--max-shard-entries', type=int, default=DEFAULT_MAX_SHARD_ENTRIES,
+                        help=f'Maximum redirects per shard (default {DEFAULT_MAX_SHARD_ENTRIES})')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Compare flat vs sharded payload size and lookup time')
+    parser.add_argument('--stubs', action='store_true',
+                        help='Also write <path>/index.html redirect stub pages for legacy paths')
+    args = parser.parse_args()
     
-    csv_path = Path(sys.argv[1])
+    csv_paths = [Path(p) for p in args.csv_files]
     
     # Default output path
     script_dir = Path(__file__).parent
     repo_root = script_dir.parent
     output_path = repo_root / 'js' / 'legacy-redirects.js'
     
-    print(f"Parsing CSV: {csv_path}")
-    redirects = parse_csv(csv_path)
+    start = time.perf_counter()
+    print(f"Parsing CSV: {', '.join(str(p) for p in csv_paths)}")
+    redirects, duplicates, conflicts = merge_csv_redirects(csv_paths)
     
     if not redirects:
         print("Warning: No redirects found in CSV file")
         sys.exit(1)
     
-    print(f"Found {len(redirects)} redirects")
-    generate_js_file(redirects, output_path)
+    print(f"Found {len(redirects)} redirects ({time.perf_counter() - start:.2f}s)")
+    report_merge(duplicates, conflicts)
+    
+    # Collapse chains and report rules that loop or can never fire
+    published = find_published_pages(repo_root)
+    resolved, chains, cycles = resolve_redirect_chains(redirects, published)
+    shadowed = find_shadowed_rules(redirects, published)
+    report_redirect_analysis(resolved, chains, cycles, shadowed)
+    redirects = resolved
+    
+    if args.benchmark:
+        benchmark_redirect_formats(redirects, args.max_shard_entries)
+        return
+    
+    if args.sharded:
+        generate_sharded_files(redirects, output_path, args.max_shard_entries)
+    else:
+        generate_js_file(redirects, output_path)
+        # A flat map supersedes any shards from a previous --sharded run
+        shard_dir = output_path.parent / output_path.stem
+        if shard_dir.exists():
+            for stale in shard_dir.glob('*.json'):
+                stale.unlink()
+            shard_dir.rmdir()
+    
+    if args.stubs:
+        generate_redirect_stubs(redirects, repo_root)
     
     print("\nNext steps:")
     print("1. Review js/legacy-redirects.js to verify redirects")
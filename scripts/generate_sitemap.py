@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Generate sitemap.xml (and a sitemap index when needed) for the site.
+
+Every published index.html becomes a <url> entry with its images. The
+<lastmod> date comes from a content hash rather than filesystem mtime (which
+our fix/update scripts bump constantly): hashes are recorded in
+scripts/sitemap_state.json and a page's lastmod only moves when its content
+actually changes. Unchanged pages are not re-parsed, and an unchanged site
+produces byte-identical sitemaps.
+
+Once the URL count approaches the 50,000 per-file limit, output is split into
+sitemap-1.xml, sitemap-2.xml, ... and sitemap.xml becomes a sitemap index.
+
+Usage:
+    python3 scripts/generate_sitemap.py
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote, urljoin
+from xml.sax.saxutils import escape
+from bs4 import BeautifulSoup
+
+BASE_DIR = Path(__file__).parent.parent
+BASE_URL = 'https://www.agroverse.shop'
+STATE_FILE = Path(__file__).parent / 'sitemap_state.json'
+
+# Protocol limits are 50,000 URLs and 50 MB per file; split before reaching them
+MAX_URLS_PER_SITEMAP = 45000
+MAX_BYTES_PER_SITEMAP = 45 * 1024 * 1024
+MAX_IMAGES_PER_URL = 1000
+
+# Directories that never contain published pages
+EXCLUDED_DIRS = {'.git', 'node_modules', '__pycache__', 'assets', 'docs', 'scripts',
+                 'google-app-script', 'search', 'js', 'css', '_site'}
+
+# Transactional pages that should not be indexed
+EXCLUDED_PAGES = {'checkout', 'order-status', 'order-history', 'quote-request'}
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+IMAGE_NS = 'http://www.google.com/schemas/sitemap-image/1.1'
+
+
+def find_published_pages():
+    """Find every published index.html, sorted by path."""
+    pages = []
+    for index_file in BASE_DIR.rglob('index.html'):
+        rel_parts = index_file.relative_to(BASE_DIR).parts[:-1]
+        if rel_parts and (rel_parts[0] in EXCLUDED_DIRS or rel_parts[0] in EXCLUDED_PAGES):
+            continue
+        if any(part.startswith('.') for part in rel_parts):
+            continue
+        pages.append(index_file)
+    return sorted(pages)
+
+
+def page_url(index_file):
+    """Absolute URL for a page, derived from its directory."""
+    rel_dir = index_file.parent.relative_to(BASE_DIR).as_posix()
+    return f"{BASE_URL}/" if rel_dir == '.' else f"{BASE_URL}/{rel_dir}/"
+
+
+def extract_page_entry(index_file, content):
+    """Extract the sitemap location and images from a page. Returns None for noindex pages."""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    robots = soup.find('meta', {'name': 'robots'})
+    if robots and 'noindex' in robots.get('content', '').lower():
+        return None
+
+    url = page_url(index_file)
+
+    # Prefer the page's own canonical URL when it points at this site
+    canonical = soup.find('link', rel='canonical')
+    if canonical and canonical.get('href', '').startswith(BASE_URL):
+        url = canonical['href']
+
+    images = []
+    og_image = soup.find('meta', property='og:image')
+    if og_image and og_image.get('content'):
+        images.append(og_image['content'])
+    for img in soup.find_all('img'):
+        src = (img.get('src') or '').strip()
+        if src and not src.startswith('data:'):
+            images.append(urljoin(page_url(index_file), src))
+
+    # Percent-encode spaces and other unsafe characters, de-duplicate keeping document order
+    images = [quote(image, safe=":/?#[]@!$&'()*+,;=%~") for image in images]
+    images = list(dict.fromkeys(images))[:MAX_IMAGES_PER_URL]
+
+    return {'loc': url, 'images': images}
+
+
+def load_state():
+    """Load the per-page hash/lastmod state from the previous run."""
+    if not STATE_FILE.exists():
+        return {}
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️  Could not read {STATE_FILE.name}, starting fresh: {e}")
+        return {}
+
+
+def collect_entries(pages, state):
+    """Build sitemap entries, re-parsing only pages whose content hash changed."""
+    today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+    new_state = {}
+    entries = []
+    changed = 0
+
+    for index_file in pages:
+        key = index_file.relative_to(BASE_DIR).as_posix()
+        content = index_file.read_bytes()
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        previous = state.get(key)
+        if previous and previous.get('hash') == content_hash:
+            record = previous
+        else:
+            entry = extract_page_entry(index_file, content.decode('utf-8', errors='ignore'))
+            record = {'hash': content_hash, 'lastmod': today, 'entry': entry}
+            changed += 1
+
+        new_state[key] = record
+        if record['entry']:
+            entries.append(dict(record['entry'], lastmod=record['lastmod']))
+
+    removed = len(set(state) - set(new_state))
+    return entries, new_state, changed, removed
+
+
+def render_url(entry):
+    """Render a single <url> element."""
+    lines = [
+        '  <url>',
+        f'    <loc>{escape(entry["loc"])}</loc>',
+        f'    <lastmod>{entry["lastmod"]}</lastmod>',
+    ]
+    for image in entry['images']:
+        lines.append(f'    <image:image><image:loc>{escape(image)}</image:loc></image:image>')
+    lines.append('  </url>')
+    return '\n'.join(lines)
+
+
+def render_urlset(rendered_urls):
+    """Render a complete <urlset> document."""
+    return '\n'.join([
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<urlset xmlns="{SITEMAP_NS}" xmlns:image="{IMAGE_NS}">',
+        *rendered_urls,
+        '</urlset>',
+        '',
+    ])
+
+
+def render_index(sitemaps):
+    """Render a <sitemapindex> document from (filename, lastmod) pairs."""
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<sitemapindex xmlns="{SITEMAP_NS}">',
+    ]
+    for filename, lastmod in sitemaps:
+        lines.extend([
+            '  <sitemap>',
+            f'    <loc>{BASE_URL}/{filename}</loc>',
+            f'    <lastmod>{lastmod}</lastmod>',
+            '  </sitemap>',
+        ])
+    lines.extend(['</sitemapindex>', ''])
+    return '\n'.join(lines)
+
+
+def split_entries(entries):
+    """Split entries into chunks that respect the per-file URL and size limits."""
+    chunks = []
+    current = []
+    current_bytes = 0
+    for entry in entries:
+        rendered = render_url(entry)
+        size = len(rendered.encode('utf-8')) + 1
+        if current and (len(current) >= MAX_URLS_PER_SITEMAP or current_bytes + size > MAX_BYTES_PER_SITEMAP):
+            chunks.append(current)
+            current, current_bytes = [], 0
+        current.append((entry, rendered))
+        current_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def write_if_changed(path, content):
+    """Write content only when it differs from what is on disk. Returns True if written."""
+    if path.exists() and path.read_text(encoding='utf-8') == content:
+        return False
+    path.write_text(content, encoding='utf-8')
+    return True
+
+
+def write_sitemaps(entries):
+    """Write sitemap.xml, or a sitemap index plus numbered sitemaps. Returns files written."""
+    entries = sorted(entries, key=lambda e: e['loc'])
+    chunks = split_entries(entries)
+    outputs = {}
+
+    if len(chunks) <= 1:
+        outputs['sitemap.xml'] = render_urlset([rendered for _, rendered in (chunks[0] if chunks else [])])
+    else:
+        index_entries = []
+        for number, chunk in enumerate(chunks, start=1):
+            filename = f'sitemap-{number}.xml'
+            outputs[filename] = render_urlset([rendered for _, rendered in chunk])
+            index_entries.append((filename, max(entry['lastmod'] for entry, _ in chunk)))
+        outputs['sitemap.xml'] = render_index(index_entries)
+
+    written = [name for name, content in outputs.items() if write_if_changed(BASE_DIR / name, content)]
+
+    # Remove numbered sitemaps left over from a previous, larger split
+    for stale in BASE_DIR.glob('sitemap-*.xml'):
+        if stale.name not in outputs:
+            stale.unlink()
+            written.append(stale.name)
+
+    return outputs, written
+
+
+def main():
+    """Generate the sitemap."""
+    print("🗺️  Generating sitemap...")
+    pages = find_published_pages()
+    print(f"   Found {len(pages)} published pages")
+
+    state = load_state()
+    entries, new_state, changed, removed = collect_entries(pages, state)
+    outputs, written = write_sitemaps(entries)
+    write_if_changed(STATE_FILE, json.dumps(new_state, indent=2, sort_keys=True) + '\n')
+
+    image_count = sum(len(e['images']) for e in entries)
+    print(f"\n✅ {len(entries)} URLs, {image_count} images in {len(outputs)} file(s)")
+    print(f"   Pages changed since last run: {changed}, removed: {removed}")
+    if written:
+        print(f"   Written: {', '.join(sorted(written))}")
+    else:
+        print("   Sitemaps unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Give hero sections a blurred placeholder while their background image loads.
+
+Build stage run by build_site.py before critical-css. Farm, partner and
+journey pages open with a full-screen <section class="farm-hero|partner-hero|
+journey-hero"> (the sections update_social_meta_tags.extract_hero_image
+reads) whose multi-MB background leaves a blank block until it arrives. For
+every such hero with a local background image:
+
+- a tiny blurred copy of the image (a WebP data: URI of a few hundred bytes)
+  is added as an extra background layer *below* the real image, with the
+  same position and size, so it paints immediately and the real image covers
+  it as soon as it has loaded - no script involved;
+- the image's dominant colour becomes the background-color, unless the hero
+  already sets one, so the space is tinted even before the first paint of the
+  placeholder.
+
+The background is rewritten where it is declared: the hero's style attribute
+or, failing that, the page's .<hero-class> rule. Heroes whose image is
+remote (static.wixstatic.com, raw.githubusercontent.com) are left alone.
+Placeholders are cached by the content hash of the source image (the copy in
+the repository, not the recompressed one in the build) in
+.cache/hero_placeholders.json.
+
+Usage:
+    python3 scripts/hero_placeholders.py [--site-dir _site]
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import re
+from pathlib import Path
+
+from check_links import CSS_URL_PATTERN, EXTERNAL_PREFIXES, reference_target
+from critical_css import split_top_level
+
+try:
+    from PIL import Image, ImageFilter, ImageOps
+except ImportError:
+    Image = None
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+CACHE_FILE = BASE_DIR / ".cache" / "hero_placeholders.json"
+
+# Bump when placeholder encoding changes so cached placeholders are rebuilt
+CACHE_VERSION = 1
+
+# Placeholder width in pixels; the browser's upscaling adds the rest of the blur
+PLACEHOLDER_WIDTH = 24
+PLACEHOLDER_QUALITY = 40
+
+HERO_PATTERN = re.compile(r'<section\b[^>]*\bclass="[^"]*\b(farm-hero|partner-hero|journey-hero)\b[^"]*"[^>]*>')
+STYLE_ATTRIBUTE_PATTERN = re.compile(r'(\sstyle=")([^"]*)(")')
+STYLE_PATTERN = re.compile(r'(<style(?: type="text/css")?>)(.*?)(</style>)', re.S)
+BACKGROUND_PATTERN = re.compile(r'(?<![\w-])(background(?:-image)?)\s*:([^;]*)', re.I)
+BACKGROUND_COLOR_PATTERN = re.compile(r'(?<![\w-])background-color\s*:', re.I)
+
+
+def make_placeholder(path):
+    """[data: URI of a tiny blurred WebP, dominant colour as #rrggbb] for an image."""
+    with Image.open(path) as opened:
+        image = ImageOps.exif_transpose(opened).convert('RGB')
+    image.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH * 4))
+    blurred = image.filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    blurred.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY, method=6)
+    data_uri = 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    palette = image.quantize(5)
+    count, index = max(palette.getcolors())
+    red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+    return [data_uri, f"#{red:02x}{green:02x}{blue:02x}"]
+
+
+def local_image(rel_path, value):
+    """Site-relative path of the local url() in a background value, or None."""
+    for match in CSS_URL_PATTERN.finditer(value):
+        url = match.group(2).strip()
+        if not url.lower().startswith(EXTERNAL_PREFIXES):
+            return reference_target(rel_path, url)
+    return None
+
+
+def add_placeholder(declarations, rel_path, site_dir, placeholders):
+    """Declarations with the placeholder layer added to their background, or None if there is none."""
+    matches = [match for match in BACKGROUND_PATTERN.finditer(declarations) if 'url(' in match.group(2)]
+    if not matches:
+        return None
+    # The last background declaration is the one that applies
+    match = matches[-1]
+    image = local_image(rel_path, match.group(2))
+    if not image or not (site_dir / image).is_file():
+        return None
+    data_uri, color = placeholders(image)
+    if data_uri in declarations:
+        return None
+
+    layers = split_top_level(match.group(2), ',')
+    image_layer = next(layer for layer in layers if 'url(' in layer)
+    placeholder_layer = CSS_URL_PATTERN.sub(lambda m: f"url('{data_uri}')", image_layer.strip(), count=1)
+    declaration = f"{match.group(1)}:{match.group(2).rstrip()}, {placeholder_layer}"
+    if not BACKGROUND_COLOR_PATTERN.search(declarations):
+        declaration += f"; background-color: {color}"
+    return declarations[:match.start()] + declaration + declarations[match.end():]
+
+
+def process_page(site_dir, rel_path, content, placeholders):
+    """Add a placeholder to the page's hero background. Returns the new content (unchanged if none)."""
+    hero = HERO_PATTERN.search(content)
+    if not hero:
+        return content
+
+    style = STYLE_ATTRIBUTE_PATTERN.search(hero.group(0))
+    if style and 'url(' in style.group(2):
+        rewritten = add_placeholder(style.group(2), rel_path, site_dir, placeholders)
+        if rewritten is None:
+            return content
+        tag = hero.group(0)[:style.start(2)] + rewritten + hero.group(0)[style.end(2):]
+        return content[:hero.start()] + tag + content[hero.end():]
+
+    rule_pattern = re.compile(r'((?<![\w-])\.%s\s*\{)([^{}]*)(\})' % hero.group(1))
+    for block in STYLE_PATTERN.finditer(content):
+        for rule in rule_pattern.finditer(block.group(2)):
+            rewritten = add_placeholder(rule.group(2), rel_path, site_dir, placeholders)
+            if rewritten is not None:
+                start = block.start(2) + rule.start(2)
+                return content[:start] + rewritten + content[block.start(2) + rule.end(2):]
+    return content
+
+
+def load_cache():
+    """Load placeholders from previous builds."""
+    empty = {'placeholders': {}, 'files': {}}
+    if not CACHE_FILE.exists():
+        return empty
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception:
+        return empty
+    return cache if cache.get('version') == CACHE_VERSION else empty
+
+
+def save_cache(cache):
+    """Persist placeholders."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    cache['version'] = CACHE_VERSION
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, separators=(',', ':'), sort_keys=True)
+
+
+def hero_placeholders(site_dir=SITE_DIR):
+    """Add hero placeholders in every page of the build directory. Returns a summary."""
+    if Image is None:
+        return "skipped - Pillow is not installed (pip install Pillow)"
+
+    cache = load_cache()
+    files, used = {}, {}
+    heroes = 0
+
+    def placeholders(rel_path):
+        # The source copy: the recompress stage rewrites the one in the build after this stage
+        path = BASE_DIR / rel_path if (BASE_DIR / rel_path).is_file() else site_dir / rel_path
+        stat = path.stat()
+        signature = [stat.st_mtime_ns, stat.st_size]
+        cached = cache['files'].get(rel_path)
+        if cached and cached[0] == signature:
+            key = cached[1]
+        else:
+            key = hashlib.sha1(path.read_bytes()).hexdigest()
+        files[rel_path] = [signature, key]
+        if key not in used:
+            used[key] = cache['placeholders'].get(key) or make_placeholder(path)
+        return used[key]
+
+    pages = 0
+    for page in sorted(site_dir.rglob('*.html')):
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        if not HERO_PATTERN.search(content):
+            continue
+        heroes += 1
+        rel_path = page.relative_to(site_dir).as_posix()
+        rewritten = process_page(site_dir, rel_path, content, placeholders)
+        if rewritten != content:
+            page.write_text(rewritten, encoding='utf-8')
+            pages += 1
+
+    save_cache({'placeholders': used, 'files': files})
+    size = sum(len(data_uri) for data_uri, _ in used.values())
+    return (f"{pages} of {heroes} hero sections given placeholders "
+            f"({len(used)} images, {size / max(len(used), 1):.0f} bytes each); "
+            f"{heroes - pages} without a local background image")
+
+
+def main():
+    """Add hero placeholders in an existing build directory."""
+    parser = argparse.ArgumentParser(description='Add blurred placeholders to hero backgrounds in the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    print(f"✅ {hero_placeholders(args.site_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Add intrinsic dimensions and loading hints to <img> tags in the build output.
+
+Build stage run by build_site.py before fingerprinting (it needs the original
+image paths). For every <img> in a built page:
+
+- local images without width/height get their intrinsic size, read from the
+  file header only (PNG, GIF, JPEG incl. EXIF rotation, WebP, AVIF, SVG) -
+  no image is decoded. A zero-specificity `height: auto` rule is added to the
+  page so CSS that sets only a width keeps the aspect ratio.
+- images below the first viewport (after the header and the first content
+  blocks of <body>, or after the first few content images) get
+  loading="lazy" decoding="async".
+- the hero image (first image in an above-the-fold *hero* element) gets
+  fetchpriority="high".
+
+Attributes already present are never changed. Probed sizes are cached in
+.cache/image_dimensions.json by size and mtime, and each page's fold and hero
+positions by page content.
+
+Usage:
+    python3 scripts/image_attributes.py [--site-dir _site]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import struct
+from pathlib import Path
+
+from bs4 import BeautifulSoup, Tag
+
+from check_links import EXTERNAL_PREFIXES, reference_target
+from critical_css import ABOVE_FOLD_BLOCKS, NON_CONTENT_TAGS
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+CACHE_FILE = BASE_DIR / ".cache" / "image_dimensions.json"
+
+# Bump when fold detection changes so cached page positions are rebuilt
+CACHE_VERSION = 1
+
+# Enough for any header we parse; JPEGs with large EXIF/ICC blocks fall back to a full read
+HEADER_BYTES = 64 * 1024
+
+IMG_PATTERN = re.compile(r'<img\b[^>]*>', re.I)
+IMG_SRC_PATTERN = re.compile(r'\ssrc="([^"]*)"')
+SVG_TAG_PATTERN = re.compile(rb'<svg\b[^>]*>', re.S)
+SVG_ATTRIBUTE_PATTERN = re.compile(rb'\b(width|height|viewBox)\s*=\s*["\']([^"\']*)["\']')
+ASPECT_RATIO_STYLE = '<style>:where(img[width][height]){height:auto}</style>'
+
+# Content images (after the header) loaded eagerly even when a long first
+# content block puts more of them above the fold
+EAGER_IMAGES = 3
+
+# EXIF orientations 5-8 rotate the image by 90 degrees
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def jpeg_orientation(exif):
+    """EXIF orientation tag from an APP1 payload (after 'Exif\\0\\0'), or 1."""
+    if len(exif) < 8 or exif[:2] not in (b'II', b'MM'):
+        return 1
+    endian = '<' if exif[:2] == b'II' else '>'
+    offset = struct.unpack(endian + 'I', exif[4:8])[0]
+    if offset + 2 > len(exif):
+        return 1
+    count = struct.unpack(endian + 'H', exif[offset:offset + 2])[0]
+    for i in range(count):
+        entry = offset + 2 + i * 12
+        if entry + 12 > len(exif):
+            break
+        tag, _, _, value = struct.unpack(endian + 'HHIH', exif[entry:entry + 10])
+        if tag == 0x0112:
+            return value
+    return 1
+
+
+def jpeg_size(data):
+    """(width, height) from JPEG markers, honouring EXIF rotation."""
+    i, orientation = 2, 1
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        length = struct.unpack('>H', data[i + 2:i + 4])[0]
+        if marker == 0xE1 and data[i + 4:i + 10] == b'Exif\0\0':
+            orientation = jpeg_orientation(data[i + 10:i + 2 + length])
+        if marker in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return (height, width) if orientation in ROTATED_ORIENTATIONS else (width, height)
+        i += 2 + length
+    return None
+
+
+def webp_size(data):
+    """(width, height) from a WebP VP8/VP8L/VP8X chunk."""
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30:
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25:
+        bits = struct.unpack('<I', data[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(data) >= 30:
+        return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+    return None
+
+
+def avif_size(data):
+    """(width, height) from the first 'ispe' property box of an AVIF/HEIF file."""
+    index = data.find(b'ispe')
+    if index == -1 or index + 16 > len(data):
+        return None
+    return struct.unpack('>II', data[index + 8:index + 16])
+
+
+def svg_size(data):
+    """(width, height) from the root <svg> width/height attributes, else its viewBox."""
+    match = SVG_TAG_PATTERN.search(data)
+    if not match:
+        return None
+    attributes = {name.decode(): value.decode() for name, value in SVG_ATTRIBUTE_PATTERN.findall(match.group(0))}
+    try:
+        width = float(re.sub(r'px$', '', attributes['width']))
+        height = float(re.sub(r'px$', '', attributes['height']))
+        return round(width), round(height)
+    except (KeyError, ValueError):
+        pass
+    view_box = attributes.get('viewBox', '').replace(',', ' ').split()
+    if len(view_box) == 4:
+        try:
+            return round(float(view_box[2])), round(float(view_box[3]))
+        except ValueError:
+            return None
+    return None
+
+
+def probe_image_size(path):
+    """Intrinsic (width, height) of an image read from its header, or None if unknown."""
+    with open(path, 'rb') as f:
+        data = f.read(HEADER_BYTES)
+        if data[:2] == b'\xff\xd8':
+            size = jpeg_size(data)
+            if size is None and len(data) == HEADER_BYTES:
+                # Markers before the frame header did not fit; scan the whole file
+                size = jpeg_size(data + f.read())
+            return size
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', data[6:10])
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return webp_size(data)
+    if data[4:8] == b'ftyp' and data[8:12] in (b'avif', b'avis', b'mif1'):
+        return avif_size(data)
+    if path.suffix.lower() == '.svg':
+        return svg_size(data)
+    return None
+
+
+def load_cache():
+    """Load probed image sizes and page fold positions."""
+    if not CACHE_FILE.exists():
+        return {'images': {}, 'pages': {}}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception:
+        return {'images': {}, 'pages': {}}
+    return cache if cache.get('version') == CACHE_VERSION else {'images': {}, 'pages': {}}
+
+
+def save_cache(cache):
+    """Persist probed image sizes and page fold positions."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    cache['version'] = CACHE_VERSION
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, separators=(',', ':'), sort_keys=True)
+
+
+def image_size(site_dir, rel_path, cache):
+    """Cached intrinsic size of a site image, or None."""
+    path = site_dir / rel_path
+    if not path.is_file():
+        return None
+    stat = path.stat()
+    signature = [stat.st_mtime_ns, stat.st_size]
+    cached = cache['images'].get(rel_path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    try:
+        size = probe_image_size(path)
+    except (OSError, struct.error):
+        size = None
+    size = list(size) if size and all(size) else None
+    cache['images'][rel_path] = [signature, size]
+    return size
+
+
+def fold_positions(content):
+    """(offset of the first content block, offset where below-the-fold markup starts,
+    offset of the hero <img> or None).
+
+    The hero is the first image inside an above-the-fold element with "hero" in
+    its class (farm-hero, shipment-hero, ...); pages whose hero is a CSS
+    background or a video have none.
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    if soup.body is None:
+        return 0, len(content), None
+    line_offsets = [0]
+    for line in content.split('\n'):
+        line_offsets.append(line_offsets[-1] + len(line) + 1)
+
+    def offset(tag):
+        return line_offsets[tag.sourceline - 1] + tag.sourcepos
+
+    content_start, fold, blocks, above = None, len(content), 0, []
+    for child in soup.body.children:
+        if not isinstance(child, Tag):
+            continue
+        if blocks >= ABOVE_FOLD_BLOCKS:
+            fold = offset(child)
+            break
+        above.append(child)
+        if child.name not in NON_CONTENT_TAGS and (child.contents or child.attrs.get('style')):
+            if content_start is None:
+                content_start = offset(child)
+            blocks += 1
+
+    hero = None
+    for child in above:
+        if child.name in NON_CONTENT_TAGS:
+            continue
+        candidates = [child] if 'hero' in ' '.join(child.get('class', [])) else []
+        candidates += child.find_all(class_=re.compile('hero'))
+        for element in candidates:
+            image = element if element.name == 'img' else element.find('img')
+            if image is not None:
+                hero = offset(image)
+                break
+        if hero is not None:
+            break
+    return content_start or 0, fold, hero
+
+
+def add_attributes(tag, attributes):
+    """Insert attributes before the end of an <img> tag."""
+    extra = ''.join(f' {name}="{value}"' for name, value in attributes)
+    return tag[:-2].rstrip() + extra + '/>' if tag.endswith('/>') else tag[:-1].rstrip() + extra + '>'
+
+
+def process_page(site_dir, rel_path, content, cache, counts, used_pages):
+    """Add dimensions and loading hints to the images of one page."""
+    if not IMG_PATTERN.search(content):
+        return content
+    page_key = hashlib.sha1(content.encode('utf-8')).hexdigest()
+    if page_key not in cache['pages']:
+        cache['pages'][page_key] = fold_positions(content)
+    used_pages.add(page_key)
+    content_start, fold, hero = cache['pages'][page_key]
+    content_images = 0
+
+    def replace(match):
+        nonlocal content_images
+        tag = match.group(0)
+        lowered = tag.lower()
+        attributes = []
+        src = IMG_SRC_PATTERN.search(tag)
+        if src and ' width=' not in lowered and ' height=' not in lowered:
+            value = src.group(1)
+            target = None if value.lower().startswith(EXTERNAL_PREFIXES) else reference_target(rel_path, value)
+            size = image_size(site_dir, target, cache) if target else None
+            if size:
+                attributes += [('width', size[0]), ('height', size[1])]
+                counts['sized'] += 1
+        if match.start() >= content_start:
+            content_images += 1
+        if match.start() == hero:
+            if ' fetchpriority=' not in lowered and ' loading="lazy"' not in lowered:
+                attributes.append(('fetchpriority', 'high'))
+                counts['hero'] += 1
+        elif (match.start() >= fold or content_images > EAGER_IMAGES) and ' loading=' not in lowered:
+            attributes.append(('loading', 'lazy'))
+            if ' decoding=' not in lowered:
+                attributes.append(('decoding', 'async'))
+            counts['lazy'] += 1
+        return add_attributes(tag, attributes) if attributes else tag
+
+    rewritten = IMG_PATTERN.sub(replace, content)
+    if rewritten != content and ' width="' in rewritten and ASPECT_RATIO_STYLE not in rewritten:
+        rewritten = rewritten.replace('</head>', ASPECT_RATIO_STYLE + '\n</head>', 1)
+    return rewritten
+
+
+def image_attributes(site_dir=SITE_DIR):
+    """Add image attributes in every page of the build directory. Returns a summary."""
+    cache = load_cache()
+    counts = {'sized': 0, 'lazy': 0, 'hero': 0}
+    used_pages = set()
+    pages = 0
+
+    for page in sorted(site_dir.rglob('*.html')):
+        rel_path = page.relative_to(site_dir).as_posix()
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        rewritten = process_page(site_dir, rel_path, content, cache, counts, used_pages)
+        if rewritten != content:
+            page.write_text(rewritten, encoding='utf-8')
+            pages += 1
+
+    cache['pages'] = {key: value for key, value in cache['pages'].items() if key in used_pages}
+    save_cache(cache)
+    return (f"{pages} pages: {counts['sized']} images sized, {counts['lazy']} lazy-loaded, "
+            f"{counts['hero']} heroes prioritized")
+
+
+def main():
+    """Add image attributes in an existing build directory."""
+    parser = argparse.ArgumentParser(description='Add image dimensions and loading hints in the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    print(f"✅ {image_attributes(args.site_dir)}")
+
+
+if __name__ == "__main__":
+    main()
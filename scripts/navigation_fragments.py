@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Keep the navigation menu in sync across all pages.
+
+Each page carries its menu items between stable marker comments, inside its
+existing <ul class="nav-links"> list:
+
+    <ul class="nav-links mobile-menu"><!-- agroverse:nav:start -->
+    <li>...</li>
+    <!-- agroverse:nav:end --></ul>
+
+The items are rendered from the shared STANDARD_NAV table and get_nav_links()
+in update_navigation_consistency.py, once per (depth, section) variant, and
+spliced into pages by byte offset - no HTML parsing or whole-file regex - and
+a page is only written when its bytes actually change. Everything around the
+markers (the list's classes, the logo, the footer) stays as the page has it.
+
+Usage:
+    python3 scripts/navigation_fragments.py            # splice the menu into marked pages
+    python3 scripts/navigation_fragments.py --check    # list pages that are out of date, write nothing
+    python3 scripts/navigation_fragments.py --install  # one-time: add markers around existing menus
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+from update_navigation_consistency import STANDARD_NAV, get_nav_links
+
+BASE_DIR = Path(__file__).parent.parent
+
+# Directories that never contain site pages
+EXCLUDED_DIRS = {'scripts', 'node_modules', 'docs', 'google-app-script', 'assets', '_site'}
+
+REGIONS = ('nav',)
+
+# The <li> items of the shared menu, without its <ul> (each page keeps its own list attributes)
+NAV_ITEMS = STANDARD_NAV[STANDARD_NAV.index('>') + 1:STANDARD_NAV.rindex('</ul>')]
+
+# A page's menu list: opening tag, items, closing tag
+NAV_LIST_PATTERN = re.compile(r'(<ul class="nav-links[^"]*"[^>]*>)(.*?)(</ul>)', re.DOTALL)
+
+# Rendered fragments, keyed by (depth, section)
+_fragment_cache = {}
+
+
+def marker(region, edge):
+    """Marker comment delimiting a region ('start' or 'end')."""
+    return f'<!-- agroverse:{region}:{edge} -->'
+
+
+def wrap(region, html):
+    """Wrap rendered HTML in its region markers."""
+    return f"{marker(region, 'start')}{html}{marker(region, 'end')}"
+
+
+def page_variant(file_path):
+    """Return the (depth, section) variant a page is rendered with.
+
+    The section is only kept where get_nav_links() depends on it (Cacao Journeys pages).
+    """
+    parts = file_path.relative_to(BASE_DIR).parts[:-1]
+    return len(parts), ('cacao-journeys' if 'cacao-journeys' in parts else '')
+
+
+def render_fragments(file_path):
+    """Render the marker-wrapped fragments for a page's variant as bytes (cached)."""
+    key = page_variant(file_path)
+    if key not in _fragment_cache:
+        fragments = {'nav': wrap('nav', NAV_ITEMS.format(**get_nav_links(file_path)))}
+        _fragment_cache[key] = {region: html.encode('utf-8') for region, html in fragments.items()}
+    return _fragment_cache[key]
+
+
+def splice_fragments(content, fragments):
+    """Replace every marked region in page bytes with its rendered fragment.
+
+    Returns the new content and the regions that changed.
+    """
+    changed = []
+    for region in REGIONS:
+        start_marker = marker(region, 'start').encode('utf-8')
+        end_marker = marker(region, 'end').encode('utf-8')
+        start = content.find(start_marker)
+        if start == -1:
+            continue
+        end = content.find(end_marker, start)
+        if end == -1:
+            raise ValueError(f"'{region}' start marker has no matching end marker")
+        end += len(end_marker)
+        if content[start:end] != fragments[region]:
+            content = content[:start] + fragments[region] + content[end:]
+            changed.append(region)
+    return content, changed
+
+
+def has_markers(content):
+    """True if the page already carries fragment markers."""
+    return marker('nav', 'start') in content
+
+
+def install_markers(content):
+    """Wrap the items of a page's existing menu in markers, leaving the items themselves untouched.
+
+    Returns the new content and the regions installed.
+    """
+    nav = NAV_LIST_PATTERN.search(content)
+    if not nav:
+        return content, []
+    return content[:nav.start(2)] + wrap('nav', nav.group(2)) + content[nav.end(2):], ['nav']
+
+
+def find_pages():
+    """Find all site HTML pages, sorted by path."""
+    pages = []
+    for html_file in BASE_DIR.rglob('*.html'):
+        rel_parts = html_file.relative_to(BASE_DIR).parts
+        if rel_parts[0] in EXCLUDED_DIRS or any(part.startswith('.') for part in rel_parts):
+            continue
+        pages.append(html_file)
+    return sorted(pages)
+
+
+def update_page(file_path, check=False):
+    """Splice fragments into a single page. Returns (changed regions, has markers)."""
+    content = file_path.read_bytes()
+    new_content, changed = splice_fragments(content, render_fragments(file_path))
+    if changed and not check:
+        file_path.write_bytes(new_content)
+    return changed, b'<!-- agroverse:' in content
+
+
+def install_page(file_path):
+    """Add fragment markers to a single page. Returns the list of installed regions."""
+    content = file_path.read_text(encoding='utf-8')
+    if has_markers(content):
+        return []
+    new_content, installed = install_markers(content)
+    if installed:
+        file_path.write_text(new_content, encoding='utf-8')
+    return installed
+
+
+def main():
+    """Splice (or install) navigation fragments across all pages."""
+    parser = argparse.ArgumentParser(description='Keep the navigation menu in sync across pages.')
+    parser.add_argument('--check', action='store_true', help='report out-of-date pages without writing')
+    parser.add_argument('--install', action='store_true', help='add fragment markers around existing menus')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    pages = find_pages()
+    updated = 0
+    unmarked = 0
+
+    for page in pages:
+        relative = page.relative_to(BASE_DIR)
+        try:
+            if args.install:
+                regions = install_page(page)
+            else:
+                regions, marked = update_page(page, check=args.check)
+                unmarked += not marked
+        except Exception as e:
+            print(f"❌ Error processing {relative}: {e}")
+            continue
+        if regions:
+            verb = 'Installed' if args.install else ('Out of date' if args.check else 'Updated')
+            print(f"✅ {verb}: {relative} ({', '.join(regions)})")
+            updated += 1
+
+    elapsed = (time.perf_counter() - started) * 1000
+    action = 'Installed markers in' if args.install else ('Out of date:' if args.check else 'Updated')
+    print(f"\n✅ {action} {updated} of {len(pages)} pages in {elapsed:.0f} ms "
+          f"({len(_fragment_cache)} fragment variants rendered)")
+    if unmarked:
+        print(f"⏭️  {unmarked} pages have no fragment markers (run with --install to add them)")
+
+
+if __name__ == "__main__":
+    main()
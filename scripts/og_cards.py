@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Render 1200x630 social cards for pages and point their preview meta tags at them.
+
+Build stage run by build_site.py before recompress. Pages share previews
+through og:image/twitter:image, which update_social_meta_tags.py and
+fix_mobile_menu_and_preview_images.py point at full-resolution hero photos -
+some several MB, which social scrapers time out on or reject. For every page
+whose og:image is an image on this site:
+
+- a card is rendered from the image cropped to 1200x630 (cover, biased
+  slightly above centre), darkened towards the bottom, with the page title
+  (og:title without its "| Agroverse ..." suffix) set over it;
+- the card is saved as a progressive JPEG in assets/og/ and og:image,
+  twitter:image and og:image:width/height are rewritten to it.
+
+Titles use --font, else Arial or DejaVu Sans Bold when installed; Pillow's
+built-in font is the last resort and has no accented glyphs, so accents are
+then dropped ("São João" -> "Sao Joao").
+
+Cards are named after a hash of the title and the source image (the copy in
+the repository, which the later recompress stage does not touch), rendered in
+a process pool and kept in .cache/og_cards/, so only pages whose title or
+image changed are rendered again. Pages previewing remote images (Wix, GitHub)
+keep their meta tags.
+
+Usage:
+    python3 scripts/og_cards.py [--site-dir _site] [--font Playfair.ttf]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageOps
+except ImportError:
+    Image = None
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+CACHE_FILE = BASE_DIR / ".cache" / "og_cards.json"
+OUTPUT_DIR = BASE_DIR / ".cache" / "og_cards"
+CARD_DIR = "assets/og"
+BASE_URL = 'https://www.agroverse.shop'
+
+# Bump when the card design changes so every card is rendered again
+CARD_VERSION = 2
+
+CARD_SIZE = (1200, 630)
+MARGIN = 72
+TITLE_SIZES = (68, 60, 52, 46)
+TITLE_LINES = 3
+SITE_LABEL = 'AGROVERSE'
+# "... | Agroverse", "... | Agroverse Partners": the site label already says it
+TITLE_SUFFIX_PATTERN = re.compile(r'\s+[|\-–—]\s*Agroverse[^|\-–—]*$', re.I)
+
+META_PATTERN = re.compile(r'<meta\b[^>]*>', re.I)
+META_KEY_PATTERN = re.compile(r'\s(?:property|name)="([^"]+)"')
+META_CONTENT_PATTERN = re.compile(r'(\scontent=")([^"]*)(")')
+TITLE_PATTERN = re.compile(r'<title>(.*?)</title>', re.S | re.I)
+IMAGE_TAGS = ('og:image', 'twitter:image')
+CARD_NAME_PATTERN = re.compile(r'[0-9a-f]{16}\.jpg')
+
+# Bold fonts with Portuguese accents, tried in order when --font is not given
+FONT_CANDIDATES = (
+    '/System/Library/Fonts/Supplemental/Arial Bold.ttf',
+    '/Library/Fonts/Arial Bold.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf',
+    'C:/Windows/Fonts/arialbd.ttf',
+)
+
+
+def find_font():
+    """First installed font in FONT_CANDIDATES, or None."""
+    return next((path for path in FONT_CANDIDATES if os.path.exists(path)), None)
+
+
+def load_font(font_path, size):
+    """The title font at a size: font_path if given, else Pillow's built-in font."""
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    return ImageFont.load_default(size=size)
+
+
+def fold_accents(text):
+    """'São João' -> 'Sao Joao', for Pillow's built-in font, which has ASCII glyphs only."""
+    return ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+
+
+def wrap_title(draw, title, font, width):
+    """Lines of title that fit width with a font."""
+    lines, line = [], ''
+    for word in title.split():
+        candidate = f"{line} {word}".strip()
+        if line and draw.textlength(candidate, font=font) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    return lines + [line] if line else lines
+
+
+def render_card(source, title, output, font_path):
+    """Worker: draw the card for an image and title into output. Returns True on success."""
+    try:
+        with Image.open(source) as opened:
+            image = ImageOps.exif_transpose(opened).convert('RGB')
+    except (OSError, ValueError, SyntaxError):
+        return False
+    card = ImageOps.fit(image, CARD_SIZE, Image.LANCZOS, centering=(0.5, 0.4))
+
+    # Darken towards the bottom so the title stays readable on any photo
+    width, height = CARD_SIZE
+    shade = Image.linear_gradient('L').resize((width, height))
+    shade = shade.point(lambda value: int(value * 0.8))
+    card = Image.composite(Image.new('RGB', CARD_SIZE, 'black'), card, shade)
+
+    draw = ImageDraw.Draw(card)
+    if not font_path:
+        title = fold_accents(title)
+    for size in TITLE_SIZES:
+        font = load_font(font_path, size)
+        lines = wrap_title(draw, title, font, width - 2 * MARGIN)
+        if len(lines) <= TITLE_LINES:
+            break
+    if len(lines) > TITLE_LINES:
+        lines = lines[:TITLE_LINES]
+        lines[-1] = lines[-1].rstrip('.,;:') + '…'
+
+    line_height = round(size * 1.2)
+    y = height - MARGIN - line_height * len(lines)
+    for line in lines:
+        draw.text((MARGIN + 2, y + 2), line, font=font, fill=(0, 0, 0))
+        draw.text((MARGIN, y), line, font=font, fill=(255, 255, 255))
+        y += line_height
+    draw.text((MARGIN, MARGIN - 16), SITE_LABEL, font=load_font(font_path, 28), fill=(255, 255, 255))
+
+    card.save(output, 'JPEG', quality=85, progressive=True, optimize=True)
+    return True
+
+
+def page_title(content):
+    """og:title (else <title>) without the site suffix."""
+    title = ''
+    for tag in META_PATTERN.findall(content):
+        key = META_KEY_PATTERN.search(tag)
+        content_match = META_CONTENT_PATTERN.search(tag)
+        if key and key.group(1) == 'og:title' and content_match:
+            title = content_match.group(2)
+            break
+    if not title:
+        match = TITLE_PATTERN.search(content)
+        title = match.group(1) if match else ''
+    return TITLE_SUFFIX_PATTERN.sub('', ' '.join(unescape(title).split()))
+
+
+def preview_image(content):
+    """Site-relative path of the page's og:image if it is on this site, else None."""
+    for tag in META_PATTERN.findall(content):
+        key = META_KEY_PATTERN.search(tag)
+        value = META_CONTENT_PATTERN.search(tag)
+        if key and key.group(1) == 'og:image' and value:
+            url = value.group(2)
+            if url.startswith(BASE_URL + '/'):
+                return url[len(BASE_URL) + 1:].split('?')[0].split('#')[0]
+            return None
+    return None
+
+
+def rewrite_meta(content, card_url):
+    """Point og:image/twitter:image at the card and declare its size."""
+    sizes = {'og:image:width': str(CARD_SIZE[0]), 'og:image:height': str(CARD_SIZE[1])}
+    found = set()
+
+    def replace(match):
+        tag = match.group(0)
+        key = META_KEY_PATTERN.search(tag)
+        if not key or (key.group(1) not in IMAGE_TAGS and key.group(1) not in sizes):
+            return tag
+        found.add(key.group(1))
+        value = card_url if key.group(1) in IMAGE_TAGS else sizes[key.group(1)]
+        return META_CONTENT_PATTERN.sub(lambda m: m.group(1) + value + m.group(3), tag, count=1)
+
+    rewritten = META_PATTERN.sub(replace, content)
+    missing = [f'<meta content="{value}" property="{key}"/>' for key, value in sizes.items() if key not in found]
+    if missing:
+        # Right after og:image, where the generators put them
+        og_image = next(match for match in META_PATTERN.finditer(rewritten)
+                        if 'property="og:image"' in match.group(0))
+        rewritten = rewritten[:og_image.end()] + '\n' + '\n'.join(missing) + rewritten[og_image.end():]
+    return rewritten
+
+
+def load_cache():
+    """Load image hashes from previous builds."""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_cache(cache):
+    """Persist image hashes."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, separators=(',', ':'), sort_keys=True)
+
+
+def og_cards(site_dir=SITE_DIR, font_path=None):
+    """Render social cards for every page of the build directory and rewrite their meta tags. Returns a summary."""
+    if Image is None:
+        return "skipped - Pillow is not installed (pip install Pillow)"
+
+    font_path = font_path or find_font()
+    cache = load_cache()
+    files = {}
+    cards = {}
+    pages = {}
+    previews = 0
+
+    for page in sorted(site_dir.rglob('*.html')):
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        if 'og:image' not in content:
+            continue
+        previews += 1
+        image = preview_image(content)
+        title = page_title(content)
+        if not image or not title:
+            continue
+        # The source copy: the recompress stage rewrites the one in the build after this stage
+        source = BASE_DIR / image if (BASE_DIR / image).is_file() else site_dir / image
+        if not source.is_file():
+            continue
+
+        stat = source.stat()
+        signature = [stat.st_mtime_ns, stat.st_size]
+        cached = cache.get(image)
+        digest = cached[1] if cached and cached[0] == signature else \
+            hashlib.sha1(source.read_bytes()).hexdigest()
+        files[image] = [signature, digest]
+        key = hashlib.sha1(f"{CARD_VERSION}\0{font_path}\0{title}\0{digest}".encode('utf-8')).hexdigest()[:16]
+        cards[key] = (str(source), title)
+        pages[page] = (content, key)
+
+    pending = {key: job for key, job in cards.items() if not (OUTPUT_DIR / f"{key}.jpg").exists()}
+    if pending:
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor() as pool:
+            futures = {key: pool.submit(render_card, source, title, str(OUTPUT_DIR / f"{key}.jpg"), font_path)
+                       for key, (source, title) in pending.items()}
+            failed = {key for key, future in futures.items() if not future.result()}
+    else:
+        failed = set()
+
+    card_dir = site_dir / CARD_DIR
+    card_dir.mkdir(parents=True, exist_ok=True)
+    for key in cards:
+        path = card_dir / f"{key}.jpg"
+        if key not in failed and not path.exists():
+            shutil.copyfile(OUTPUT_DIR / f"{key}.jpg", path)
+    for page, (content, key) in pages.items():
+        if key not in failed:
+            page.write_text(rewrite_meta(content, f"{BASE_URL}/{CARD_DIR}/{key}.jpg"), encoding='utf-8')
+
+    # Drop cards no page uses any more (fingerprinted copies are pruned by that stage)
+    for directory in (card_dir, OUTPUT_DIR):
+        for path in directory.glob('*.jpg'):
+            if CARD_NAME_PATTERN.fullmatch(path.name) and path.stem not in cards:
+                os.unlink(path)
+    save_cache(files)
+
+    size = sum((card_dir / f"{key}.jpg").stat().st_size for key in cards if key not in failed)
+    return (f"{len(pages) - len(failed)} of {previews} pages with previews get cards "
+            f"({len(pending)} rendered, {size / max(len(cards), 1) / 1024:.0f} KB each); "
+            f"the rest preview remote images")
+
+
+def main():
+    """Render social cards in an existing build directory."""
+    parser = argparse.ArgumentParser(description='Render Open Graph cards for pages in the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    parser.add_argument('--font', help='TrueType/OpenType font for titles (default: Arial/DejaVu Sans Bold '
+                        'if installed, else Pillow built-in)')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    print(f"✅ {og_cards(args.site_dir, args.font)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Find assets nothing references, and optionally move them out of the site.
+
+Builds a reference index of every file under assets/ from:
+- the href/src/srcset/url() references of every page and stylesheet,
+  resolved the way check_links.py resolves them, and
+- every "assets/..." path in the files the site and its backend read at
+  runtime - pages, CSS, js/ (including the *-data.js files), JSON/XML feeds
+  and Apps Script sources - in any form: relative (../../assets/...),
+  root-relative, or absolute https://www.agroverse.shop/assets/... URLs.
+  Maintenance scripts and docs are not sources: an asset only they mention
+  is not part of the site.
+
+A path that is built at runtime ("assets/images/partners/" + slug) keeps
+every asset under that directory. Unreferenced assets are listed with their
+sizes; --archive moves them to a directory outside the site, keeping their
+relative paths, so they can be restored or deleted later.
+
+Usage:
+    python3 scripts/prune_assets.py                       # list unreferenced assets
+    python3 scripts/prune_assets.py --show assets/x.jpg   # who references an asset
+    python3 scripts/prune_assets.py --archive ../agroverse-asset-archive
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sys
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import unquote
+
+from check_links import collect_references, find_published_files, find_sources, load_cache, reference_target
+
+BASE_DIR = Path(__file__).parent.parent
+ASSET_DIR = 'assets/'
+
+# Text files scanned for asset paths; directories that are not sources
+TEXT_SUFFIXES = ('.html', '.css', '.js', '.json', '.xml', '.txt', '.gs', '.webmanifest')
+SKIPPED_DIRS = {'.git', '.cache', 'node_modules', '_site', 'scripts', 'docs'}
+
+# "assets/..." in any URL form; the path ends at a quote, space, bracket, query or fragment
+ASSET_PATH_PATTERN = re.compile(r'(?<![\w-])assets/[^\s"\'`()<>?#\\,;]*')
+# Followed by string concatenation or template interpolation: built at runtime
+DYNAMIC_SUFFIX_PATTERN = re.compile(r'\$\{|["\'`]\s*\+')
+
+
+def find_assets():
+    """Size of every file under assets/, by site-relative path."""
+    assets = {}
+    for root, dirs, files in os.walk(BASE_DIR / ASSET_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            assets[os.path.relpath(path, BASE_DIR).replace(os.sep, '/')] = os.path.getsize(path)
+    return assets
+
+
+def find_text_files():
+    """Site-relative paths of every text file that may reference assets."""
+    found = []
+    for root, dirs, files in os.walk(BASE_DIR):
+        dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+        for name in files:
+            if name.endswith(TEXT_SUFFIXES):
+                found.append(os.path.relpath(os.path.join(root, name), BASE_DIR).replace(os.sep, '/'))
+    return sorted(found)
+
+
+def scan_asset_paths(rel_path):
+    """(paths, prefixes) of assets mentioned in a text file; prefixes are runtime-built directories."""
+    content = (BASE_DIR / rel_path).read_text(encoding='utf-8', errors='ignore')
+    paths, prefixes = set(), set()
+    for match in ASSET_PATH_PATTERN.finditer(content):
+        path = unquote(match.group(0))
+        if DYNAMIC_SUFFIX_PATTERN.match(content, match.end()):
+            prefixes.add(path[:path.rfind('/') + 1])
+        else:
+            paths.add(path)
+    return paths, prefixes
+
+
+def build_reference_index(assets):
+    """Map each referenced asset to the files that reference it."""
+    index = defaultdict(set)
+    prefixes = defaultdict(set)
+
+    published = find_published_files()
+    pages, _ = collect_references(find_sources(published), load_cache())
+    for source, page in pages.items():
+        for _, _, value in page['references']:
+            target = reference_target(source, value)
+            if target and target.startswith(ASSET_DIR):
+                index[target].add(source)
+
+    for rel_path in find_text_files():
+        paths, dynamic = scan_asset_paths(rel_path)
+        for path in paths:
+            index[path].add(rel_path)
+        for prefix in dynamic:
+            prefixes[prefix].add(rel_path)
+
+    for prefix, sources in prefixes.items():
+        for asset in assets:
+            if asset.startswith(prefix):
+                index[asset] |= sources
+    return index
+
+
+def format_size(size):
+    """Human-readable byte count."""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def archive_assets(unreferenced, archive_dir):
+    """Move assets to archive_dir, keeping their relative paths."""
+    for rel_path in unreferenced:
+        destination = archive_dir / rel_path
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(BASE_DIR / rel_path), str(destination))
+    # Remove directories the move left empty
+    for root, dirs, files in os.walk(BASE_DIR / ASSET_DIR, topdown=False):
+        if not os.listdir(root):
+            os.rmdir(root)
+
+
+def main():
+    """List (and optionally archive) unreferenced assets."""
+    parser = argparse.ArgumentParser(description='Find assets nothing references.')
+    parser.add_argument('--archive', type=Path, help='move unreferenced assets to this directory (outside the site)')
+    parser.add_argument('--show', metavar='ASSET', help='list the files that reference ASSET')
+    args = parser.parse_args()
+
+    assets = find_assets()
+    index = build_reference_index(assets)
+
+    if args.show:
+        sources = sorted(index.get(args.show, ()))
+        for source in sources:
+            print(source)
+        print(f"\n{'✅' if sources else '❌'} {args.show}: referenced by {len(sources)} files")
+        return 0
+
+    unreferenced = sorted((path for path in assets if path not in index), key=lambda p: (-assets[p], p))
+    by_directory = defaultdict(int)
+    for path in unreferenced:
+        by_directory[os.path.dirname(path)] += assets[path]
+
+    for path in unreferenced:
+        print(f"  {format_size(assets[path]):>9}  {path}")
+    if unreferenced:
+        print("\nBy directory:")
+        for directory, size in sorted(by_directory.items(), key=lambda item: -item[1]):
+            print(f"  {format_size(size):>9}  {directory}/")
+
+    total = sum(assets[path] for path in unreferenced)
+    print(f"\n{'⚠️ ' if unreferenced else '✅'} {len(unreferenced)} of {len(assets)} assets unreferenced "
+          f"({format_size(total)} of {format_size(sum(assets.values()))})")
+
+    if args.archive and unreferenced:
+        archive_dir = args.archive.resolve()
+        if archive_dir == BASE_DIR.resolve() or BASE_DIR.resolve() in archive_dir.parents:
+            print("❌ --archive must be outside the repository, or the archived files are still published")
+            return 1
+        archive_assets(unreferenced, archive_dir)
+        print(f"📦 Moved {len(unreferenced)} assets to {archive_dir} ({format_size(total)} reclaimed)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
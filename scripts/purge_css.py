@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Remove CSS rules a page never uses from its inline <style> blocks in the build output.
+
+Build stage run by build_site.py before critical-css. Generated pages carry
+styles for every variant (blog, event, mobile menu, hamburger) whether or not
+the page has those elements. Each page's <style> blocks are parsed and every
+rule whose selectors match nothing in the page's DOM is dropped, along with
+@media blocks left empty and @keyframes no remaining rule uses.
+
+Markup created or toggled by scripts does not exist in the static DOM, so
+classes and ids that appear in string literals of the page's scripts are
+safelisted: they are assumed present when selectors are tested, as are
+element types the scripts create. The page's scripts are its inline scripts,
+the js/ files (or bundles) it loads, and any js/ file those load at runtime
+(universal-nav.js adds cart.js, cart-ui.js, ...). Shared stylesheets in css/
+are left whole so browsers keep caching them across pages.
+
+Results are cached in .cache/purge_css.json by page content and safelist.
+
+Usage:
+    python3 scripts/purge_css.py [--site-dir _site]   # prints bytes removed per page
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from check_links import EXTERNAL_PREFIXES, reference_target
+from critical_css import (KEYFRAMES_PATTERN, PSEUDO_PATTERN, REQUIRED_TOKEN_PATTERN, parse_css,
+                          render_css, split_top_level, strip_dynamic_pseudo)
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+CACHE_FILE = BASE_DIR / ".cache" / "purge_css.json"
+
+# Bump when purge rules change so cached results are rebuilt
+CACHE_VERSION = 3
+
+STYLE_PATTERN = re.compile(r'(<style(?: type="text/css")?>)(.*?)(</style>)', re.S)
+INLINE_SCRIPT_PATTERN = re.compile(r'<script>(.*?)</script>', re.S)
+JS_STRING_PATTERN = re.compile(r'\'(?:[^\'\\\n]|\\.)*\'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`', re.S)
+SCRIPT_SRC_PATTERN = re.compile(r'<script\b[^>]*\bsrc="([^"]+)"')
+# Scripts that load other scripts at runtime (universal-nav.js adds cart.js, ...)
+LOADED_SCRIPT_PATTERN = re.compile(r'js/([\w-]+\.js)')
+JS_WORD_PATTERN = re.compile(r'-?[_a-zA-Z][\w-]*')
+CREATED_TAG_PATTERN = re.compile(r'createElement\(\s*[\'"]([a-zA-Z][\w-]*)|<([a-zA-Z][\w-]*)')
+TYPE_SELECTOR_PATTERN = re.compile(r'(?<![\w.#-])([a-zA-Z][\w-]*)')
+COMMENT_PATTERN = re.compile(r'/\*.*?\*/', re.S)
+
+
+def script_safelist(js):
+    """(words, tags): class/id names in string literals and element types created by a script."""
+    words, tags = set(), set()
+    for literal in JS_STRING_PATTERN.findall(js):
+        words.update(JS_WORD_PATTERN.findall(literal))
+    for created, opened in CREATED_TAG_PATTERN.findall(js):
+        tags.add((created or opened).lower())
+    return words, tags
+
+
+def page_safelist(site_dir, rel_path, content, memo):
+    """Safelist from the page's inline scripts, the scripts it loads and the scripts those load."""
+    words, tags = script_safelist(''.join(INLINE_SCRIPT_PATTERN.findall(content)))
+    pending = [reference_target(rel_path, src) for src in SCRIPT_SRC_PATTERN.findall(content)
+               if not src.lower().startswith(EXTERNAL_PREFIXES)]
+    seen = set()
+    while pending:
+        script = pending.pop()
+        if not script or script in seen or not (site_dir / script).is_file():
+            continue
+        seen.add(script)
+        if script not in memo:
+            js = (site_dir / script).read_text(encoding='utf-8', errors='ignore')
+            memo[script] = script_safelist(js) + (['js/' + name for name in LOADED_SCRIPT_PATTERN.findall(js)],)
+        script_words, script_tags, loaded = memo[script]
+        words |= script_words
+        tags |= script_tags
+        pending.extend(loaded)
+    return words, tags
+
+
+def outside_arguments(selector, pattern, replace):
+    """pattern.sub(replace) applied only outside (...) and [...] parts of a selector."""
+    pieces = re.split(r'(\([^)]*\)|\[[^\]]*\])', selector)
+    return ''.join(piece if i % 2 else pattern.sub(replace, piece) for i, piece in enumerate(pieces))
+
+
+def relax_selector(selector):
+    """Fill compounds emptied by safelisting with '*' ('.x > > a' -> '.x > * > a')."""
+    tokens = []
+    for token in re.split(r'(\([^)]*\)|\[[^\]]*\]|\s*[>+~]\s*|\s+)', selector):
+        if not token:
+            continue
+        stripped = token.strip()
+        if token.startswith(('(', '[')):
+            if tokens and tokens[-1] not in ' >+~':
+                tokens[-1] += token
+            else:
+                tokens.append(token)
+        elif stripped in ('>', '+', '~') or not stripped:
+            combinator = stripped or ' '
+            if not tokens or tokens[-1] in ' >+~':
+                if combinator == ' ':
+                    continue
+                tokens.append('*')
+            tokens.append(combinator)
+        else:
+            tokens.append(token)
+    if not tokens or tokens[-1] in ' >+~':
+        tokens.append('*')
+    return ''.join(f' {token} ' if token in '>+~' else token for token in tokens)
+
+
+def rule_used(selector, soup, words, tags):
+    """True if any selector in the list could match the page, allowing for script-added markup."""
+    for part in split_top_level(selector, ','):
+        simplified = PSEUDO_PATTERN.sub(strip_dynamic_pseudo, part).strip() or '*'
+        # Classes, ids and element types a script may add are treated as present
+        relaxed = outside_arguments(simplified, REQUIRED_TOKEN_PATTERN,
+                                    lambda m: '' if m.group(2) in words else m.group(0))
+        relaxed = relax_selector(outside_arguments(relaxed, TYPE_SELECTOR_PATTERN,
+                                                   lambda m: '' if m.group(1).lower() in tags else m.group(0)))
+        try:
+            if soup.select_one(relaxed) is not None:
+                return True
+        except Exception:
+            return True
+    return False
+
+
+def purge_nodes(nodes, soup, words, tags):
+    """Drop unused rules and at-rule blocks left empty; @keyframes are kept for now."""
+    kept = []
+    for prelude, body in nodes:
+        if body is None or KEYFRAMES_PATTERN.match(prelude):
+            kept.append((prelude, body))
+        elif isinstance(body, list):
+            children = purge_nodes(body, soup, words, tags)
+            if children:
+                kept.append((prelude, children))
+        elif prelude.startswith('@') or rule_used(prelude, soup, words, tags):
+            kept.append((prelude, body))
+    return kept
+
+
+def filter_keyframes(nodes, keep):
+    """Remove @keyframes whose name is not in keep (None removes all)."""
+    result = []
+    for prelude, body in nodes:
+        match = KEYFRAMES_PATTERN.match(prelude)
+        if match:
+            if keep is not None and match.group(1) in keep:
+                result.append((prelude, body))
+        elif isinstance(body, list):
+            children = filter_keyframes(body, keep)
+            if children:
+                result.append((prelude, children))
+        else:
+            result.append((prelude, body))
+    return result
+
+
+def purge_css_text(css, soup, words, tags):
+    """Purged, compacted version of one stylesheet, and the compacted size before purging."""
+    nodes = parse_css(COMMENT_PATTERN.sub('', css))
+    kept = purge_nodes(nodes, soup, words, tags)
+    rules = render_css(filter_keyframes(kept, None))
+    names = {match.group(1) for match in KEYFRAMES_PATTERN.finditer(render_css(kept))}
+    used = {name for name in names if re.search(r'\b%s\b' % re.escape(name), rules)}
+    return [render_css(filter_keyframes(kept, used)), len(render_css(nodes).encode('utf-8'))]
+
+
+def purge_page(content, words, tags):
+    """[purged CSS, compacted size] for each <style> block of a page."""
+    soup = BeautifulSoup(content, 'html.parser')
+    return [purge_css_text(css, soup, words, tags) for _, css, _ in STYLE_PATTERN.findall(content)]
+
+
+def load_cache():
+    """Load purge results from previous builds."""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception:
+        return {}
+    return cache.get('pages', {}) if cache.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(pages):
+    """Persist purge results."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'pages': pages}, f, separators=(',', ':'), sort_keys=True)
+
+
+def purge_css(site_dir=SITE_DIR, report=None):
+    """Purge unused rules from every page in the build directory. Returns a summary.
+
+    report, if given, is filled with (page, original bytes, compacted bytes, purged bytes)
+    for each changed page.
+    """
+    cache = load_cache()
+    memo = {}
+    used = {}
+    before_total = compact_total = after_total = pages = 0
+
+    for page in sorted(site_dir.rglob('*.html')):
+        rel_path = page.relative_to(site_dir).as_posix()
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        styles = STYLE_PATTERN.findall(content)
+        if not styles:
+            continue
+        words, tags = page_safelist(site_dir, rel_path, content, memo)
+        safelist = ' '.join(sorted(words)) + '\0' + ' '.join(sorted(tags))
+        key = hashlib.sha1(f"{safelist}\0{content}".encode('utf-8')).hexdigest()
+        blocks = cache.get(key)
+        if blocks is None or len(blocks) != len(styles):
+            blocks = purge_page(content, words, tags)
+        used[key] = blocks
+
+        purged = iter(blocks)
+        rewritten = STYLE_PATTERN.sub(lambda m: m.group(1) + next(purged)[0] + m.group(3), content)
+        before = sum(len(css.encode('utf-8')) for _, css, _ in styles)
+        compact = sum(size for _, size in blocks)
+        after = sum(len(css.encode('utf-8')) for css, _ in blocks)
+        before_total += before
+        compact_total += compact
+        after_total += after
+        if rewritten != content:
+            page.write_text(rewritten, encoding='utf-8')
+            pages += 1
+            if report is not None:
+                report.append((rel_path, before, compact, after))
+
+    save_cache(used)
+    return (f"{pages} pages, {(compact_total - after_total) / 1024:.0f} KB of unused rules removed; "
+            f"inline CSS {before_total / 1024:.0f} KB -> {after_total / 1024:.0f} KB with compaction")
+
+
+def main():
+    """Purge unused CSS in an existing build directory and report bytes removed per page."""
+    parser = argparse.ArgumentParser(description='Remove unused CSS rules from pages in the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    report = []
+    summary = purge_css(args.site_dir, report)
+    for rel_path, before, compact, after in sorted(report, key=lambda row: row[3] - row[2]):
+        print(f"  {rel_path}: -{compact - after:,} bytes unused ({before:,} -> {after:,} bytes)")
+    print(f"\n✅ {summary}")
+
+
+if __name__ == "__main__":
+    main()
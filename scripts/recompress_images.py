@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Re-encode JPEG and PNG images in the build output at the smallest size that
+still looks the same.
+
+Build stage run by build_site.py before the images stage. Every .jpg/.jpeg/
+.png under assets/ is re-encoded in a process pool:
+
+- JPEGs are saved progressive and Huffman-optimized at the lowest quality
+  whose SSIM against the original (luma, computed block-wise with Pillow)
+  stays at or above the threshold, found by binary search.
+- PNGs are saved with optimize=True, or as a 256-colour palette when that
+  keeps every channel (including alpha) above the threshold.
+
+EXIF/XMP metadata and comments are dropped; the EXIF orientation is applied
+to the pixels first and ICC colour profiles are kept, so images look exactly
+as before. A re-encode that is not smaller leaves the image untouched.
+
+Decisions are cached by source content hash in .cache/recompressed_images.json
+and the encoded files are kept in .cache/images/, so a build only encodes
+images it has not seen before.
+
+Usage:
+    python3 scripts/recompress_images.py [--site-dir _site] [--threshold 0.985]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from fingerprint_assets import is_fingerprinted
+
+try:
+    from PIL import Image, ImageMath, ImageOps
+except ImportError:
+    Image = None
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+CACHE_FILE = BASE_DIR / ".cache" / "recompressed_images.json"
+OUTPUT_DIR = BASE_DIR / ".cache" / "images"
+
+# Bump when encoder settings change so cached decisions are rebuilt
+CACHE_VERSION = 1
+
+IMAGE_DIR = "assets/"
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png')
+
+# Minimum SSIM against the original for a re-encode to be used
+DEFAULT_THRESHOLD = 0.985
+JPEG_QUALITY_RANGE = (40, 92)
+
+# SSIM window: non-overlapping blocks, offset from the 8x8 JPEG grid
+SSIM_BLOCK = 7
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+
+def ssim(original, candidate):
+    """Mean SSIM of two single-band images of the same size, over SSIM_BLOCK windows."""
+    x = original.convert('F')
+    y = candidate.convert('F')
+    size = (max(1, x.width // SSIM_BLOCK), max(1, x.height // SSIM_BLOCK))
+
+    def mean(image):
+        return image.resize(size, Image.BOX)
+
+    mx, my = mean(x), mean(y)
+    mxx = mean(ImageMath.lambda_eval(lambda v: v['x'] * v['x'], x=x))
+    myy = mean(ImageMath.lambda_eval(lambda v: v['y'] * v['y'], y=y))
+    mxy = mean(ImageMath.lambda_eval(lambda v: v['x'] * v['y'], x=x, y=y))
+    index = ImageMath.lambda_eval(
+        lambda v: ((2 * v['mx'] * v['my'] + SSIM_C1) * (2 * (v['mxy'] - v['mx'] * v['my']) + SSIM_C2))
+        / ((v['mx'] * v['mx'] + v['my'] * v['my'] + SSIM_C1)
+           * (v['mxx'] - v['mx'] * v['mx'] + v['myy'] - v['my'] * v['my'] + SSIM_C2)),
+        mx=mx, my=my, mxx=mxx, myy=myy, mxy=mxy)
+    return index.resize((1, 1), Image.BOX).getpixel((0, 0))
+
+
+def band_similarity(original, candidate):
+    """Lowest SSIM over the bands of two images (RGB(A) or L(A))."""
+    mode = 'RGBA' if 'A' in original.getbands() or 'transparency' in original.info else 'RGB'
+    if original.mode in ('L', 'LA'):
+        mode = original.mode
+    first, second = original.convert(mode), candidate.convert(mode)
+    return min(ssim(a, b) for a, b in zip(first.split(), second.split()))
+
+
+def encode(image, **options):
+    """Encoded bytes of an image."""
+    buffer = io.BytesIO()
+    image.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def recompress_jpeg(image, threshold, icc_profile):
+    """(bytes, quality) of the smallest progressive JPEG at or above the threshold, or None."""
+    if image.mode not in ('L', 'RGB'):
+        return None
+    luma = image.convert('L')
+    options = {'format': 'JPEG', 'progressive': True, 'optimize': True}
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+
+    low, high = JPEG_QUALITY_RANGE
+    best = None
+    while low <= high:
+        quality = (low + high) // 2
+        data = encode(image, quality=quality, **options)
+        if ssim(luma, Image.open(io.BytesIO(data)).convert('L')) >= threshold:
+            best = (data, quality)
+            high = quality - 1
+        else:
+            low = quality + 1
+    return best
+
+
+def recompress_png(image, threshold, icc_profile):
+    """(bytes, setting) of the smallest PNG at or above the threshold."""
+    options = {'format': 'PNG', 'optimize': True}
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    if 'transparency' in image.info:
+        options['transparency'] = image.info['transparency']
+    best = (encode(image, **options), 'lossless')
+
+    if image.mode in ('RGB', 'RGBA'):
+        options.pop('transparency', None)
+        method = Image.Quantize.FASTOCTREE if image.mode == 'RGBA' else Image.Quantize.MEDIANCUT
+        palette = image.quantize(256, method=method)
+        data = encode(palette, **options)
+        if len(data) < len(best[0]) and band_similarity(image, Image.open(io.BytesIO(data))) >= threshold:
+            best = (data, 'palette')
+    return best
+
+
+def recompress_file(source, output, threshold):
+    """Worker: re-encode one image into output if that makes it smaller. Returns [original, encoded, setting]."""
+    original = os.path.getsize(source)
+    try:
+        with Image.open(source) as opened:
+            image_format = opened.format
+            icc_profile = opened.info.get('icc_profile')
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+        if image_format == 'JPEG':
+            result = recompress_jpeg(image, threshold, icc_profile)
+        elif image_format == 'PNG':
+            result = recompress_png(image, threshold, icc_profile)
+        else:
+            result = None
+    except (OSError, ValueError, SyntaxError):
+        result = None
+
+    if result is None or len(result[0]) >= original:
+        return [original, None, None]
+    data, setting = result
+    Path(output).write_bytes(data)
+    return [original, len(data), setting]
+
+
+def file_digest(path):
+    """sha1 of a file's content."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cache():
+    """Load recompression decisions and file hashes from previous builds."""
+    empty = {'images': {}, 'files': {}}
+    if not CACHE_FILE.exists():
+        return empty
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception:
+        return empty
+    return cache if cache.get('version') == CACHE_VERSION else empty
+
+
+def save_cache(cache):
+    """Persist recompression decisions and file hashes."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    cache['version'] = CACHE_VERSION
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, separators=(',', ':'), sort_keys=True)
+
+
+def find_images(site_dir):
+    """Site-relative paths of the JPEG and PNG images in the build directory."""
+    return sorted(
+        path.relative_to(site_dir).as_posix() for path in (site_dir / IMAGE_DIR).rglob('*')
+        if path.suffix.lower() in IMAGE_SUFFIXES and path.is_file()
+        and not is_fingerprinted(path.relative_to(site_dir).as_posix())
+    )
+
+
+def recompress_images(site_dir=SITE_DIR, threshold=DEFAULT_THRESHOLD, report=None):
+    """Recompress every image in the build directory. Returns a summary.
+
+    report, if given, is filled with (image, original bytes, encoded bytes, setting)
+    for each image that got smaller.
+    """
+    if Image is None:
+        return "skipped - Pillow is not installed (pip install Pillow)"
+
+    cache = load_cache()
+    images = cache['images']
+    files = {}
+    pending = {}
+
+    for rel_path in find_images(site_dir):
+        path = site_dir / rel_path
+        stat = path.stat()
+        signature = [stat.st_mtime_ns, stat.st_size]
+        cached = cache['files'].get(rel_path)
+        if cached and cached[0] == signature:
+            # Already replaced by this stage in a previous build
+            files[rel_path] = cached
+            continue
+        key = f"{file_digest(path)}-{threshold}"
+        files[rel_path] = [None, key]
+        decision = images.get(key)
+        output = OUTPUT_DIR / key
+        if decision is None or (decision[1] is not None and not output.exists()):
+            pending.setdefault(key, (str(path), str(output)))
+
+    encoded = len(pending)
+    if pending:
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor() as pool:
+            futures = {key: pool.submit(recompress_file, source, output, threshold)
+                       for key, (source, output) in pending.items()}
+            for key, future in futures.items():
+                images[key] = future.result()
+
+    original_total = encoded_total = replaced = 0
+    for rel_path, (signature, key) in files.items():
+        original, size, setting = images[key]
+        original_total += original
+        encoded_total += size or original
+        if size is None:
+            continue
+        replaced += 1
+        path = site_dir / rel_path
+        if signature is None:
+            stat = path.stat()
+            # Unlink first: the fingerprint stage may have hard-linked the previous copy
+            path.unlink()
+            shutil.copyfile(OUTPUT_DIR / key, path)
+            # Keep the source mtime so build_site.py's sync does not copy the original back
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            stat = path.stat()
+            files[rel_path] = [[stat.st_mtime_ns, stat.st_size], key]
+        if report is not None:
+            report.append((rel_path, original, size, setting))
+
+    # Drop decisions and encoded files for images no longer in the site
+    used = {key for _, key in files.values()}
+    cache['images'] = {key: value for key, value in images.items() if key in used}
+    cache['files'] = {rel_path: entry for rel_path, entry in files.items() if entry[0] is not None}
+    if OUTPUT_DIR.exists():
+        for path in OUTPUT_DIR.iterdir():
+            if path.name not in used:
+                path.unlink()
+    save_cache(cache)
+
+    saved = original_total - encoded_total
+    return (f"{replaced} of {len(files)} images smaller ({encoded} encoded), "
+            f"{original_total / 1048576:.1f} MB -> {encoded_total / 1048576:.1f} MB, "
+            f"{saved / 1048576:.1f} MB saved")
+
+
+def main():
+    """Recompress images in an existing build directory and report bytes saved per image."""
+    parser = argparse.ArgumentParser(description='Recompress JPEG and PNG images in the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'minimum SSIM against the original (default: {DEFAULT_THRESHOLD})')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    report = []
+    summary = recompress_images(args.site_dir, args.threshold, report)
+    for rel_path, original, size, setting in sorted(report, key=lambda row: row[2] - row[1]):
+        print(f"  {rel_path}: -{original - size:,} bytes ({original:,} -> {size:,}, {setting})")
+    print(f"\n✅ {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Add resource hints to each page's <head> from what the page actually loads.
+
+Build stage run by build_site.py after fingerprint, so hints point at the
+final file names. Pages hand-code two Google Fonts preconnects and nothing
+else; this stage replaces every preconnect, dns-prefetch and preload in a
+page with the set worked out from its markup and scripts:
+
+- preload: the hero image (the hero section's background, which the browser
+  only finds once the CSS is parsed, else the <img fetchpriority="high">),
+  local fonts declared in the inlined CSS, and local scripts in <body>,
+  which the preload scanner reaches only after the inline styles and markup;
+- preconnect: origins of external stylesheets and the font files they pull
+  in (fonts.gstatic.com, with crossorigin), at most MAX_PRECONNECTS; origins
+  whose tags carry crossorigin (Leaflet from unpkg.com, with SRI) get the
+  same attribute, so the requests can reuse the connection;
+- dns-prefetch: origins of external scripts and of what the page's scripts
+  load or fetch at runtime - script.src/fetch() URLs in inline and local
+  scripts (googletagmanager.com from the deferred gtag loader), plus
+  SCRIPT_ORIGINS for URLs that come from config or API responses (the Apps
+  Script backend and Stripe on checkout, Google Places where the
+  autocomplete script is loaded) - and the origins those scripts call.
+
+Hints for origins a page never uses are dropped. The hint set depends only on
+a page's resources (stylesheet and script origins, local scripts, fonts, hero
+image), so it is cached per template in .cache/resource_hints.json and pages
+sharing a template reuse it.
+
+Usage:
+    python3 scripts/resource_hints.py [--site-dir _site]
+"""
+
+import argparse
+import hashlib
+import json
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from check_links import CSS_URL_PATTERN, EXTERNAL_PREFIXES, reference_target
+from critical_css import ATTRIBUTE_PATTERN
+from hero_placeholders import BACKGROUND_PATTERN, HERO_PATTERN, STYLE_ATTRIBUTE_PATTERN
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+CACHE_FILE = BASE_DIR / ".cache" / "resource_hints.json"
+
+# Bump when hint rules change so cached templates are rebuilt
+CACHE_VERSION = 3
+
+# Each preconnect holds a socket open; beyond a few they compete with real requests
+MAX_PRECONNECTS = 4
+
+SITE_ORIGINS = {'https://www.agroverse.shop', 'https://agroverse.shop'}
+
+# Origins a third-party resource connects to once it has loaded
+FOLLOW_UP_ORIGINS = {
+    'https://fonts.googleapis.com': ('https://fonts.gstatic.com',),
+    'https://www.googletagmanager.com': ('https://www.google-analytics.com',),
+    'https://maps.googleapis.com': ('https://maps.gstatic.com',),
+}
+# Fetched in CORS mode (fonts), so their connections must be opened with crossorigin;
+# origins of stylesheets and scripts tagged crossorigin (SRI) are added per page
+CORS_ORIGINS = {'https://fonts.gstatic.com'}
+
+APPS_SCRIPT_ORIGINS = ('https://script.google.com', 'https://script.googleusercontent.com')
+# Origins local scripts reach through URLs from config or API responses, which their source does not spell out
+SCRIPT_ORIGINS = {
+    'js/checkout.js': APPS_SCRIPT_ORIGINS + ('https://checkout.stripe.com',),
+    'js/checkout-shipping-calculator.js': APPS_SCRIPT_ORIGINS,
+    'js/quote-request.js': APPS_SCRIPT_ORIGINS,
+    'js/order-status.js': APPS_SCRIPT_ORIGINS,
+}
+
+LINK_PATTERN = re.compile(r'<link\b[^>]*>', re.I)
+SCRIPT_PATTERN = re.compile(r'<script\b([^>]*)>(.*?)</script>', re.S | re.I)
+STYLE_PATTERN = re.compile(r'<style\b[^>]*>(.*?)</style>', re.S | re.I)
+IMG_PATTERN = re.compile(r'<img\b[^>]*>', re.I)
+HINT_PATTERN = re.compile(r'[ \t]*<link\b[^>]*\brel="(?:preconnect|dns-prefetch|preload)"[^>]*>\n?', re.I)
+CHARSET_PATTERN = re.compile(r'<meta\s+charset="[^"]*"\s*/?>\n?', re.I)
+HEAD_PATTERN = re.compile(r'<head\b[^>]*>\n?', re.I)
+FONT_FACE_PATTERN = re.compile(r'@font-face\s*\{([^}]*)\}')
+# Scripts a page's code injects or requests: script.src = 'https://...', fetch(`https://...`)
+RUNTIME_URL_PATTERN = re.compile(r'(?:\.src\s*=\s*|fetch\(\s*)[\'"`](https://[a-zA-Z0-9.-]+)')
+# Member markers bundle_scripts.py writes before each script it bundles
+BUNDLE_MEMBER_PATTERN = re.compile(r'^/\* (js/\S+\.js) \*/$', re.M)
+SCRIPT_TYPES = ('', 'text/javascript', 'module')
+CROSSORIGIN_PATTERN = re.compile(r'\bcrossorigin(?:="([^"]*)")?', re.I)
+
+
+def origin(url):
+    """scheme://host of an absolute URL."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def is_remote(url):
+    """True for absolute http(s) URLs."""
+    return url.lower().startswith(('http://', 'https://', '//'))
+
+
+def resolve(rel_path, url):
+    """Site-relative path of a local URL in a page, the URL itself if remote, None if neither."""
+    url = url.strip()
+    if url.startswith('//'):
+        return 'https:' + url
+    if is_remote(url):
+        return url
+    if url.lower().startswith(EXTERNAL_PREFIXES):
+        return None
+    return reference_target(rel_path, url)
+
+
+def background_image(rel_path, declarations):
+    """The image of the last background declaration with a url() (skipping placeholder data: URIs), or None."""
+    matches = [match for match in BACKGROUND_PATTERN.finditer(declarations) if 'url(' in match.group(2)]
+    if not matches:
+        return None
+    for url in CSS_URL_PATTERN.finditer(matches[-1].group(2)):
+        image = resolve(rel_path, url.group(2))
+        if image:
+            return image
+    return None
+
+
+def hero_image(rel_path, content):
+    """The page's hero image: the hero section's background, else the high-priority <img>."""
+    hero = HERO_PATTERN.search(content)
+    if hero:
+        style = STYLE_ATTRIBUTE_PATTERN.search(hero.group(0))
+        image = background_image(rel_path, style.group(2)) if style else None
+        if image:
+            return image
+        rule_pattern = re.compile(r'(?<![\w-])\.%s\s*\{([^{}]*)\}' % hero.group(1))
+        for block in STYLE_PATTERN.finditer(content):
+            for rule in rule_pattern.finditer(block.group(1)):
+                image = background_image(rel_path, rule.group(1))
+                if image:
+                    return image
+    for tag in IMG_PATTERN.findall(content):
+        attrs = dict(ATTRIBUTE_PATTERN.findall(tag))
+        if attrs.get('fetchpriority') == 'high' and attrs.get('src'):
+            return resolve(rel_path, attrs['src'])
+    return None
+
+
+def record_cors(cors, url_origin, tag):
+    """Note an external tag's crossorigin mode (anonymous: '') under its origin."""
+    match = CROSSORIGIN_PATTERN.search(tag)
+    if match:
+        cors[url_origin] = match.group(1) or ''
+
+
+def page_resources(site_dir, rel_path, content):
+    """What a page loads that hints can speed up, as site-relative paths and absolute URLs."""
+    head_end = content.find('</head>')
+    hero = hero_image(rel_path, content)
+    if hero and not is_remote(hero) and not (site_dir / hero).is_file():
+        hero = None
+    # cors: {origin: crossorigin value} for external tags fetched in CORS mode, mirrored on their preconnect
+    resources = {'stylesheets': set(), 'scripts': set(), 'local_scripts': set(), 'body_scripts': [],
+                 'runtime': set(), 'fonts': [], 'hero': hero, 'cors': {}}
+
+    for tag in LINK_PATTERN.findall(content):
+        attrs = dict(ATTRIBUTE_PATTERN.findall(tag))
+        if attrs.get('rel') == 'stylesheet' and is_remote(attrs.get('href', '')):
+            resources['stylesheets'].add(origin(resolve(rel_path, attrs['href'])))
+            record_cors(resources['cors'], origin(resolve(rel_path, attrs['href'])), tag)
+
+    for match in SCRIPT_PATTERN.finditer(content):
+        attrs = dict(ATTRIBUTE_PATTERN.findall(match.group(1)))
+        if attrs.get('type', '') not in SCRIPT_TYPES:
+            continue
+        if 'src' not in attrs:
+            resources['runtime'].update(RUNTIME_URL_PATTERN.findall(match.group(2)))
+            continue
+        target = resolve(rel_path, attrs['src'])
+        if not target:
+            continue
+        if is_remote(target):
+            resources['scripts'].add(origin(target))
+            record_cors(resources['cors'], origin(target), match.group(1))
+        elif (site_dir / target).is_file():
+            resources['local_scripts'].add(target)
+            if match.start() > head_end and target not in resources['body_scripts']:
+                resources['body_scripts'].append(target)
+
+    # Fonts the inlined (critical) CSS needs, in the order it declares them
+    for block in STYLE_PATTERN.finditer(content[:head_end]):
+        for font_face in FONT_FACE_PATTERN.findall(block.group(1)):
+            for url in CSS_URL_PATTERN.finditer(font_face):
+                target = resolve(rel_path, url.group(2))
+                if target and not is_remote(target) and target.endswith('.woff2') and target not in resources['fonts']:
+                    resources['fonts'].append(target)
+
+    return {key: sorted(value) if isinstance(value, set) else value for key, value in resources.items()}
+
+
+def script_origins(site_dir, rel_path):
+    """Origins a local script (or every script in a bundle) loads or fetches at runtime."""
+    source = (site_dir / rel_path).read_text(encoding='utf-8', errors='ignore')
+    origins = set(RUNTIME_URL_PATTERN.findall(source))
+    for member in BUNDLE_MEMBER_PATTERN.findall(source) or [rel_path]:
+        origins.update(SCRIPT_ORIGINS.get(member, ()))
+    return origins
+
+
+def build_hints(site_dir, resources):
+    """[rel, href, extra attributes] for a page's resources, hrefs site-relative or absolute."""
+    hints = []
+    preconnect = []
+    for stylesheet in resources['stylesheets']:
+        for item in (stylesheet, *FOLLOW_UP_ORIGINS.get(stylesheet, ())):
+            if item not in preconnect and item not in SITE_ORIGINS:
+                preconnect.append(item)
+    cors = {item: '' for item in CORS_ORIGINS}
+    cors.update(resources['cors'])
+    for item in preconnect[:MAX_PRECONNECTS]:
+        hints.append(['preconnect', item, f' crossorigin="{cors[item]}"' if item in cors else ''])
+
+    if resources['hero']:
+        hints.append(['preload', resources['hero'], ' as="image" fetchpriority="high"'])
+    for font in resources['fonts']:
+        hints.append(['preload', font, ' as="font" type="font/woff2" crossorigin=""'])
+    for script in resources['body_scripts']:
+        hints.append(['preload', script, ' as="script"'])
+
+    prefetch = set(resources['runtime']) | set(resources['scripts'])
+    for script in resources['local_scripts']:
+        prefetch.update(script_origins(site_dir, script))
+    for item in list(prefetch):
+        prefetch.update(FOLLOW_UP_ORIGINS.get(item, ()))
+    prefetch.update(preconnect[MAX_PRECONNECTS:])
+    for item in sorted({origin(url) for url in prefetch} - set(preconnect[:MAX_PRECONNECTS]) - SITE_ORIGINS):
+        hints.append(['dns-prefetch', item, ''])
+    return hints
+
+
+def render_hints(hints, page_dir):
+    """<link> tags for hints, with local hrefs relative to page_dir."""
+    tags = []
+    for rel, href, attributes in hints:
+        if not is_remote(href):
+            href = posixpath.relpath(href, page_dir or '.')
+        tags.append(f'<link href="{href}" rel="{rel}"{attributes}/>\n')
+    return ''.join(tags)
+
+
+def template_key(site_dir, resources):
+    """Cache key for a page's resources; local scripts count by size and mtime, as their content adds origins."""
+    signatures = [[rel_path, (site_dir / rel_path).stat().st_mtime_ns, (site_dir / rel_path).stat().st_size]
+                  for rel_path in resources['local_scripts']]
+    source = json.dumps([resources, signatures], sort_keys=True)
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+
+
+def process_page(site_dir, rel_path, content, cache, used):
+    """Replace the page's resource hints. Returns (content, hints, hints dropped)."""
+    head = HEAD_PATTERN.search(content)
+    head_end = content.find('</head>')
+    if not head or head_end < 0:
+        return content, [], 0
+    existing = HINT_PATTERN.findall(content[:head_end])
+    stripped = content[:head.end()] + HINT_PATTERN.sub('', content[head.end():head_end]) + content[head_end:]
+
+    resources = page_resources(site_dir, rel_path, stripped)
+    template = template_key(site_dir, resources)
+    if template not in cache['templates']:
+        cache['templates'][template] = build_hints(site_dir, resources)
+    used.add(template)
+    hints = cache['templates'][template]
+
+    hrefs = {href for _, href, _ in hints}
+    dropped = sum(1 for tag in existing
+                  if (resolve(rel_path, dict(ATTRIBUTE_PATTERN.findall(tag)).get('href', '')) or '').rstrip('/')
+                  not in hrefs)
+
+    # Straight after <meta charset>, ahead of every stylesheet and script
+    anchor = CHARSET_PATTERN.search(stripped, head.end(), head_end) or head
+    tags = render_hints(hints, posixpath.dirname(rel_path))
+    return stripped[:anchor.end()] + tags + stripped[anchor.end():], hints, dropped
+
+
+def load_cache():
+    """Load cached template hints."""
+    empty = {'templates': {}}
+    if not CACHE_FILE.exists():
+        return empty
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception:
+        return empty
+    return cache if cache.get('version') == CACHE_VERSION else empty
+
+
+def save_cache(cache):
+    """Persist template hints."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    cache['version'] = CACHE_VERSION
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, separators=(',', ':'), sort_keys=True)
+
+
+def resource_hints(site_dir=SITE_DIR):
+    """Rewrite resource hints in every page of the build directory. Returns a summary."""
+    cache = load_cache()
+    used = set()
+    pages = dropped = 0
+    counts = {'preload': 0, 'preconnect': 0, 'dns-prefetch': 0}
+
+    for page in sorted(site_dir.rglob('*.html')):
+        rel_path = page.relative_to(site_dir).as_posix()
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        rewritten, hints, page_dropped = process_page(site_dir, rel_path, content, cache, used)
+        if rewritten != content:
+            page.write_text(rewritten, encoding='utf-8')
+        pages += 1
+        dropped += page_dropped
+        for rel, _, _ in hints:
+            counts[rel] += 1
+
+    cache['templates'] = {key: value for key, value in cache['templates'].items() if key in used}
+    save_cache(cache)
+    return (f"{pages} pages, {len(used)} templates: {counts['preload']} preloads, {counts['preconnect']} "
+            f"preconnects, {counts['dns-prefetch']} dns-prefetches; {dropped} unused hints dropped")
+
+
+def main():
+    """Rewrite resource hints in an existing build directory."""
+    parser = argparse.ArgumentParser(description='Add per-page resource hints to the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    print(f"✅ {resource_hints(args.site_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Self-host the site's web fonts as subsetted WOFF2 files in the build output.
+
+Build stage run by build_site.py before purge-css. Every page loads Playfair
+Display and Open Sans (400 and 700) from Google Fonts: two extra origins to
+connect to and a stylesheet before any text can be drawn in them. This stage
+replaces that with local files in _site:
+
+- the characters used anywhere in the built pages and scripts are collected
+  (entities decoded), plus printable ASCII and the Portuguese letters and
+  typographic punctuation in BASE_CHARACTERS, so new content keeps working;
+- each family's variable font is limited to the 400-700 weight range (one file
+  covers both weights and anything in between) and subset to those
+  characters as WOFF2 in _site/assets/fonts/;
+- _site/assets/fonts/fonts.css declares them with font-display: swap;
+- the Google Fonts <link> tags (stylesheet and preconnects) in every built
+  page are replaced by a link to assets/fonts/fonts.css. Links that request
+  other families are left alone.
+
+The local stylesheet is then handled like any other: critical-css inlines its
+@font-face rules, fingerprint hashes the font files and hints preloads them.
+
+Source fonts are read from .cache/fonts/; the stage is skipped (pages keep
+Google Fonts) when they or fontTools are missing. Running this script
+downloads them from the google/fonts repository - or put the .ttf files there
+by hand - and runs the stage on an existing build. Subsets are only rebuilt
+when the site's characters or the source fonts change.
+
+With --rewrite, the page templates (generate_blog_post_html,
+generate_event_page, the blog listing) are also pointed at
+assets/fonts/fonts.css, for generated pages that are only published through
+the build.
+
+Requires fontTools with WOFF2 support: pip install fonttools brotli
+
+Usage:
+    python3 scripts/self_host_fonts.py [--site-dir _site]   # fetch source fonts, run the stage
+    python3 scripts/self_host_fonts.py --rewrite            # ...and point the page templates at it
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import shutil
+import sys
+import urllib.request
+from html import unescape
+from pathlib import Path
+
+try:
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+    from fontTools.varLib import instancer
+except ImportError:
+    subset = None
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+SOURCE_DIR = BASE_DIR / ".cache" / "fonts"
+CACHE_FILE = BASE_DIR / ".cache" / "self_host_fonts.json"
+FONT_DIR = "assets/fonts"
+STYLESHEET = f"{FONT_DIR}/fonts.css"
+
+# Bump when subsetting options change so fonts are rebuilt
+CACHE_VERSION = 1
+
+SOURCE_URL = 'https://github.com/google/fonts/raw/main/ofl'
+# family: (source file in google/fonts, output name)
+FAMILIES = {
+    'Playfair Display': ('playfairdisplay/PlayfairDisplay[wght].ttf', 'playfair-display'),
+    'Open Sans': ('opensans/OpenSans[wdth,wght].ttf', 'open-sans'),
+}
+WEIGHT_RANGE = (400, 700)
+
+# Always included: ASCII, Portuguese letters and the punctuation editors paste in
+BASE_CHARACTERS = (
+    ''.join(chr(code) for code in range(0x20, 0x7F))
+    + 'ÀÁÂÃÇÉÊÍÓÔÕÚÜàáâãçéêíóôõúü'
+    + ' –—‘’‚“”„…•·°ºª€£×«»¿¡'
+)
+
+# Pages and scripts whose text may be drawn in the web fonts
+TEXT_SUFFIXES = ('.html', '.js')
+
+# Template scripts and the prefix their pages use for site-relative paths
+TEMPLATES = {
+    'scripts/process_blog_posts.py': '{relative_path}',
+    'scripts/process_blog_posts_enhanced.py': '{relative_path}',
+    'scripts/generate_event_pages.py': '{depth}',
+    'scripts/generate_blog_listing.py': '../',
+}
+
+GOOGLE_FONTS_PATTERN = re.compile(r'<link\b[^>]*\bhref="(https://fonts\.googleapis\.com/css2?\?[^"]*)"[^>]*?(/?)>')
+PRECONNECT_PATTERN = re.compile(r'[ \t]*<link\b[^>]*\bhref="https://fonts\.(?:googleapis|gstatic)\.com/?"[^>]*>\n?')
+FAMILY_PATTERN = re.compile(r'family=([^:&]+)')
+
+
+def source_path(family):
+    """Where a family's variable font is kept."""
+    return SOURCE_DIR / FAMILIES[family][0].split('/')[-1]
+
+
+def download_font(family):
+    """Download a family's variable font into SOURCE_DIR unless it is already there."""
+    path = source_path(family)
+    if not path.exists():
+        url = f"{SOURCE_URL}/{urllib.request.quote(FAMILIES[family][0])}"
+        print(f"📦 Downloading {url}")
+        SOURCE_DIR.mkdir(parents=True, exist_ok=True)
+        with urllib.request.urlopen(url, timeout=60) as response:
+            path.write_bytes(response.read())
+    return path
+
+
+def collect_characters(site_dir):
+    """Every character in the built pages and scripts, plus BASE_CHARACTERS."""
+    characters = set(BASE_CHARACTERS)
+    for path in site_dir.rglob('*'):
+        if path.suffix in TEXT_SUFFIXES and path.is_file():
+            characters.update(unescape(path.read_text(encoding='utf-8', errors='ignore')))
+    return {char for char in characters if char.isprintable() or char == ' '}
+
+
+def build_font(source, characters, output):
+    """Write a WOFF2 subset of a variable font covering WEIGHT_RANGE. Returns the characters it lacks."""
+    font = TTFont(source)
+    if 'fvar' in font:
+        # Weight limited to the range the site uses, every other axis pinned to its default
+        limits = {axis.axisTag: (max(axis.minValue, WEIGHT_RANGE[0]), min(axis.maxValue, WEIGHT_RANGE[1]))
+                  if axis.axisTag == 'wght' else axis.defaultValue for axis in font['fvar'].axes}
+        font = instancer.instantiateVariableFont(font, limits)
+    cmap = font.getBestCmap()
+    missing = {char for char in characters if ord(char) not in cmap}
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.hinting = False
+    options.desubroutinize = True
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=[ord(char) for char in characters if char not in missing])
+    subsetter.subset(font)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    subset.save_font(font, str(output), options)
+    return missing
+
+
+def font_css(files):
+    """fonts.css for {family: woff2 file name}."""
+    rules = ['/* Generated by scripts/self_host_fonts.py - do not edit */']
+    for family, name in files.items():
+        rules.append(f"""
+@font-face {{
+    font-family: '{family}';
+    font-style: normal;
+    font-weight: {WEIGHT_RANGE[0]} {WEIGHT_RANGE[1]};
+    font-display: swap;
+    src: url('{name}') format('woff2');
+}}""")
+    return '\n'.join(rules) + '\n'
+
+
+def rewrite_links(content, prefix):
+    """Content with Google Fonts links for our families replaced by the local stylesheet."""
+    def replace(match):
+        families = {family.replace('+', ' ') for family in FAMILY_PATTERN.findall(unescape(match.group(1)))}
+        if not families or not families <= set(FAMILIES):
+            return match.group(0)
+        return f'<link href="{prefix}{STYLESHEET}" rel="stylesheet"{match.group(2)}>'
+
+    rewritten = GOOGLE_FONTS_PATTERN.sub(replace, content)
+    if GOOGLE_FONTS_PATTERN.search(rewritten) or rewritten == content:
+        # Other families still come from Google: keep its preconnects
+        return rewritten
+    return PRECONNECT_PATTERN.sub('', rewritten).replace('<!-- Google Fonts -->', '<!-- Fonts -->')
+
+
+def load_cache():
+    """Load the key of the fonts last built."""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_cache(cache):
+    """Persist the key of the fonts just built."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+
+
+def build_fonts(site_dir, characters):
+    """Build the WOFF2 subsets and fonts.css in the build directory unless they are current.
+
+    Returns the number of characters left to fallback fonts, or None if nothing was rebuilt.
+    """
+    outputs = [site_dir / FONT_DIR / f"{name}.woff2" for _, name in FAMILIES.values()] + [site_dir / STYLESHEET]
+    sources = [[path.name, path.stat().st_mtime_ns, path.stat().st_size]
+               for path in (source_path(family) for family in FAMILIES)]
+    key = hashlib.sha1(json.dumps([CACHE_VERSION, sorted(characters), sources]).encode('utf-8')).hexdigest()
+    cache = load_cache()
+    if cache.get('key') == key and all(output.is_file() for output in outputs):
+        return None
+
+    missing = set()
+    files = {}
+    for family, (_, name) in FAMILIES.items():
+        output = site_dir / FONT_DIR / f"{name}.woff2"
+        missing |= build_font(source_path(family), characters, output)
+        files[family] = output.name
+    (site_dir / STYLESHEET).write_text(font_css(files), encoding='utf-8')
+    save_cache({'key': key, 'missing': len(missing)})
+    return len(missing)
+
+
+def self_host_fonts(site_dir=SITE_DIR):
+    """Serve the web fonts from the build directory instead of Google Fonts. Returns a summary."""
+    absent = [source_path(family).name for family in FAMILIES if not source_path(family).is_file()]
+    if subset is None or absent:
+        # Pages keep Google Fonts: drop fonts left over from an earlier build
+        shutil.rmtree(site_dir / FONT_DIR, ignore_errors=True)
+    if subset is None:
+        return "skipped - fontTools is not installed (pip install fonttools brotli)"
+    if absent:
+        return (f"skipped - {', '.join(absent)} not in {SOURCE_DIR.relative_to(BASE_DIR)}/ "
+                f"(run scripts/self_host_fonts.py once to download)")
+
+    characters = collect_characters(site_dir)
+    missing = build_fonts(site_dir, characters)
+    size = sum((site_dir / FONT_DIR / f"{name}.woff2").stat().st_size for _, name in FAMILIES.values())
+
+    pages = 0
+    for page in sorted(site_dir.rglob('*.html')):
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        if 'fonts.googleapis.com' not in content:
+            continue
+        rewritten = rewrite_links(content, '../' * len(page.relative_to(site_dir).parts[1:]))
+        if rewritten != content:
+            page.write_text(rewritten, encoding='utf-8')
+            pages += 1
+
+    built = "cached" if missing is None else "rebuilt" + (
+        f", {missing} characters left to fallback fonts" if missing else "")
+    return (f"{len(FAMILIES)} families, {len(characters)} characters, {size / 1024:.0f} KB of WOFF2 ({built}); "
+            f"{pages} pages switched from Google Fonts")
+
+
+def rewrite_templates():
+    """Point the page templates at the local stylesheet. Returns the number rewritten."""
+    templates = 0
+    for rel_path, prefix in TEMPLATES.items():
+        path = BASE_DIR / rel_path
+        content = path.read_text(encoding='utf-8')
+        rewritten = rewrite_links(content, prefix)
+        if rewritten != content:
+            path.write_text(rewritten, encoding='utf-8')
+            templates += 1
+    return templates
+
+
+def main():
+    """Fetch the source fonts and self-host them in an existing build directory."""
+    parser = argparse.ArgumentParser(description='Self-host subsetted WOFF2 versions of the site fonts in the build.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    parser.add_argument('--rewrite', action='store_true',
+                        help='also point the page templates at assets/fonts/fonts.css')
+    args = parser.parse_args()
+
+    if subset is None:
+        print("❌ fontTools is required: pip install fonttools brotli")
+        return 1
+
+    for family in FAMILIES:
+        try:
+            download_font(family)
+        except OSError as e:
+            print(f"❌ Could not download {family}: {e}")
+            print(f"   Put the .ttf from {SOURCE_URL} in {SOURCE_DIR.relative_to(BASE_DIR)}/ and re-run")
+            return 1
+
+    if args.site_dir.exists():
+        print(f"✅ {self_host_fonts(args.site_dir)}")
+    else:
+        print(f"⏭️  {args.site_dir} does not exist - the fonts stage of scripts/build_site.py will use the downloaded fonts")
+
+    if args.rewrite:
+        print(f"✅ Rewrote Google Fonts links in {rewrite_templates()} templates")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Shared site navigation model for the prev/next and title scripts.
+
+Holds the page order, titles, slugs and URLs for each navigable section
+(blog posts, farms, shipments). Titles are pulled with a regex scan of the
+page's <h1>/<title> instead of a full BeautifulSoup parse, and the model is
+persisted to .cache/site_model.json: on the next load only pages whose
+size/mtime changed are re-read, so navigation passes no longer re-parse the
+whole site to find their neighbours.
+
+Usage from other scripts:
+    from site_model import get_blog_post_order, get_page_title, get_neighbors
+
+Usage (rebuild and print a summary):
+    python3 scripts/site_model.py [--rebuild]
+"""
+
+import html
+import json
+import re
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+BLOG_INDEX = BASE_DIR / "blog" / "index.html"
+MODEL_FILE = BASE_DIR / ".cache" / "site_model.json"
+
+# Bump when the model layout changes so stale caches are rebuilt
+MODEL_VERSION = 1
+
+SECTIONS = ['post', 'farms', 'shipments']
+
+# Loaded model, shared by every caller in this process
+_model = None
+
+
+# Generic headings that are section labels rather than page titles
+GENERIC_HEADINGS = {'blog', 'farm', 'shipment'}
+
+
+def strip_tags(markup):
+    """Collapse markup to its plain text."""
+    return html.unescape(' '.join(re.sub(r'<[^>]+>', ' ', markup).split()))
+
+
+def extract_page_title(content):
+    """Title used for navigation links: the page's <h1>, falling back to <title>."""
+    for match in re.finditer(r'<h1\b[^>]*>(.*?)</h1>', content, re.IGNORECASE | re.DOTALL):
+        heading = strip_tags(match.group(1))
+        if heading and heading.lower() not in GENERIC_HEADINGS:
+            return heading
+
+    head_end = content.lower().find('</head>')
+    head = content if head_end == -1 else content[:head_end]
+    match = re.search(r'<title[^>]*>(.*?)</title>', head, re.IGNORECASE | re.DOTALL)
+    if not match:
+        return None
+    # Remove site name suffix
+    title = re.sub(r'\s*\|\s*Agroverse.*$', '', strip_tags(match.group(1)), flags=re.IGNORECASE)
+    return title or None
+
+
+def file_signature(path):
+    """Cheap change detection: (mtime_ns, size)."""
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def read_blog_post_order():
+    """Extract the order of blog posts from the blog index page cards."""
+    if not BLOG_INDEX.exists():
+        return []
+    content = BLOG_INDEX.read_text(encoding='utf-8', errors='ignore')
+    post_order = []
+    for tag in re.findall(r'<a\b[^>]*\bblog-card-link\b[^>]*>', content):
+        match = re.search(r'href="(?:\.\./|/)post/([^/"]+)/', tag)
+        if match and match.group(1) not in post_order:
+            post_order.append(match.group(1))
+    return post_order
+
+
+def order_section(section, slugs, blog_order):
+    """Order a section's slugs the way its navigation runs."""
+    if section == 'post':
+        # Blog index order (newest first)
+        return [slug for slug in blog_order if slug in slugs]
+    if section == 'shipments':
+        # Sorted by number in aglN format, newest (highest) first
+        shipments = []
+        for slug in slugs:
+            match = re.search(r'agl(\d+)', slug)
+            if slug.startswith('agl') and match:
+                shipments.append((int(match.group(1)), slug))
+        shipments.sort(key=lambda x: x[0], reverse=True)
+        return [s[1] for s in shipments]
+    # Farms: alphabetical by directory name
+    return sorted(slugs)
+
+
+def load_cached_model():
+    """Load the persisted model, or None if missing or from an older layout."""
+    if not MODEL_FILE.exists():
+        return None
+    try:
+        with open(MODEL_FILE, 'r', encoding='utf-8') as f:
+            model = json.load(f)
+    except Exception:
+        return None
+    return model if model.get('version') == MODEL_VERSION else None
+
+
+def build_site_model(cached=None):
+    """Build the model, reusing cached entries for pages that have not changed."""
+    cached = cached or {'sections': {}}
+    stats = {'read': 0, 'reused': 0}
+
+    blog_signature = file_signature(BLOG_INDEX) if BLOG_INDEX.exists() else None
+    if cached.get('blog_index') == blog_signature and 'blog_order' in cached:
+        blog_order = cached['blog_order']
+    else:
+        blog_order = read_blog_post_order()
+
+    sections = {}
+    for section in SECTIONS:
+        section_dir = BASE_DIR / section
+        cached_pages = cached['sections'].get(section, {}).get('pages', {})
+        pages = {}
+        if section_dir.exists():
+            for page_dir in sorted(section_dir.iterdir()):
+                page_file = page_dir / "index.html"
+                if not page_dir.is_dir() or not page_file.exists():
+                    continue
+                slug = page_dir.name
+                signature = file_signature(page_file)
+                previous = cached_pages.get(slug)
+                if previous and previous['signature'] == signature:
+                    pages[slug] = previous
+                    stats['reused'] += 1
+                    continue
+                pages[slug] = {
+                    'title': extract_page_title(page_file.read_text(encoding='utf-8', errors='ignore')),
+                    'url': f'/{section}/{slug}/',
+                    'signature': signature,
+                }
+                stats['read'] += 1
+        sections[section] = {
+            'order': order_section(section, set(pages), blog_order),
+            'pages': pages,
+        }
+
+    model = {
+        'version': MODEL_VERSION,
+        'blog_index': blog_signature,
+        'blog_order': blog_order,
+        'sections': sections,
+    }
+    return model, stats
+
+
+def save_site_model(model):
+    """Persist the model to disk."""
+    MODEL_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(MODEL_FILE, 'w', encoding='utf-8') as f:
+        json.dump(model, f, indent=1, ensure_ascii=False)
+
+
+def load_site_model(rebuild=False):
+    """Return the up-to-date site model, refreshing only pages that changed."""
+    global _model
+    if _model is not None and not rebuild:
+        return _model
+    cached = None if rebuild else load_cached_model()
+    _model, stats = build_site_model(cached)
+    if stats['read'] or cached is None or cached.get('blog_index') != _model['blog_index']:
+        save_site_model(_model)
+    return _model
+
+
+def get_section_order(section):
+    """Ordered list of slugs in a section."""
+    return list(load_site_model()['sections'][section]['order'])
+
+
+def get_blog_post_order():
+    """Order of blog posts, as listed on the blog index page (newest first)."""
+    return get_section_order('post')
+
+
+def get_farm_order():
+    """Ordered list of farms (alphabetical by directory name)."""
+    return get_section_order('farms')
+
+
+def get_shipment_order():
+    """Ordered list of shipments (by aglN number, newest first)."""
+    return get_section_order('shipments')
+
+
+def get_page_title(section, slug):
+    """Navigation title of a page in a section, or None."""
+    page = load_site_model()['sections'][section]['pages'].get(slug)
+    return page['title'] if page else None
+
+
+def get_page_url(section, slug):
+    """Root-relative URL of a page in a section, or None."""
+    page = load_site_model()['sections'][section]['pages'].get(slug)
+    return page['url'] if page else None
+
+
+def get_neighbors(section, slug):
+    """Return (previous_slug, next_slug) for a page; either may be None.
+
+    Lists run newest first, so "previous" is the next entry in the list.
+    """
+    order = load_site_model()['sections'][section]['order']
+    if slug not in order:
+        return None, None
+    index = order.index(slug)
+    prev_slug = order[index + 1] if index < len(order) - 1 else None
+    next_slug = order[index - 1] if index > 0 else None
+    return prev_slug, next_slug
+
+
+def main():
+    """Rebuild the site model and print a summary."""
+    rebuild = '--rebuild' in sys.argv[1:]
+    cached = None if rebuild else load_cached_model()
+    model, stats = build_site_model(cached)
+    save_site_model(model)
+
+    print(f"✅ Site model saved to {MODEL_FILE.relative_to(BASE_DIR)}")
+    print(f"   Pages read: {stats['read']}, reused from cache: {stats['reused']}")
+    for section in SECTIONS:
+        print(f"   {section}: {len(model['sections'][section]['order'])} in navigation order")
+
+
+if __name__ == "__main__":
+    main()
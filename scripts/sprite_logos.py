@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Pack partner logos into sprite sheets in the build output.
+
+Build stage run by build_site.py before every other stage, so the rewritten
+markup is bundled, purged, inlined and fingerprinted like the rest of the
+page. Every <img class="partner-logo-img"> that shows a file from
+assets/partners/logos/ is replaced by an element drawing that logo from a
+sprite sheet:
+
+- logos are scaled to fit LOGO_BOX (the card's logo area) and shelf-packed
+  into assets/sprites/partner-logos.jpg, or partner-logos-alpha.png for logos
+  with transparency, plus @2x sheets for high-density screens (image-set()
+  makes each screen download only one of the two);
+- the offsets are emitted as percentages, so each logo scales down with its
+  card and keeps its aspect ratio (like object-fit: contain);
+- page rules written for img.partner-logo-img are applied to the
+  replacement, so padding, backgrounds and per-partner styling still hold.
+
+Header photos that use the same class stay <img>. Sheets are rebuilt only when
+a logo changes (.cache/sprites.json).
+
+Usage:
+    python3 scripts/sprite_logos.py [--site-dir _site]
+"""
+
+import argparse
+import hashlib
+import json
+import posixpath
+import re
+from pathlib import Path
+
+from check_links import EXTERNAL_PREFIXES, reference_target
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+BASE_DIR = Path(__file__).parent.parent
+SITE_DIR = BASE_DIR / "_site"
+CACHE_FILE = BASE_DIR / ".cache" / "sprites.json"
+SPRITE_DIR = "assets/sprites"
+
+# Bump when the layout or encoding changes so sheets are rebuilt
+CACHE_VERSION = 1
+
+LOGO_CLASS = 'partner-logo-img'
+LOGO_DIR = 'assets/partners/logos/'
+SHEET_NAME = 'partner-logos'
+
+# Largest logo size in CSS pixels: card width x (200px logo area - 1rem padding)
+LOGO_BOX = (400, 168)
+SHEET_WIDTH = 1200
+# Transparent space between logos so scaled backgrounds do not bleed
+GUTTER = 2
+RETINA_SCALE = 2
+
+LOGO_IMG_PATTERN = re.compile(r'<img\b[^>]*\bclass="[^"]*\b%s\b[^"]*"[^>]*>' % LOGO_CLASS)
+ATTRIBUTE_PATTERN = re.compile(r'\s([\w-]+)="([^"]*)"')
+STYLE_PATTERN = re.compile(r'(<style(?: type="text/css")?>)(.*?)(</style>)', re.S)
+IMG_SELECTOR_PATTERN = re.compile(r'(?<![\w.#-])img(\.%s)(?![\w-])' % LOGO_CLASS)
+
+
+def logo_target(rel_path, tag):
+    """Site-relative path of the logo an <img> shows, or None if it is not a sprite candidate."""
+    attributes = dict(ATTRIBUTE_PATTERN.findall(tag))
+    src = attributes.get('src', '')
+    if not src or src.lower().startswith(EXTERNAL_PREFIXES):
+        return None
+    target = reference_target(rel_path, src)
+    return target if target and target.startswith(LOGO_DIR) else None
+
+
+def logo_slug(rel_path):
+    """CSS class suffix for a logo file."""
+    return re.sub(r'[^a-z0-9-]+', '-', posixpath.splitext(posixpath.basename(rel_path))[0].lower())
+
+
+def fit_size(width, height):
+    """Logo size in CSS pixels, scaled to fit LOGO_BOX."""
+    scale = min(LOGO_BOX[0] / width, LOGO_BOX[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def shelf_pack(sizes):
+    """Positions {key: (x, y)} for sizes {key: (w, h)} in rows of SHEET_WIDTH, and the sheet size."""
+    positions = {}
+    x = y = row_height = sheet_width = 0
+    for key, (width, height) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x and x + width > SHEET_WIDTH:
+            x, y, row_height = 0, y + row_height + GUTTER, 0
+        positions[key] = (x, y)
+        x += width + GUTTER
+        row_height = max(row_height, height)
+        sheet_width = max(sheet_width, x - GUTTER)
+    return positions, (sheet_width, y + row_height)
+
+
+def load_logo(path):
+    """A logo as an RGBA image, after EXIF rotation."""
+    with Image.open(path) as opened:
+        return ImageOps.exif_transpose(opened).convert('RGBA')
+
+
+def build_sheets(site_dir, logos):
+    """Draw the sprite sheets for a set of logos. Returns the layout.
+
+    layout: {'logos': {logo: [sheet, x, y, width, height]}, 'sheets': {sheet: [width, height]}}
+    """
+    images = {rel_path: load_logo(site_dir / rel_path) for rel_path in logos}
+    groups = {}
+    for rel_path, image in images.items():
+        sheet = (f"{SPRITE_DIR}/{SHEET_NAME}-alpha.png" if image.getextrema()[3][0] < 255
+                 else f"{SPRITE_DIR}/{SHEET_NAME}.jpg")
+        groups.setdefault(sheet, {})[rel_path] = fit_size(*image.size)
+
+    layout = {'logos': {}, 'sheets': {}}
+    for sheet, sizes in groups.items():
+        positions, sheet_size = shelf_pack(sizes)
+        layout['sheets'][sheet] = list(sheet_size)
+        for scale in (1, RETINA_SCALE):
+            canvas = Image.new('RGBA', (sheet_size[0] * scale, sheet_size[1] * scale), (255, 255, 255, 0))
+            for rel_path, (x, y) in positions.items():
+                width, height = sizes[rel_path]
+                logo = images[rel_path].resize((width * scale, height * scale), Image.LANCZOS)
+                canvas.paste(logo, (x * scale, y * scale))
+            path = site_dir / sheet_path(sheet, scale)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if sheet.endswith('.png'):
+                canvas.save(path, 'PNG', optimize=True)
+            else:
+                background = Image.new('RGB', canvas.size, 'white')
+                background.paste(canvas, mask=canvas.getchannel('A'))
+                background.save(path, 'JPEG', quality=90, progressive=True, optimize=True)
+        for rel_path, (x, y) in positions.items():
+            layout['logos'][rel_path] = [sheet, x, y, *sizes[rel_path]]
+    return layout
+
+
+def sheet_path(sheet, scale):
+    """Path of a sheet at a pixel density (1 or RETINA_SCALE)."""
+    stem, extension = posixpath.splitext(sheet)
+    return sheet if scale == 1 else f"{stem}@{scale}x{extension}"
+
+
+def percent(value):
+    """CSS percentage with at most 4 decimals."""
+    return f"{round(value, 4):g}%"
+
+
+def sprite_css(layout, logos, page_dir):
+    """<style> block drawing the given logos from their sheets, with URLs relative to page_dir."""
+    rules = ['.logo-sprite-box{display:flex;align-items:center;justify-content:center}',
+             '.logo-sprite{display:block;max-width:100%;background-repeat:no-repeat}']
+    for sheet in sorted({layout['logos'][rel_path][0] for rel_path in logos}):
+        normal = posixpath.relpath(sheet, page_dir or '.')
+        retina = posixpath.relpath(sheet_path(sheet, RETINA_SCALE), page_dir or '.')
+        image_set = f"url({normal}) 1x,url({retina}) {RETINA_SCALE}x"
+        rules.append(f".logo-sprite-{logo_slug(sheet)}{{background-image:url({normal});"
+                     f"background-image:-webkit-image-set({image_set});background-image:image-set({image_set})}}")
+    for rel_path in sorted(logos):
+        sheet, x, y, width, height = layout['logos'][rel_path]
+        sheet_width, sheet_height = layout['sheets'][sheet]
+        # Percent offsets: p% aligns the point p% into the logo with the point p% into the sheet
+        position_x = percent(100 * x / (sheet_width - width)) if sheet_width > width else '0'
+        position_y = percent(100 * y / (sheet_height - height)) if sheet_height > height else '0'
+        rules.append(f".logo-sprite-{logo_slug(rel_path)}{{width:{width}px;aspect-ratio:{width}/{height};"
+                     f"background-size:{percent(100 * sheet_width / width)} {percent(100 * sheet_height / height)};"
+                     f"background-position:{position_x} {position_y}}}")
+    return '<style>' + '\n'.join(rules) + '</style>'
+
+
+def sprite_tag(tag, rel_path, layout):
+    """Replacement markup for a logo <img>."""
+    attributes = dict(ATTRIBUTE_PATTERN.findall(tag))
+    sheet = layout['logos'][rel_path][0]
+    label = attributes.get('alt', '')
+    return (f'<span class="{attributes["class"]} logo-sprite-box" role="img" aria-label="{label}">'
+            f'<span class="logo-sprite logo-sprite-{logo_slug(sheet)} logo-sprite-{logo_slug(rel_path)}"></span></span>')
+
+
+def load_cache():
+    """Load the sprite layout from the previous build."""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception:
+        return {}
+    return cache if cache.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(cache):
+    """Persist the sprite layout."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    cache['version'] = CACHE_VERSION
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def sprite_logos(site_dir=SITE_DIR):
+    """Replace partner logo images with sprites in every page of the build directory. Returns a summary."""
+    if Image is None:
+        return "skipped - Pillow is not installed (pip install Pillow)"
+
+    pages = {}
+    for page in sorted(site_dir.rglob('*.html')):
+        content = page.read_text(encoding='utf-8', errors='ignore')
+        if LOGO_CLASS not in content:
+            continue
+        rel_path = page.relative_to(site_dir).as_posix()
+        targets = {tag: logo_target(rel_path, tag) for tag in LOGO_IMG_PATTERN.findall(content)}
+        targets = {tag: target for tag, target in targets.items() if target and (site_dir / target).is_file()}
+        if targets:
+            pages[page] = (rel_path, content, targets)
+
+    logos = sorted({target for _, _, targets in pages.values() for target in targets.values()})
+    if not logos:
+        return "no partner logos found"
+
+    signatures = [[rel_path, (site_dir / rel_path).stat().st_mtime_ns, (site_dir / rel_path).stat().st_size]
+                  for rel_path in logos]
+    key = hashlib.sha1(json.dumps(signatures).encode('utf-8')).hexdigest()
+    cache = load_cache()
+    layout = cache.get('layout')
+    if (cache.get('key') != key or not layout
+            or not all((site_dir / sheet_path(sheet, scale)).exists()
+                       for sheet in layout['sheets'] for scale in (1, RETINA_SCALE))):
+        layout = build_sheets(site_dir, logos)
+        save_cache({'key': key, 'layout': layout})
+
+    replaced = 0
+    for page, (rel_path, content, targets) in pages.items():
+        def replace(match):
+            target = targets.get(match.group(0))
+            return sprite_tag(match.group(0), target, layout) if target else match.group(0)
+
+        rewritten = LOGO_IMG_PATTERN.sub(replace, content)
+        rewritten = STYLE_PATTERN.sub(
+            lambda m: m.group(1) + IMG_SELECTOR_PATTERN.sub(r'\1', m.group(2)) + m.group(3), rewritten)
+        css = sprite_css(layout, set(targets.values()), posixpath.dirname(rel_path))
+        page.write_text(rewritten.replace('</head>', css + '\n</head>', 1), encoding='utf-8')
+        replaced += sum(1 for tag in LOGO_IMG_PATTERN.findall(content) if tag in targets)
+
+    sheets = len(layout['sheets'])
+    return (f"{len(logos)} logos in {sheets} sheets (+{sheets} retina), {len(pages)} pages: "
+            f"{replaced} logo images -> {sheets} sprite requests per page")
+
+
+def main():
+    """Build partner logo sprites in an existing build directory."""
+    parser = argparse.ArgumentParser(description='Pack partner logos into sprite sheets in the build output.')
+    parser.add_argument('--site-dir', type=Path, default=SITE_DIR, help='build directory (default: _site)')
+    args = parser.parse_args()
+
+    if not args.site_dir.exists():
+        print(f"❌ {args.site_dir} does not exist - run scripts/build_site.py first")
+        return
+    print(f"✅ {sprite_logos(args.site_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -88,6 +88,13 @@ def update_navigation_in_file(file_path: Path) -> bool:
         content = file_path.read_text(encoding='utf-8')
         original_content = content
         
+        # Pages with fragment markers are updated by splicing, not regex
+        # (imported here: navigation_fragments renders from this module's table)
+        from navigation_fragments import has_markers, update_page
+        if has_markers(content):
+            regions, _ = update_page(file_path)
+            return bool(regions)
+        
         # Find the nav section - look for nav-links ul
         nav_pattern = r'(<ul class="nav-links"[^>]*>.*?</ul>)'
         
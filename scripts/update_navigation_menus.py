@@ -92,6 +92,10 @@ def process_file(file_path):
         print(f"❌ Error reading {file_path}: {e}")
         return False
     
+    # Pages with fragment markers get their nav from navigation_fragments.py
+    if '<!-- agroverse:nav:start -->' in content:
+        return False
+    
     # Skip if it's the blog listing page itself
     if 'blog/index.html' in str(file_path):
         return False
@@ -6,6 +6,15 @@ echo 🌱 Agroverse Shop - Local Development Server
 echo ==============================================
 echo.
 
+REM Check if Python is installed (preferred: production-like caching, compression and redirects)
+where python >nul 2>&1
+if %ERRORLEVEL% EQU 0 (
+    echo ✅ Python found
+    echo.
+    python scripts\dev_server.py --port 8000 --bind 127.0.0.1
+    exit /b 0
+)
+
 REM Check if Node.js is installed
 where node >nul 2>&1
 if %ERRORLEVEL% EQU 0 (
@@ -32,18 +41,6 @@ if %ERRORLEVEL% EQU 0 (
     )
 )
 
-REM Check if Python is installed
-where python >nul 2>&1
-if %ERRORLEVEL% EQU 0 (
-    echo ✅ Python found
-    echo.
-    echo Starting server on http://127.0.0.1:8000
-    echo Press Ctrl+C to stop
-    echo.
-    python -m http.server 8000 --bind 127.0.0.1
-    exit /b 0
-)
-
 echo ❌ No suitable server found!
 echo.
 echo Please install one of the following:
@@ -51,9 +48,9 @@ echo   - Node.js: https://nodejs.org/
 echo   - Python: https://www.python.org/
 echo.
 echo Or manually run:
-echo   npm install ^&^& npm run dev
+echo   python scripts\dev_server.py
 echo   OR
-echo   python -m http.server 8000 --bind 127.0.0.1
+echo   npm install ^&^& npx http-server -p 8000 -a 127.0.0.1 -c-1
 exit /b 1
 
 
@@ -6,6 +6,14 @@ echo "🌱 Agroverse Shop - Local Development Server"
 echo "=============================================="
 echo ""
 
+# Check if Python 3 is installed (preferred: production-like caching, compression and redirects)
+if command -v python3 &> /dev/null; then
+    echo "✅ Python 3 found"
+    echo ""
+    python3 scripts/dev_server.py --port 8000 --bind 127.0.0.1
+    exit 0
+fi
+
 # Check if Node.js is installed
 if command -v node &> /dev/null; then
     echo "✅ Node.js found"
@@ -36,17 +44,6 @@ if command -v node &> /dev/null; then
     fi
 fi
 
-# Check if Python 3 is installed
-if command -v python3 &> /dev/null; then
-    echo "✅ Python 3 found"
-    echo ""
-    echo "Starting server on http://127.0.0.1:8000"
-    echo "Press Ctrl+C to stop"
-    echo ""
-    python3 -m http.server 8000 --bind 127.0.0.1
-    exit 0
-fi
-
 # Check if Python 2 is installed
 if command -v python &> /dev/null; then
     echo "✅ Python 2 found"
@@ -65,9 +62,9 @@ echo "  - Node.js: https://nodejs.org/"
 echo "  - Python 3: https://www.python.org/"
 echo ""
 echo "Or manually run:"
-echo "  npm install && npm run dev"
+echo "  python3 scripts/dev_server.py"
 echo "  OR"
-echo "  python3 -m http.server 8000 --bind 127.0.0.1"
+echo "  npm install && npx http-server -p 8000 -a 127.0.0.1 -c-1"
 exit 1
 
 